@@ -0,0 +1,258 @@
+"""Synthetic data and endpoint timings for `manage.py bench`.
+
+`seed_synthetic_data` fills an (empty) database with a deterministic data set
+of a given scale: alumni named after the rows of data/alumni_2000.csv, one
+tracer survey per alumni with employment records, and posts with images,
+comments and likes. `run_scenarios` then times the hot API endpoints through
+the Django test client. The same scale and seed always produce the same rows,
+so timings from two runs (or two branches) can be compared directly.
+"""
+import csv
+import os
+import platform
+import random
+import statistics
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000}
+ALUMNI_CSV = os.path.join(settings.BASE_DIR, 'data', 'alumni_2000.csv')
+BENCH_PASSWORD = 'bench-password'
+BATCH_SIZE = 1000
+
+EMPLOYED = ['yes', 'yes', 'yes', 'no', '']
+SOURCES = ['Job fair', 'Online job portal', 'Referral', 'Walk-in', 'Government agency', '']
+RATINGS = ['Excellent', 'Very good', 'Good', 'Fair', '']
+FLAGS = ['yes', 'no', '']
+DIFFICULTIES = ['Lack of experience', 'No openings', 'Salary', 'Location', 'Qualifications mismatch']
+COMPANIES = ['DOrSU', 'DepEd Davao Oriental', 'Accenture', 'BDO', 'Dole Philippines', 'LGU Mati', 'Self-employed']
+POSITIONS = ['Teacher I (Permanent)', 'Staff (Contractual)', 'Analyst (Regular)', 'Nurse (Casual)', 'Supervisor (Regular)']
+SALARIES = ['Below 10,000', '10,000-20,000', '20,000-30,000', '30,000-50,000', 'Above 50,000']
+
+
+def parse_scale(value):
+	"""Return the number of alumni for a scale name ('1k', '10k', '100k') or integer."""
+	if value in SCALES:
+		return SCALES[value]
+	try:
+		count = int(value)
+	except (TypeError, ValueError):
+		raise ValueError(f'Unknown scale {value!r}; use one of {", ".join(SCALES)} or a number')
+	if count <= 0:
+		raise ValueError('Scale must be positive')
+	return count
+
+
+def load_alumni_rows(path=ALUMNI_CSV):
+	"""(full name, course, year graduated) tuples from the sample alumni CSV."""
+	with open(path, newline='', encoding='utf-8') as handle:
+		return [
+			(row['Full Name'].strip(), row['Course'].strip(), row['Year Graduated'].strip())
+			for row in csv.DictReader(handle)
+		]
+
+
+def _bulk(model, objects):
+	model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def seed_synthetic_data(alumni_count, seed=2024, stdout=None):
+	"""Insert a deterministic data set sized for `alumni_count` alumni. Returns row counts."""
+	from posts.counters import reconcile_post_counters
+	from posts.models import Comment, Like, Post, PostImage
+	from users.aggregates import rebuild_job_difficulty_tags
+	from users.models import Admin, Alumni, AlumniSurvey, EmploymentRecord
+	from users.survey_counters import rebuild_survey_counters
+
+	rng = random.Random(seed)
+	rows = load_alumni_rows()
+	now = timezone.now()
+
+	def log(message):
+		if stdout is not None:
+			stdout.write(message)
+
+	Admin.objects.create(username='bench-admin', email='bench-admin@example.com', password=BENCH_PASSWORD, full_name='Bench Admin')
+
+	log(f'Seeding {alumni_count} alumni')
+	alumni = []
+	for index in range(alumni_count):
+		full_name, course, year = rows[index % len(rows)]
+		# Repeat the CSV names with a numeric suffix beyond its 2000 rows
+		handle = '.'.join(full_name.lower().split())
+		username = f'{handle}.{index}'
+		alumni.append(Alumni(
+			username=username, email=f'{username}@alumni.example.com', password=BENCH_PASSWORD,
+			full_name=full_name, program_course=course, year_graduated=int(year) if year.isdigit() else None,
+		))
+	_bulk(Alumni, alumni)
+	alumni_ids = list(Alumni.objects.order_by('id').values_list('id', flat=True))
+
+	log('Seeding surveys')
+	surveys = []
+	for index, alumni_id in enumerate(alumni_ids):
+		full_name, course, year = rows[index % len(rows)]
+		first, _, last = full_name.rpartition(' ')
+		survey = AlumniSurvey(
+			alumni_id=alumni_id, last_name=last or full_name, first_name=first or full_name,
+			year_graduated=year, course_program=course,
+			employed_after_graduation=rng.choice(EMPLOYED), employment_source=rng.choice(SOURCES),
+			work_performance_rating=rng.choice(RATINGS), has_been_promoted=rng.choice(FLAGS),
+			jobs_related_to_experience=rng.choice(FLAGS), has_own_business=rng.choice(['yes', 'no', None]),
+			job_difficulties=rng.sample(DIFFICULTIES, rng.randint(0, 3)),
+		)
+		survey.normalize_filter_columns()
+		surveys.append(survey)
+	_bulk(AlumniSurvey, surveys)
+	survey_ids = list(AlumniSurvey.objects.order_by('id').values_list('id', flat=True))
+	# Spread submissions over the last two years (bulk_create stamps them all "now")
+	for month in range(24):
+		AlumniSurvey.objects.filter(id__in=survey_ids[month::24]).update(created_at=now - timedelta(days=30 * month))
+
+	records = []
+	for survey_id in survey_ids:
+		for _ in range(rng.choice([0, 1, 1, 2, 3])):
+			records.append(EmploymentRecord(
+				survey_id=survey_id, company_name=rng.choice(COMPANIES), date_employed=str(rng.randint(2000, 2024)),
+				position_and_status=rng.choice(POSITIONS), monthly_salary_range=rng.choice(SALARIES),
+			))
+	_bulk(EmploymentRecord, records)
+	rebuild_job_difficulty_tags(batch_size=BATCH_SIZE)
+	rebuild_survey_counters(batch_size=BATCH_SIZE)
+
+	log('Seeding posts')
+	post_count = max(alumni_count // 10, 1)
+	_bulk(Post, [
+		Post(title=f'Announcement {index}', content=f'Synthetic post {index}. ' * rng.randint(2, 12))
+		for index in range(post_count)
+	])
+	post_ids = list(Post.objects.order_by('id').values_list('id', flat=True))
+	images, comments, likes = [], [], []
+	for post_id in post_ids:
+		for n in range(rng.randint(0, 2)):
+			images.append(PostImage(post_id=post_id, image=f'post_images/bench_{post_id}_{n}.jpg'))
+		for _ in range(rng.randint(0, 10)):
+			author = rng.choice(alumni_ids)
+			comments.append(Comment(post_id=post_id, author_id=author, author_name=f'Alumni {author}', text='Congratulations!'))
+		for author in rng.sample(alumni_ids, min(len(alumni_ids), rng.randint(0, 25))):
+			likes.append(Like(post_id=post_id, user_id=author))
+	_bulk(PostImage, images)
+	_bulk(Comment, comments)
+	_bulk(Like, likes)
+	reconcile_post_counters()
+
+	return {
+		'alumni': len(alumni_ids), 'surveys': len(survey_ids), 'employment_records': len(records),
+		'posts': len(post_ids), 'post_images': len(images), 'comments': len(comments), 'likes': len(likes),
+	}
+
+
+def _scenarios():
+	"""(name, callable(client) -> response, clear cache first) for each timed endpoint."""
+	from posts.models import Post
+	from users.models import Alumni
+
+	alumni = Alumni.objects.order_by('id').first()
+	post_id = Post.objects.order_by('-created_at', '-id').values_list('id', flat=True).first()
+	login = {'username': alumni.username, 'password': BENCH_PASSWORD, 'user_type': 'alumni'}
+	return [
+		('survey-aggregates', lambda c: c.get('/api/survey-aggregates/'), True),
+		('survey-aggregates-cached', lambda c: c.get('/api/survey-aggregates/'), False),
+		('survey-aggregates-by-year', lambda c: c.get('/api/survey-aggregates/', {'group_by': 'year_graduated'}), True),
+		('alumni-surveys-page', lambda c: c.get('/api/alumni-surveys/', {'page_size': 50}), False),
+		('alumni-surveys-program', lambda c: c.get('/api/alumni-surveys/', {'page_size': 50, 'program': alumni.program_course}), False),
+		('posts-feed', lambda c: c.get('/api/posts/'), False),
+		('posts-feed-page', lambda c: c.get('/api/posts/', {'page_size': 20}), False),
+		('login', lambda c: c.post('/api/login/', login, content_type='application/json'), False),
+		('like-toggle', lambda c: c.post(f'/api/posts/{post_id}/likes/toggle/', {'user_id': alumni.pk}, content_type='application/json'), False),
+	]
+
+
+def _percentile(samples, fraction):
+	ordered = sorted(samples)
+	index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+	return ordered[index]
+
+
+def run_scenarios(iterations=20, warmup=2, only=None):
+	"""Time each scenario; returns {name: stats} with latencies in milliseconds."""
+	client = Client()
+	results = {}
+	for name, request, cold in _scenarios():
+		if only and name not in only:
+			continue
+		for _ in range(warmup):
+			if cold:
+				cache.clear()
+			request(client)
+		samples = []
+		queries = None
+		status = None
+		for _ in range(iterations):
+			if cold:
+				cache.clear()
+			with CaptureQueriesContext(connection) as ctx:
+				start = time.perf_counter()
+				response = request(client)
+				elapsed = time.perf_counter() - start
+			samples.append(elapsed * 1000)
+			if queries is None:
+				queries = len(ctx)
+				status = response.status_code
+		results[name] = {
+			'status': status,
+			'queries': queries,
+			'iterations': iterations,
+			'min_ms': round(min(samples), 3),
+			'median_ms': round(statistics.median(samples), 3),
+			'mean_ms': round(statistics.fmean(samples), 3),
+			'p95_ms': round(_percentile(samples, 0.95), 3),
+			'max_ms': round(max(samples), 3),
+			'response_bytes': len(response.content),
+		}
+	return results
+
+
+def environment_info():
+	return {
+		'python': platform.python_version(),
+		'django': django.get_version(),
+		'database': connection.vendor,
+		'machine': platform.machine(),
+	}
+
+
+def compare_to_baseline(results, baseline, threshold=0.10):
+	"""Compare median latencies with a baseline run.
+
+	Returns a list of dicts (one per scenario present in both runs) with the
+	baseline and current medians, the relative change and whether it is a
+	regression beyond `threshold` (a fraction, 0.10 = 10% slower). Query count
+	increases are always reported as regressions.
+	"""
+	rows = []
+	for name, current in results.items():
+		previous = baseline.get('results', {}).get(name)
+		if not previous:
+			continue
+		before, after = previous['median_ms'], current['median_ms']
+		change = (after - before) / before if before else 0.0
+		more_queries = (current.get('queries') or 0) > (previous.get('queries') or 0)
+		rows.append({
+			'scenario': name,
+			'baseline_ms': before,
+			'current_ms': after,
+			'change': round(change, 4),
+			'baseline_queries': previous.get('queries'),
+			'queries': current.get('queries'),
+			'regression': change > threshold or more_queries,
+		})
+	return rows
@@ -0,0 +1,336 @@
+"""Per-endpoint request metrics in Prometheus text format.
+
+MetricsMiddleware records, for every request, the resolved URL name, its
+latency, how many database queries it ran (and how long they took) and the
+response size. Counts are kept in memory per process and written to a small
+JSON snapshot file per process under METRICS_DIR every few seconds; the
+/api/metrics/ endpoint adds up every process's snapshot, so the numbers cover
+all workers no matter which one serves the scrape.
+
+Snapshot files are named after the process id and its start time, so a new
+process that is handed a recycled pid does not overwrite (or inherit) an old
+file. When a process has exited (e.g. a recycled gunicorn/uwsgi worker), its
+totals are folded into the RETIRED_FILE archive and its snapshot removed, so
+the exported counters never go down and Prometheus does not see a reset.
+
+Other modules can record their own counters with `increment()`.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+	import fcntl
+except ImportError:  # Windows development servers run a single process
+	fcntl = None
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+
+# Request latency histogram bucket bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_HELP = {
+	'http_requests_total': ('counter', 'Requests handled, by endpoint, method and status code'),
+	'http_request_duration_seconds': ('histogram', 'Request latency'),
+	'http_db_queries_total': ('counter', 'Database queries run while handling requests'),
+	'http_db_query_seconds_total': ('counter', 'Time spent in database queries while handling requests'),
+	'http_response_bytes_total': ('counter', 'Response body bytes (streamed responses are not counted)'),
+	'author_cache_hits_total': ('counter', 'Author display info served from the per-process (local) or shared cache'),
+	'author_cache_misses_total': ('counter', 'Author display info loaded from the database'),
+}
+METRIC_PREFIX = 'alumni_'
+# Accumulated totals of processes that have exited; summed like a snapshot
+RETIRED_FILE = '_retired.json'
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_last_flush = 0.0
+
+
+def _metrics_dir():
+	return str(getattr(settings, 'METRICS_DIR', os.path.join(settings.BASE_DIR, '.metrics')))
+
+
+def _flush_interval():
+	return getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+
+
+def _process_start(pid):
+	"""Start time of `pid` in clock ticks since boot (Linux), or None if unknown."""
+	try:
+		with open(f'/proc/{pid}/stat') as handle:
+			stat = handle.read()
+	except OSError:
+		return None
+	# The command name in parentheses may contain spaces; starttime is the
+	# 20th field after it
+	return stat.rsplit(')', 1)[1].split()[19]
+
+
+_snapshot_names = {}
+
+
+def _snapshot_name():
+	"""This process's snapshot file name, '<pid>-<start>.json'."""
+	pid = os.getpid()
+	name = _snapshot_names.get(pid)
+	if name is None:
+		# Without /proc, fall back to the time this process first flushed
+		start = _process_start(pid) or f't{int(time.time() * 1000)}'
+		name = _snapshot_names[pid] = f'{pid}-{start}.json'
+	return name
+
+
+def _is_running(filename):
+	"""Whether the process that wrote snapshot `filename` is still running."""
+	pid, _, start = filename[:-len('.json')].partition('-')
+	try:
+		pid = int(pid)
+	except ValueError:
+		return True
+	try:
+		os.kill(pid, 0)
+	except ProcessLookupError:
+		return False
+	except OSError:
+		# Exists but belongs to another user
+		pass
+	if start and not start.startswith('t'):
+		current = _process_start(pid)
+		# Same pid, different start time: the pid has been reused
+		return current is None or current == start
+	return True
+
+
+def _key(name, labels):
+	return (name, tuple(sorted(labels.items())))
+
+
+def increment(name, labels=None, value=1):
+	"""Add `value` to the counter `name` with the given label dict."""
+	key = _key(name, labels or {})
+	with _lock:
+		_counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, labels, value):
+	"""Record one observation in the histogram `name`."""
+	key = _key(name, labels)
+	with _lock:
+		entry = _histograms.get(key)
+		if entry is None:
+			entry = _histograms[key] = {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0}
+		for index, bound in enumerate(LATENCY_BUCKETS):
+			if value <= bound:
+				entry['buckets'][index] += 1
+		entry['sum'] += value
+		entry['count'] += 1
+
+
+def snapshot():
+	"""This process's metrics as a JSON-serializable dict."""
+	with _lock:
+		return {
+			'counters': [[name, list(labels), value] for (name, labels), value in _counters.items()],
+			'histograms': [[name, list(labels), dict(entry, buckets=list(entry['buckets']))] for (name, labels), entry in _histograms.items()],
+		}
+
+
+def flush(force=False):
+	"""Write this process's snapshot file if the flush interval has passed."""
+	global _last_flush
+	now = time.monotonic()
+	if not force and now - _last_flush < _flush_interval():
+		return
+	_last_flush = now
+	directory = _metrics_dir()
+	os.makedirs(directory, exist_ok=True)
+	fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+	with os.fdopen(fd, 'w') as out:
+		json.dump(snapshot(), out)
+	os.replace(tmp, os.path.join(directory, _snapshot_name()))
+
+
+def _merge(counters, histograms, data):
+	"""Add a snapshot dict into the `counters` / `histograms` totals."""
+	for name, labels, value in data.get('counters', []):
+		key = (name, tuple(tuple(pair) for pair in labels))
+		counters[key] = counters.get(key, 0) + value
+	for name, labels, entry in data.get('histograms', []):
+		key = (name, tuple(tuple(pair) for pair in labels))
+		total = histograms.setdefault(key, {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0})
+		total['buckets'] = [a + b for a, b in zip(total['buckets'], entry['buckets'])]
+		total['sum'] += entry['sum']
+		total['count'] += entry['count']
+
+
+def _read(path):
+	with open(path) as handle:
+		return json.load(handle)
+
+
+def _write(directory, name, counters, histograms):
+	fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+	with os.fdopen(fd, 'w') as out:
+		json.dump({
+			'counters': [[metric, list(labels), value] for (metric, labels), value in counters.items()],
+			'histograms': [[metric, list(labels), entry] for (metric, labels), entry in histograms.items()],
+		}, out)
+	os.replace(tmp, os.path.join(directory, name))
+
+
+def _retire(directory, filenames):
+	"""Fold the snapshots of exited processes into RETIRED_FILE, then remove them."""
+	with open(os.path.join(directory, '_retired.lock'), 'a') as lock:
+		if fcntl is not None:
+			# Scrapes served by different workers may retire the same files
+			fcntl.flock(lock, fcntl.LOCK_EX)
+		counters = {}
+		histograms = {}
+		try:
+			_merge(counters, histograms, _read(os.path.join(directory, RETIRED_FILE)))
+		except FileNotFoundError:
+			pass
+		retired = []
+		for filename in filenames:
+			try:
+				_merge(counters, histograms, _read(os.path.join(directory, filename)))
+			except (OSError, ValueError):
+				# Already retired by another worker
+				continue
+			retired.append(filename)
+		if not retired:
+			return
+		_write(directory, RETIRED_FILE, counters, histograms)
+		for filename in retired:
+			os.remove(os.path.join(directory, filename))
+
+
+def collect():
+	"""Sum the snapshot files of every process (including this one).
+
+	Snapshots of processes that have exited are first folded into
+	RETIRED_FILE, which is summed along with the rest.
+	"""
+	flush(force=True)
+	directory = _metrics_dir()
+	snapshots = [filename for filename in sorted(os.listdir(directory)) if filename.endswith('.json') and filename != RETIRED_FILE]
+	exited = [filename for filename in snapshots if not _is_running(filename)]
+	if exited:
+		_retire(directory, exited)
+	counters = {}
+	histograms = {}
+	for filename in [RETIRED_FILE] + [filename for filename in snapshots if filename not in exited]:
+		try:
+			data = _read(os.path.join(directory, filename))
+		except (OSError, ValueError):
+			# Being replaced by its process right now; picked up next scrape
+			continue
+		_merge(counters, histograms, data)
+	return counters, histograms
+
+
+def _escape(value):
+	return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs, extra=()):
+	pairs = list(pairs) + list(extra)
+	if not pairs:
+		return ''
+	return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _header(lines, name, kind):
+	metric_type, text = _HELP.get(name, (kind, name.replace('_', ' ')))
+	lines.append(f'# HELP {METRIC_PREFIX}{name} {text}')
+	lines.append(f'# TYPE {METRIC_PREFIX}{name} {metric_type}')
+
+
+def render_prometheus():
+	"""Render the metrics of all processes in the Prometheus text format."""
+	counters, histograms = collect()
+	lines = []
+	for name in sorted({key[0] for key in counters}):
+		_header(lines, name, 'counter')
+		for (metric, labels), value in sorted(counters.items()):
+			if metric == name:
+				lines.append(f'{METRIC_PREFIX}{name}{_labels(labels)} {value}')
+	for name in sorted({key[0] for key in histograms}):
+		_header(lines, name, 'histogram')
+		for (metric, labels), entry in sorted(histograms.items()):
+			if metric != name:
+				continue
+			for bound, n in zip(LATENCY_BUCKETS, entry['buckets']):
+				lines.append(f'{METRIC_PREFIX}{name}_bucket{_labels(labels, [("le", bound)])} {n}')
+			lines.append(f'{METRIC_PREFIX}{name}_bucket{_labels(labels, [("le", "+Inf")])} {entry["count"]}')
+			lines.append(f'{METRIC_PREFIX}{name}_sum{_labels(labels)} {entry["sum"]}')
+			lines.append(f'{METRIC_PREFIX}{name}_count{_labels(labels)} {entry["count"]}')
+	return '\n'.join(lines) + '\n'
+
+
+class _QueryTimer:
+	def __init__(self):
+		self.count = 0
+		self.seconds = 0.0
+
+	def __call__(self, execute, sql, params, many, context):
+		start = time.perf_counter()
+		try:
+			return execute(sql, params, many, context)
+		finally:
+			self.count += 1
+			self.seconds += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+	"""Record latency, DB queries and response size per resolved URL name."""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		timer = _QueryTimer()
+		start = time.perf_counter()
+		with connection.execute_wrapper(timer):
+			response = self.get_response(request)
+		elapsed = time.perf_counter() - start
+
+		match = getattr(request, 'resolver_match', None)
+		endpoint = (match.url_name if match else None) or 'unmatched'
+		labels = {'endpoint': endpoint, 'method': request.method}
+		increment('http_requests_total', dict(labels, status=str(response.status_code)))
+		observe('http_request_duration_seconds', labels, elapsed)
+		increment('http_db_queries_total', labels, timer.count)
+		increment('http_db_query_seconds_total', labels, timer.seconds)
+		if not getattr(response, 'streaming', False):
+			increment('http_response_bytes_total', labels, len(response.content))
+		try:
+			flush()
+		except OSError:
+			pass
+		return response
+
+
+def _is_admin(request):
+	user = getattr(request, 'user', None)
+	if user is not None and user.is_authenticated and user.is_staff:
+		return True
+	auth = request.META.get('HTTP_AUTHORIZATION', '')
+	if not auth.lower().startswith('bearer '):
+		return False
+	from users.views import validate_token
+	ok, payload = validate_token(auth.split(' ', 1)[1].strip())
+	return ok and isinstance(payload, dict) and str(payload.get('user_type') or '').lower() == 'admin'
+
+
+def metrics_view(request):
+	"""GET /api/metrics/: Prometheus scrape endpoint (admin token or staff session)."""
+	if not _is_admin(request):
+		return JsonResponse({'detail': 'Admin credentials required'}, status=403)
+	return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,108 @@
+"""Keyset (cursor) pagination shared by the list endpoints.
+
+Pages are taken from a descending (created_at, id) ordering by filtering on the
+last row of the previous page instead of using OFFSET, so fetching page 500
+costs the same as page one. Cursors are opaque URL-safe tokens; clients just
+follow the `next` / `prev` links in the response.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+	page_size = 50
+	max_page_size = 200
+	cursor_query_param = 'cursor'
+	page_size_query_param = 'page_size'
+	# Ordering column; ties are broken on the primary key
+	field = 'created_at'
+	invalid_cursor_message = 'Invalid cursor'
+
+	def is_requested(self, request):
+		"""Whether the client asked for a paginated response."""
+		params = request.query_params
+		return self.cursor_query_param in params or self.page_size_query_param in params
+
+	def get_page_size(self, request):
+		try:
+			size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+		except (TypeError, ValueError):
+			return self.page_size
+		if size <= 0:
+			return self.page_size
+		return min(size, self.max_page_size)
+
+	def encode_cursor(self, direction, obj):
+		payload = {'d': direction, 'v': getattr(obj, self.field).isoformat(), 'pk': obj.pk}
+		return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+	def decode_cursor(self, request):
+		token = request.query_params.get(self.cursor_query_param)
+		if not token:
+			return None
+		try:
+			payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+			direction = payload['d']
+			value = parse_datetime(payload['v'])
+			pk = int(payload['pk'])
+		except (TypeError, ValueError, KeyError, UnicodeError):
+			raise NotFound(self.invalid_cursor_message)
+		if direction not in ('n', 'p') or value is None:
+			raise NotFound(self.invalid_cursor_message)
+		return direction, value, pk
+
+	def paginate_queryset(self, queryset, request, view=None):
+		self.request = request
+		page_size = self.get_page_size(request)
+		cursor = self.decode_cursor(request)
+		field = self.field
+
+		if cursor is None or cursor[0] == 'n':
+			qs = queryset.order_by(f'-{field}', '-pk')
+			if cursor is not None:
+				_, value, pk = cursor
+				qs = qs.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+			rows = list(qs[:page_size + 1])
+			self.has_next = len(rows) > page_size
+			self.has_previous = cursor is not None
+			self.page = rows[:page_size]
+		else:
+			# Walk backwards from the cursor, then restore the descending order
+			_, value, pk = cursor
+			qs = queryset.order_by(field, 'pk').filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+			rows = list(qs[:page_size + 1])
+			self.has_previous = len(rows) > page_size
+			self.has_next = True
+			self.page = list(reversed(rows[:page_size]))
+		return self.page
+
+	def _link(self, direction, obj):
+		url = self.request.build_absolute_uri()
+		return replace_query_param(url, self.cursor_query_param, self.encode_cursor(direction, obj))
+
+	def get_next_link(self):
+		if not self.has_next or not self.page:
+			return None
+		return self._link('n', self.page[-1])
+
+	def get_previous_link(self):
+		if not self.has_previous:
+			return None
+		if not self.page:
+			# Paged past the end: step back to the newest rows
+			return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+		return self._link('p', self.page[0])
+
+	def get_paginated_response(self, data):
+		return Response({
+			'next': self.get_next_link(),
+			'prev': self.get_previous_link(),
+			'results': data,
+		})
@@ -49,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so request latency includes every other middleware
+    'alumni_backend.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -137,6 +139,50 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache used for dashboard responses (e.g. /api/survey-aggregates/). A
+# file-based cache is shared by every worker process on the host, so a write
+# handled by one worker invalidates cached responses for all of them; switch to
+# 'django.core.cache.backends.locmem.LocMemCache' for a single-process setup.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.django_cache'),
+    }
+}
+# Upper bound (seconds) on how long a cached survey aggregate is kept; writes
+# invalidate it sooner through a version stamp.
+SURVEY_AGGREGATES_CACHE_TIMEOUT = 300
+
+# Author names/avatars shown with comments (users/author_cache.py): kept in the
+# cache above for AUTHOR_CACHE_TIMEOUT seconds and in a per-process LRU of
+# AUTHOR_CACHE_LOCAL_SIZE entries that expire after AUTHOR_CACHE_LOCAL_TTL.
+AUTHOR_CACHE_TIMEOUT = 3600
+AUTHOR_CACHE_LOCAL_SIZE = 1024
+AUTHOR_CACHE_LOCAL_TTL = 60
+
+# Background survey exports (users/export_jobs.py). Jobs run on a small thread
+# pool inside the web process; set EXPORT_JOBS_RUN_IN_PROCESS = False to leave
+# them for `python manage.py run_export_jobs --loop` instead. Finished files
+# are reused for identical requests for up to EXPORT_JOBS_MAX_AGE seconds and
+# deleted after that whenever another export finishes. A job whose worker has
+# not reported progress for EXPORT_JOBS_STALE_AFTER seconds is marked failed.
+EXPORT_JOBS_RUN_IN_PROCESS = True
+EXPORT_JOBS_WORKERS = 2
+EXPORT_JOBS_MAX_AGE = 3600
+EXPORT_JOBS_STALE_AFTER = 300
+
+# Per-endpoint request metrics (alumni_backend/metrics.py), served to admins at
+# /api/metrics/. Each worker process writes a snapshot file here at most every
+# METRICS_FLUSH_INTERVAL seconds; the endpoint sums them.
+METRICS_DIR = os.path.join(BASE_DIR, '.metrics')
+METRICS_FLUSH_INTERVAL = 5
+
+# /api/alumni-surveys/ returns keyset-paginated pages ({next, prev, results},
+# `page_size` or `limit` rows, 50 by default). Compatibility switch: set
+# SURVEY_LIST_UNPAGINATED = True to give requests without `cursor`/`page_size`
+# the old bare array of every matching survey.
+SURVEY_LIST_UNPAGINATED = False
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -21,6 +21,7 @@ from django.conf.urls.static import static
 from django.views.generic import TemplateView
 from django.views.static import serve
 from django.http import JsonResponse
+from .metrics import metrics_view
 
 def home(request):
     return JsonResponse({
@@ -33,6 +34,7 @@ def home(request):
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/', metrics_view, name='metrics'),
     path('api/', include('users.urls')),
     path('api/', include('posts.urls')),
     # Serve root-level static files (images, videos, etc.) before React app
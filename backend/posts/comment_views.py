@@ -1,8 +1,10 @@
+from django.db import transaction
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework import status
 from .models import Comment, Post
 from .serializers import CommentSerializer
+from .counters import adjust_post_counts
 from rest_framework.response import Response
 from rest_framework import status
 
@@ -55,7 +57,9 @@ class CommentListCreateView(generics.ListCreateAPIView):
 
         serializer = self.get_serializer(data=data, context={'request': request})
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+            adjust_post_counts(post.id, comments=1)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
@@ -104,5 +108,10 @@ class CommentDetailView(generics.RetrieveDestroyAPIView):
         if not allowed:
             return Response({'detail': 'Not authorized to delete this comment.'}, status=status.HTTP_403_FORBIDDEN)
 
-        comment.delete()
+        with transaction.atomic():
+            # A concurrent delete of the same comment may have removed the row
+            # already; only the request that actually deleted it decrements.
+            deleted, _ = comment.delete()
+            if deleted:
+                adjust_post_counts(comment.post_id, comments=-1)
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,54 @@
+"""Denormalized like/comment counts on Post.
+
+The feed reads Post.likes_count and Post.comments_count straight from the row
+instead of joining the likes and comments tables for every page. The views
+that add or remove a like or comment adjust the count in the same transaction
+with an F() expression, so concurrent requests never overwrite each other's
+increments. Anything that bypasses those views (bulk inserts, the admin,
+manual SQL) can leave the counts off; `manage.py reconcile_post_counters`
+recounts them.
+"""
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Like, Post
+
+
+def adjust_post_counts(post_id, likes=0, comments=0):
+    """Add the given deltas to a post's counts in one UPDATE; returns the rows updated (0 if no such post)."""
+    changes = {}
+    if likes:
+        changes['likes_count'] = F('likes_count') + likes
+    if comments:
+        changes['comments_count'] = F('comments_count') + comments
+    if not changes:
+        return 0
+    return Post.objects.filter(pk=post_id).update(**changes)
+
+
+def _total(model):
+    rows = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(n=Count('id')).values('n')
+    return Coalesce(Subquery(rows), 0)
+
+
+def _with_totals(qs):
+    return qs.annotate(expected_likes=_total(Like), expected_comments=_total(Comment))
+
+
+def counter_drift():
+    """{post id: ((stored likes, stored comments), (actual likes, actual comments))} for posts whose counts are off."""
+    qs = _with_totals(Post.objects.all()).filter(
+        ~Q(likes_count=F('expected_likes')) | ~Q(comments_count=F('expected_comments'))
+    )
+    return {
+        row['pk']: ((row['likes_count'], row['comments_count']), (row['expected_likes'], row['expected_comments']))
+        for row in qs.values('pk', 'likes_count', 'comments_count', 'expected_likes', 'expected_comments')
+    }
+
+
+def reconcile_post_counters():
+    """Recount likes and comments for the posts that drifted; returns how many were fixed."""
+    drift = counter_drift()
+    if drift:
+        Post.objects.filter(pk__in=list(drift)).update(likes_count=_total(Like), comments_count=_total(Comment))
+    return len(drift)
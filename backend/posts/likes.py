@@ -0,0 +1,138 @@
+"""Like/unlike writes that stay correct under double clicks and bursts.
+
+Nothing is read before writing a toggle: the unlike is a single conditional
+DELETE, and the like an INSERT that skips a row the (post, user_id) unique
+constraint already holds. Only the request whose statement actually changed a
+row adjusts Post.likes_count, with an F() update in the same transaction, so
+two concurrent requests for the same like can neither both count nor raise an
+IntegrityError to the client. An ignored INSERT reports nothing, so the like's
+UPDATE only matches while the row carrying this request's created_at exists.
+Where the database has UPDATE ... RETURNING (PostgreSQL, SQLite) that UPDATE
+also returns the new count; MySQL reads it back with one more SELECT.
+
+A batch instead locks its posts first. With no other batch able to change
+those posts' likes, it reads which of them the user already likes and then
+writes every change with one statement per kind of write.
+"""
+from django.db import connection, transaction
+from django.db.models import Case, Exists, F, IntegerField, Value, When
+
+from .counters import adjust_post_counts
+from .models import Like, Post
+
+# Most queued operations accepted by one batch request
+MAX_BATCH_OPERATIONS = 200
+
+
+def _can_update_returning():
+    # UPDATE ... RETURNING exists on PostgreSQL and on SQLite from 3.35, the
+    # release that also added INSERT ... RETURNING; MySQL and MariaDB lack it
+    return connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_columns_from_insert
+
+
+def _insert_like(post_id, user_id):
+    """INSERT the like unless the user already likes the post.
+
+    Returns a queryset matching the row only if this INSERT added it: a
+    skipped insert leaves the earlier row, whose created_at differs.
+    """
+    like = Like(post_id=post_id, user_id=user_id)
+    Like.objects.bulk_create([like], ignore_conflicts=True)
+    return Like.objects.filter(post_id=post_id, user_id=user_id, created_at=like.created_at)
+
+
+def _likes_count(post_id):
+    return Post.objects.filter(pk=post_id).values_list('likes_count', flat=True).first()
+
+
+def _adjust_likes(post_id, delta, only_if=None):
+    """Add `delta` to the post's likes_count; returns the new count.
+
+    Returns None, changing nothing, if there is no such post or `only_if`
+    (a queryset) matches no row.
+    """
+    if not _can_update_returning():
+        if only_if is None:
+            updated = adjust_post_counts(post_id, likes=delta)
+        else:
+            updated = Post.objects.filter(Exists(only_if), pk=post_id).update(likes_count=F('likes_count') + delta)
+        if not updated:
+            return None
+        return _likes_count(post_id)
+    quote = connection.ops.quote_name
+    column = quote('likes_count')
+    sql = f'UPDATE {quote(Post._meta.db_table)} SET {column} = {column} + %s WHERE {quote(Post._meta.pk.column)} = %s'
+    params = [delta, post_id]
+    if only_if is not None:
+        subquery, subquery_params = only_if.values('pk').query.sql_with_params()
+        sql += f' AND EXISTS ({subquery})'
+        params.extend(subquery_params)
+    with connection.cursor() as cursor:
+        cursor.execute(f'{sql} RETURNING {column}', params)
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def toggle_like(post_id, user_id):
+    """Flip the user's like on a post; returns (liked, likes_count).
+
+    Raises Post.DoesNotExist when the post is missing.
+    """
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(post_id=post_id, user_id=user_id).delete()
+        if deleted:
+            liked = False
+            count = _adjust_likes(post_id, -1)
+        else:
+            liked = True
+            count = _adjust_likes(post_id, 1, only_if=_insert_like(post_id, user_id))
+            if count is None:
+                # Either a concurrent request added the same like first and
+                # counted it, or the post is missing (MySQL's INSERT IGNORE
+                # also skips a like for a missing post)
+                count = _likes_count(post_id)
+        if count is None:
+            # Rolls back the like inserted for a post that does not exist
+            raise Post.DoesNotExist
+    return liked, count
+
+
+def apply_like_operations(user_id, operations):
+    """Apply queued (post_id, liked) operations in order for one user.
+
+    Only the last operation per post matters, so a queue of like, unlike,
+    like on the same post costs one write. Whatever the number of posts this
+    runs at most five statements: lock the posts, read the user's likes among
+    them, delete the unliked, insert the liked and adjust every count in one
+    UPDATE. Returns ({post_id: (liked, likes_count)}, [missing post ids])
+    with posts in first-seen order.
+    """
+    final = {}
+    for post_id, liked in operations:
+        final[post_id] = liked
+    with transaction.atomic():
+        # Locked in id order so two batches touching the same posts cannot
+        # deadlock; the counts read here are current until we commit
+        counts = dict(
+            Post.objects.select_for_update().filter(pk__in=list(final)).order_by('pk').values_list('pk', 'likes_count')
+        )
+        found = [post_id for post_id in final if post_id in counts]
+        already = set(Like.objects.filter(user_id=user_id, post_id__in=found).values_list('post_id', flat=True)) if found else set()
+        deltas = {}
+        for post_id in found:
+            if final[post_id] != (post_id in already):
+                deltas[post_id] = 1 if final[post_id] else -1
+        unliked = [post_id for post_id, delta in deltas.items() if delta < 0]
+        if unliked:
+            Like.objects.filter(user_id=user_id, post_id__in=unliked).delete()
+        liked = [post_id for post_id, delta in deltas.items() if delta > 0]
+        if liked:
+            Like.objects.bulk_create([Like(post_id=post_id, user_id=user_id) for post_id in liked], ignore_conflicts=True)
+        if deltas:
+            Post.objects.filter(pk__in=list(deltas)).update(likes_count=F('likes_count') + Case(
+                *[When(pk=post_id, then=Value(delta)) for post_id, delta in deltas.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+    missing = [post_id for post_id in final if post_id not in counts]
+    return {post_id: (final[post_id], counts[post_id] + deltas.get(post_id, 0)) for post_id in found}, missing
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import counter_drift, reconcile_post_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount Post.likes_count / Post.comments_count from the like and comment rows (drift repair)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report posts whose counts disagree; do not write')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = counter_drift()
+            for post_id, ((likes, comments), (expected_likes, expected_comments)) in sorted(drift.items()):
+                self.stdout.write(
+                    f'post {post_id}: likes {likes} (expected {expected_likes}), comments {comments} (expected {expected_comments})'
+                )
+            if drift:
+                self.stdout.write(self.style.WARNING(f'{len(drift)} post(s) drifted'))
+            else:
+                self.stdout.write(self.style.SUCCESS('Post counters are in sync'))
+            return
+
+        fixed = reconcile_post_counters()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counters on {fixed} post(s)'))
@@ -5,6 +5,17 @@ class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized engagement counts, kept in step by the like/comment views
+    # with F() updates (see posts/counters.py); `manage.py
+    # reconcile_post_counters` repairs any drift.
+    likes_count = models.IntegerField(default=0, editable=False)
+    comments_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # The feed is paged by keyset on (created_at, id), newest first
+            models.Index(fields=['created_at', 'id'], name='post_created_id'),
+        ]
 
     def __str__(self):
         return self.title
@@ -1,5 +1,7 @@
+from django.db import models
 from rest_framework import serializers
-from .models import Post, PostImage, Comment
+from users.author_cache import get_author_info
+from .models import Post, PostImage, Comment, Like
 
 
 class PostImageSerializer(serializers.ModelSerializer):
@@ -8,55 +10,103 @@ class PostImageSerializer(serializers.ModelSerializer):
         fields = ('id', 'image')
 
 
+def build_author_map(author_ids):
+    """{alumni id: (display name, image url or None)} for the given ids (see users/author_cache.py)."""
+    return get_author_info(author_ids)
+
+
+class CommentListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        comments = data.all() if isinstance(data, models.manager.BaseManager) else data
+        # Resolve every author on the page at once; serializers nested in a
+        # post list find the map already built by PostListSerializer.
+        if 'authors' not in self.context:
+            comments = list(comments)
+            self.context['authors'] = build_author_map(comment.author_id for comment in comments)
+        return super().to_representation(comments)
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author_full_name = serializers.SerializerMethodField(read_only=True)
     author_image = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
-        model = __import__('posts.models', fromlist=['Comment']).Comment
+        model = Comment
         fields = ('id', 'post', 'author_name', 'author_id', 'author_full_name', 'author_image', 'text', 'created_at')
+        list_serializer_class = CommentListSerializer
+
+    def _author(self, obj):
+        """(display name, image url) of the comment's Alumni author, or None."""
+        if not obj.author_id:
+            return None
+        authors = self.context.get('authors')
+        if authors is None:
+            # A single comment (create/retrieve) outside any list
+            authors = build_author_map([obj.author_id])
+            self.context['authors'] = authors
+        return authors.get(obj.author_id)
 
     def get_author_full_name(self, obj):
-        # Try to resolve an Alumni record for richer display
-        try:
-            from ..users.models import Alumni
-            if obj.author_id:
-                a = Alumni.objects.filter(id=obj.author_id).first()
-                if a:
-                    return getattr(a, 'full_name', None) or getattr(a, 'username', None)
-        except Exception:
-            pass
+        author = self._author(obj)
         # fallback to stored author_name
-        return obj.author_name
+        return author[0] if author else obj.author_name
 
     def get_author_image(self, obj):
-        try:
-            from ..users.models import Alumni
-            request = self.context.get('request') if hasattr(self, 'context') else None
-            if obj.author_id:
-                a = Alumni.objects.filter(id=obj.author_id).first()
-                if a and getattr(a, 'image'):
-                    # build absolute URI if request present
-                    try:
-                        if request:
-                            return request.build_absolute_uri(a.image.url)
-                        return a.image.url
-                    except Exception:
-                        return getattr(a.image, 'url', None)
-        except Exception:
-            pass
-        return None
+        author = self._author(obj)
+        if not author or not author[1]:
+            return None
+        request = self.context.get('request')
+        return request.build_absolute_uri(author[1]) if request else author[1]
+
+
+def liked_post_ids(viewer_id, post_ids):
+    """Ids among `post_ids` that the viewer has liked, from one (post, user_id) index lookup."""
+    if not viewer_id or not post_ids:
+        return set()
+    return set(Like.objects.filter(user_id=viewer_id, post_id__in=post_ids).values_list('post_id', flat=True))
+
+
+class PostListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if 'liked_post_ids' not in self.context:
+            self.context['liked_post_ids'] = liked_post_ids(self.context.get('viewer_id'), [post.pk for post in posts])
+        # One author lookup for the comments embedded across the whole page
+        if 'authors' not in self.context:
+            self.context['authors'] = build_author_map(
+                comment.author_id for post in posts for comment in PostSerializer.embedded_comments(post)
+            )
+        return super().to_representation(posts)
 
 
 class PostSerializer(serializers.ModelSerializer):
     images = PostImageSerializer(many=True, read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
-    likes_count = serializers.IntegerField(read_only=True)
-    liked = serializers.BooleanField(read_only=True)
+    # In the feed this holds only the newest few comments (see
+    # PostListCreateView); the full thread is at /api/posts/<id>/comments/.
+    comments = serializers.SerializerMethodField(read_only=True)
+    # Whether the viewer (context['viewer_id'], see posts.views.get_viewer_id) liked the post
+    liked = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Post
-        fields = ('id', 'title', 'content', 'created_at', 'images', 'comments', 'likes_count', 'liked')
+        fields = ('id', 'title', 'content', 'created_at', 'images', 'comments', 'comments_count', 'likes_count', 'liked')
+        list_serializer_class = PostListSerializer
+
+    @staticmethod
+    def embedded_comments(obj):
+        comments = getattr(obj, 'comment_previews', None)
+        if comments is None:
+            comments = obj.comments.all()
+        return comments
+
+    def get_comments(self, obj):
+        return CommentSerializer(self.embedded_comments(obj), many=True, context=self.context).data
+
+    def get_liked(self, obj):
+        liked = self.context.get('liked_post_ids')
+        if liked is None:
+            liked = liked_post_ids(self.context.get('viewer_id'), [obj.pk])
+        return obj.pk in liked
 
 
 class LikeSerializer(serializers.ModelSerializer):
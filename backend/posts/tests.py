@@ -1,7 +1,8 @@
 from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
-from backend.posts.models import Post, Comment
+from .counters import counter_drift, reconcile_post_counters
+from .models import Post, Comment
 
 class PostPermissionsTest(TestCase):
     def setUp(self):
@@ -28,3 +29,389 @@ class PostPermissionsTest(TestCase):
         resp = self.client.delete(url, data={'acting_user_type': 'program_head'}, format='json')
         # Should be forbidden because acting program head is not the author nor staff
         self.assertEqual(resp.status_code, 403)
+
+
+class PostFeedPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        Post.objects.bulk_create([Post(title=f'Post {i}', content='Body') for i in range(12)])
+        # Force created_at ties so the id tie-breaker is exercised
+        ids = list(Post.objects.order_by('id').values_list('id', flat=True)[:4])
+        Post.objects.filter(id__in=ids).update(created_at=Post.objects.get(id=ids[0]).created_at)
+
+    def test_feed_pages_cover_every_post_once_newest_first(self):
+        resp = self.client.get('/api/posts/', {'page_size': 5})
+        pages = [resp.json()]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).json())
+        ids = [row['id'] for page in pages for row in page['results']]
+        self.assertEqual(ids, list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]['prev'])
+
+    def test_page_size_is_capped(self):
+        Post.objects.bulk_create([Post(title=f'More {i}', content='Body') for i in range(50)])
+        resp = self.client.get('/api/posts/', {'page_size': 1000})
+        self.assertEqual(len(resp.json()['results']), 50)
+
+    def test_feed_is_paginated_by_default(self):
+        from .views import PostFeedPagination
+        Post.objects.bulk_create([Post(title=f'More {i}', content='Body') for i in range(20)])
+        resp = self.client.get('/api/posts/').json()
+        self.assertEqual(len(resp['results']), PostFeedPagination.page_size)
+        self.assertIsNotNone(resp['next'])
+
+
+class FeedCommentPreviewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.busy = Post.objects.create(title='Busy', content='Body')
+        self.quiet = Post.objects.create(title='Quiet', content='Body')
+        Comment.objects.bulk_create([Comment(post=self.busy, author_name=f'A{i}', text=f'Comment {i}') for i in range(8)])
+        Comment.objects.create(post=self.quiet, author_name='B', text='Only one')
+        reconcile_post_counters()
+
+    def test_feed_embeds_newest_comments_and_total(self):
+        from .views import FEED_COMMENT_PREVIEWS
+        feed = {row['id']: row for row in self.client.get('/api/posts/').json()['results']}
+        busy = feed[self.busy.pk]
+        self.assertEqual(busy['comments_count'], 8)
+        newest = list(Comment.objects.filter(post=self.busy).order_by('-created_at', '-id').values_list('id', flat=True)[:FEED_COMMENT_PREVIEWS])
+        self.assertEqual([c['id'] for c in busy['comments']], newest)
+        self.assertEqual(feed[self.quiet.pk]['comments_count'], 1)
+        self.assertEqual(len(feed[self.quiet.pk]['comments']), 1)
+
+    def test_detail_and_thread_still_return_every_comment(self):
+        detail = self.client.get(f'/api/posts/{self.busy.pk}/').json()
+        self.assertEqual(len(detail['comments']), 8)
+        self.assertEqual(detail['comments_count'], 8)
+        self.assertEqual(len(self.client.get(f'/api/posts/{self.busy.pk}/comments/').json()), 8)
+
+
+class CommentAuthorTest(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from users.author_cache import clear_local
+        from users.models import Alumni
+        cache.clear()
+        clear_local()
+        self.client = APIClient()
+        self.post = Post.objects.create(title='Hello', content='Body')
+        self.authors = [
+            Alumni.objects.create(username=f'grad{n}', email=f'grad{n}@example.com', password='x', full_name=f'Graduate {n}', image=f'alumni_images/{n}.jpg')
+            for n in range(4)
+        ]
+        for n in range(20):
+            Comment.objects.create(post=self.post, author_id=self.authors[n % 4].pk, author_name='typed name', text=f'Comment {n}')
+        Comment.objects.create(post=self.post, author_id=None, author_name='Guest', text='Anonymous')
+
+    def test_thread_resolves_all_authors_in_one_query(self):
+        with self.assertNumQueries(2):
+            resp = self.client.get(f'/api/posts/{self.post.pk}/comments/')
+        rows = resp.json()
+        self.assertEqual(len(rows), 21)
+        by_author = {row['author_id']: row for row in rows}
+        # Rendering the thread again is served from the author cache
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/posts/{self.post.pk}/comments/')
+        self.assertEqual(by_author[self.authors[1].pk]['author_full_name'], 'Graduate 1')
+        self.assertEqual(by_author[self.authors[1].pk]['author_image'], 'http://testserver/media/alumni_images/1.jpg')
+        self.assertEqual(by_author[None]['author_full_name'], 'Guest')
+        self.assertIsNone(by_author[None]['author_image'])
+
+    def test_single_comment_resolves_its_author(self):
+        resp = self.client.post(f'/api/posts/{self.post.pk}/comments/', {'author_id': self.authors[2].pk, 'author_name': 'x', 'text': 'Hi'}, format='json')
+        self.assertEqual(resp.json()['author_full_name'], 'Graduate 2')
+
+
+class PostCounterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.post = Post.objects.create(title='Counted', content='Body')
+
+    def _counts(self):
+        self.post.refresh_from_db()
+        return self.post.likes_count, self.post.comments_count
+
+    def test_views_keep_counts_in_step(self):
+        url = f'/api/posts/{self.post.pk}/'
+        self.client.post(url + 'likes/toggle/', {'user_id': 1}, format='json')
+        self.client.post(url + 'likes/toggle/', {'user_id': 2}, format='json')
+        self.client.post(url + 'likes/toggle/', {'user_id': 1}, format='json')
+        created = self.client.post(url + 'comments/', {'author_id': 5, 'author_name': 'A', 'text': 'Hi'}, format='json').json()
+        self.client.post(url + 'comments/', {'author_id': 6, 'author_name': 'B', 'text': 'Hello'}, format='json')
+        self.assertEqual(self._counts(), (1, 2))
+        self.client.delete(url + f'comments/{created["id"]}/', {'author_id': 5}, format='json')
+        self.assertEqual(self._counts(), (1, 1))
+        row = self.client.get('/api/posts/').json()['results'][0]
+        self.assertEqual((row['likes_count'], row['comments_count']), (1, 1))
+
+    def test_racing_comment_deletes_decrement_once(self):
+        from unittest import mock
+        from .comment_views import CommentDetailView
+        url = f'/api/posts/{self.post.pk}/'
+        created = self.client.post(url + 'comments/', {'author_id': 5, 'author_name': 'A', 'text': 'Hi'}, format='json').json()
+        stale = Comment.objects.get(pk=created['id'])
+        self.client.delete(url + f'comments/{created["id"]}/', {'author_id': 5}, format='json')
+        # The second request loaded the comment before the first one deleted it
+        with mock.patch.object(CommentDetailView, 'get_object', return_value=stale):
+            resp = self.client.delete(url + f'comments/{created["id"]}/', {'author_id': 5}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._counts(), (0, 0))
+
+    def test_reconcile_command_repairs_drift(self):
+        import io
+        from django.core.management import call_command
+        from .models import Like
+        Like.objects.bulk_create([Like(post=self.post, user_id=n) for n in range(4)])
+        Comment.objects.create(post=self.post, author_name='A', text='Hi')
+        out = io.StringIO()
+        call_command('reconcile_post_counters', '--check', stdout=out)
+        self.assertIn(f'post {self.post.pk}: likes 0 (expected 4), comments 0 (expected 1)', out.getvalue())
+        self.assertEqual(self._counts(), (0, 0))
+        call_command('reconcile_post_counters', stdout=io.StringIO())
+        self.assertEqual(self._counts(), (4, 1))
+        out = io.StringIO()
+        call_command('reconcile_post_counters', '--check', stdout=out)
+        self.assertIn('in sync', out.getvalue())
+
+
+class ViewerLikedStateTest(TestCase):
+    def setUp(self):
+        from .models import Like
+        self.client = APIClient()
+        self.posts = [Post.objects.create(title=f'Post {i}', content='Body') for i in range(6)]
+        Like.objects.bulk_create([Like(post=post, user_id=7) for post in self.posts[::2]])
+        Like.objects.create(post=self.posts[1], user_id=8)
+
+    def _liked(self, **kwargs):
+        rows = self.client.get('/api/posts/', **kwargs).json()['results']
+        return {row['id'] for row in rows if row['liked']}
+
+    def test_viewer_from_user_id_or_bearer_token(self):
+        from django.core.signing import dumps
+        expected = {post.pk for post in self.posts[::2]}
+        self.assertEqual(self._liked(data={'user_id': 7}), expected)
+        token = dumps({'id': 7, 'username': 'grad', 'user_type': 'alumni'}, salt='user-auth-token')
+        self.assertEqual(self._liked(HTTP_AUTHORIZATION=f'Bearer {token}'), expected)
+        self.assertEqual(self._liked(), set())
+        detail = self.client.get(f'/api/posts/{self.posts[1].pk}/', {'user_id': 8}).json()
+        self.assertTrue(detail['liked'])
+
+    def test_liked_state_is_one_lookup_without_joins(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as anonymous:
+            self.client.get('/api/posts/')
+        with CaptureQueriesContext(connection) as viewer:
+            self.client.get('/api/posts/', {'user_id': 7})
+        self.assertEqual(len(viewer), len(anonymous) + 1)
+        self.assertNotIn('JOIN', viewer.captured_queries[0]['sql'].upper())
+
+    def test_toggle_uses_bearer_token(self):
+        from django.core.signing import dumps
+        from .models import Like
+        token = dumps({'id': 9, 'username': 'grad', 'user_type': 'alumni'}, salt='user-auth-token')
+        resp = self.client.post(f'/api/posts/{self.posts[0].pk}/likes/toggle/', {}, format='json', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(resp.status_code, 201)
+        self.assertTrue(Like.objects.filter(post=self.posts[0], user_id=9).exists())
+
+
+class LikeWriteTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.post = Post.objects.create(title='Popular', content='Body')
+        self.other = Post.objects.create(title='Other', content='Body')
+
+    def _toggle(self, post_id, user_id):
+        return self.client.post(f'/api/posts/{post_id}/likes/toggle/', {'user_id': user_id}, format='json')
+
+    def test_toggle_returns_state_and_count(self):
+        self.assertEqual(self._toggle(self.post.pk, 1).json(), {'liked': True, 'likes_count': 1})
+        resp = self._toggle(self.post.pk, 2)
+        self.assertEqual((resp.status_code, resp.json()), (201, {'liked': True, 'likes_count': 2}))
+        resp = self._toggle(self.post.pk, 1)
+        self.assertEqual((resp.status_code, resp.json()), (200, {'liked': False, 'likes_count': 1}))
+        self.assertEqual(self._toggle(999999, 1).status_code, 404)
+
+    def test_like_that_lost_a_race_does_not_double_count(self):
+        from unittest import mock
+        from . import likes
+        from .counters import adjust_post_counts
+        from .models import Like
+        insert_like = likes._insert_like
+
+        def concurrent_like_lands_first(post_id, user_id):
+            # Another request inserts and counts the same like between our
+            # DELETE and INSERT
+            insert_like(post_id, user_id)
+            adjust_post_counts(post_id, likes=1)
+            return insert_like(post_id, user_id)
+
+        with mock.patch.object(likes, '_insert_like', side_effect=concurrent_like_lands_first):
+            self.assertEqual(likes.toggle_like(self.post.pk, 1), (True, 1))
+        self.assertEqual(Like.objects.filter(post=self.post).count(), 1)
+        self.assertEqual(counter_drift(), {})
+        with self.assertRaises(Post.DoesNotExist):
+            likes.toggle_like(999999, 1)
+        self.assertFalse(Like.objects.filter(post_id=999999).exists())
+
+    def test_toggle_statements_with_and_without_update_returning(self):
+        from unittest import mock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .likes import toggle_like
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(toggle_like(self.post.pk, 1), (True, 1))
+        # SAVEPOINT, DELETE, INSERT, UPDATE ... RETURNING, RELEASE
+        self.assertEqual(len(ctx), 5)
+        self.assertIn('RETURNING', ctx.captured_queries[3]['sql'])
+        # MySQL has no UPDATE ... RETURNING and reads the count back
+        with mock.patch.object(type(connection.features), 'can_return_columns_from_insert', new_callable=mock.PropertyMock, return_value=False):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(toggle_like(self.post.pk, 2), (True, 2))
+                self.assertEqual(toggle_like(self.post.pk, 1), (False, 1))
+        sql = [query['sql'] for query in ctx.captured_queries]
+        self.assertEqual(len(sql), 11)
+        self.assertFalse([statement for statement in sql if 'RETURNING' in statement])
+        self.assertTrue(sql[4].startswith('SELECT'))
+        self.assertEqual(counter_drift(), {})
+
+    def test_batch_applies_last_operation_per_post(self):
+        from .models import Like
+        self._toggle(self.other.pk, 5)
+        resp = self.client.post('/api/posts/likes/batch/', {'user_id': 5, 'operations': [
+            {'post_id': self.post.pk, 'action': 'like'},
+            {'post_id': self.other.pk, 'action': 'unlike'},
+            {'post_id': self.post.pk, 'action': 'unlike'},
+            {'post_id': self.post.pk, 'action': 'like'},
+            {'post_id': 999999, 'action': 'like'},
+        ]}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), {
+            'results': [
+                {'post_id': self.post.pk, 'liked': True, 'likes_count': 1},
+                {'post_id': self.other.pk, 'liked': False, 'likes_count': 0},
+            ],
+            'not_found': [999999],
+        })
+        self.assertEqual(list(Like.objects.values_list('post_id', 'user_id')), [(self.post.pk, 5)])
+
+    def test_batch_statements_do_not_grow_with_posts(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .models import Like
+        posts = [self.post, self.other] + [Post.objects.create(title=f'Extra {i}', content='Body') for i in range(8)]
+        Like.objects.create(post=self.other, user_id=5)
+        Like.objects.create(post=posts[2], user_id=5)
+        reconcile_post_counters()
+        operations = [{'post_id': post.pk, 'action': 'unlike' if i % 3 == 1 else 'like'} for i, post in enumerate(posts)]
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post('/api/posts/likes/batch/', {'user_id': 5, 'operations': operations}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        # SAVEPOINT, lock, read likes, DELETE, INSERT, UPDATE, RELEASE
+        self.assertEqual(len(ctx), 7)
+        expected = {post.pk: i % 3 != 1 for i, post in enumerate(posts)}
+        self.assertEqual({row['post_id']: row['liked'] for row in resp.json()['results']}, expected)
+        self.assertEqual({row['post_id']: row['likes_count'] for row in resp.json()['results']}, {pk: int(liked) for pk, liked in expected.items()})
+        self.assertEqual(set(Like.objects.filter(user_id=5).values_list('post_id', flat=True)), {pk for pk, liked in expected.items() if liked})
+        self.assertEqual(counter_drift(), {})
+
+    def test_batch_validation(self):
+        url = '/api/posts/likes/batch/'
+        self.assertEqual(self.client.post(url, {'operations': [{'post_id': 1, 'action': 'like'}]}, format='json').status_code, 401)
+        resp = self.client.post(url, {'user_id': 5, 'operations': [{'post_id': self.post.pk, 'action': 'love'}]}, format='json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()['errors'][0]['index'], 0)
+        self.assertEqual(self.client.post(url, {'user_id': 5, 'operations': []}, format='json').status_code, 400)
+
+
+class QueryBudgetTest(TestCase):
+    """Every posts route stays within its QUERY_BUDGETS entry (posts/urls.py) on a realistically sized database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from users.models import Alumni
+        from .models import Like, PostImage
+        Alumni.objects.bulk_create([
+            Alumni(username=f'alumni{n}', email=f'alumni{n}@example.com', password='x', full_name=f'Alumni {n}', image=f'alumni_images/{n}.jpg')
+            for n in range(5)
+        ])
+        Post.objects.bulk_create([Post(title=f'Post {i}', content='Body ' * 20) for i in range(300)])
+        posts = list(Post.objects.order_by('id'))
+        PostImage.objects.bulk_create([
+            PostImage(post=post, image=f'post_images/{post.pk}_{n}.jpg') for post in posts for n in range(2)
+        ])
+        Comment.objects.bulk_create([
+            Comment(post=post, author_id=alumni_id, author_name='Guest', text='Congrats!')
+            for post in posts for alumni_id in Alumni.objects.values_list('id', flat=True)
+        ])
+        Like.objects.bulk_create([Like(post=post, user_id=n + 1) for post in posts for n in range(post.pk % 7)])
+        reconcile_post_counters()
+        cls.post = posts[0]
+        cls.doomed_post = posts[-1]
+        cls.comment = Comment.objects.filter(post=cls.post).first()
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        self.client = APIClient()
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        overrides = override_settings(MEDIA_ROOT=self.media.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def _image(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        gif = b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+        return SimpleUploadedFile('photo.gif', gif, content_type='image/gif')
+
+    def _requests(self):
+        post, comment = self.post, self.comment
+        return [
+            ('post-list-create', 'GET', {}, None, 'json'),
+            ('post-list-create', 'GET', {}, {'page_size': 20}, 'json'),
+            ('post-list-create', 'GET', {}, {'page_size': 20, 'user_id': 3}, 'json'),
+            ('post-list-create', 'POST', {}, {'title': 'New', 'content': 'Hello', 'images': [self._image()]}, 'multipart'),
+            ('post-comments', 'GET', {'post_id': post.pk}, None, 'json'),
+            ('post-comments', 'POST', {'post_id': post.pk}, {'author_id': 3, 'author_name': 'Alumni 3', 'text': 'Nice'}, 'json'),
+            ('post-comment-detail', 'GET', {'post_id': post.pk, 'pk': comment.pk}, None, 'json'),
+            ('post-like-toggle', 'POST', {'post_id': post.pk}, {'user_id': 99}, 'json'),
+            ('post-like-batch', 'POST', {}, {'user_id': 99, 'operations': [
+                {'post_id': post.pk, 'action': 'unlike'}, {'post_id': post.pk + 1, 'action': 'like'}, {'post_id': post.pk + 2, 'action': 'like'},
+            ]}, 'json'),
+            ('post-detail', 'GET', {'post_id': post.pk}, None, 'json'),
+            ('post-detail', 'PATCH', {'post_id': post.pk}, {'title': 'Edited', 'images': [self._image()]}, 'multipart'),
+            ('post-comment-detail', 'DELETE', {'post_id': post.pk, 'pk': comment.pk}, {'author_id': comment.author_id}, 'json'),
+            ('post-detail', 'DELETE', {'post_id': self.doomed_post.pk}, None, 'json'),
+        ]
+
+    def test_routes_stay_within_query_budgets(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from .urls import QUERY_BUDGETS
+        for name, method, kwargs, data, fmt in self._requests():
+            with self.subTest(route=name, method=method):
+                budget = QUERY_BUDGETS[name][method]
+                url = reverse(name, kwargs=kwargs)
+                send = getattr(self.client, method.lower())
+                with CaptureQueriesContext(connection) as ctx:
+                    if method == 'GET':
+                        resp = send(url, data)
+                    else:
+                        resp = send(url, data, format=fmt)
+                self.assertLess(resp.status_code, 400, resp.content[:200])
+                self.assertLessEqual(
+                    len(ctx), budget,
+                    f'{method} {name} ran {len(ctx)} queries (budget {budget}):\n' + '\n'.join(query['sql'][:160] for query in ctx.captured_queries),
+                )
+
+    def test_every_route_has_a_budget(self):
+        from .urls import QUERY_BUDGETS, urlpatterns
+        names = {pattern.name for pattern in urlpatterns if pattern.name}
+        self.assertEqual(names, set(QUERY_BUDGETS))
+        exercised = {(name, method) for name, method, _, _, _ in self._requests()}
+        budgeted = {(name, method) for name, methods in QUERY_BUDGETS.items() for method in methods}
+        self.assertEqual(budgeted - exercised, set())
@@ -1,12 +1,30 @@
 from django.urls import path
 from .views import PostListCreateView, PostDetailView
 from .comment_views import CommentListCreateView, CommentDetailView
-from .views import LikeToggleView
+from .views import LikeToggleView, LikeBatchView
 
 urlpatterns = [
     path('posts/', PostListCreateView.as_view(), name='post-list-create'),
     path('posts/<int:post_id>/comments/', CommentListCreateView.as_view(), name='post-comments'),
     path('posts/<int:post_id>/comments/<int:pk>/', CommentDetailView.as_view(), name='post-comment-detail'),
     path('posts/<int:post_id>/likes/toggle/', LikeToggleView.as_view(), name='post-like-toggle'),
+    path('posts/likes/batch/', LikeBatchView.as_view(), name='post-like-batch'),
     path('posts/<int:post_id>/', PostDetailView.as_view(), name='post-detail'),
 ]
+
+# Maximum number of database queries each route may run per request, by HTTP
+# method. Enforced by QueryBudgetTest in posts/tests.py against a seeded
+# database of realistic size, so an N+1 query shows up as a test failure.
+# Every named route above needs an entry; raise a budget only together with
+# the change that needs it. Under the test runner every atomic block also
+# counts a SAVEPOINT and a RELEASE.
+QUERY_BUDGETS = {
+    'post-list-create': {'GET': 5, 'POST': 5},
+    'post-comments': {'GET': 2, 'POST': 6},
+    'post-comment-detail': {'GET': 2, 'DELETE': 5},
+    # One more on MySQL, which has no UPDATE ... RETURNING and reads the count back
+    'post-like-toggle': {'POST': 5},
+    # Lock, read likes, DELETE, INSERT, UPDATE, however many posts are queued
+    'post-like-batch': {'POST': 7},
+    'post-detail': {'GET': 4, 'PATCH': 8, 'DELETE': 7},
+}
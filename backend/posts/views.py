@@ -1,9 +1,11 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Count, Q, Value, IntegerField
-from .models import Post, PostImage, Like
+from django.db.models import Prefetch
+from .models import Post, PostImage, Comment
+from .likes import MAX_BATCH_OPERATIONS, apply_like_operations, toggle_like
 from .serializers import PostSerializer, LikeSerializer
+from alumni_backend.pagination import KeysetPagination
 from rest_framework import generics, permissions
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
@@ -25,25 +27,67 @@ def _get_acting_role(request):
     return None
 
 
+# Newest comments embedded per post in the feed
+FEED_COMMENT_PREVIEWS = 3
+
+
+def get_viewer_id(request):
+    """Id of the alumni viewing or liking posts, or None for anonymous visitors.
+
+    Taken from the signed bearer token issued at login when present, else from
+    the client-supplied `user_id` (query string or body) that the like toggle
+    has always accepted.
+    """
+    auth = request.META.get('HTTP_AUTHORIZATION', '')
+    if auth.lower().startswith('bearer '):
+        from users.views import validate_token
+        ok, payload = validate_token(auth.split(' ', 1)[1].strip())
+        if ok and isinstance(payload, dict) and payload.get('id'):
+            try:
+                return int(payload['id'])
+            except (TypeError, ValueError):
+                pass
+    # fallback to client-provided userId (not ideal) — keep for backward compatibility
+    sources = [request.query_params]
+    if isinstance(request.data, dict):
+        sources.insert(0, request.data)
+    for source in sources:
+        try:
+            value = int(source.get('user_id') or source.get('author_id'))
+        except (TypeError, ValueError):
+            continue
+        if value:
+            return value
+    return None
+
+
+class PostFeedPagination(KeysetPagination):
+    # Every post embeds its images and comment previews, so pages are kept
+    # small; clients scroll by following `next`
+    page_size = 20
+    max_page_size = 50
+
+
 class PostListCreateView(generics.ListCreateAPIView):
     serializer_class = PostSerializer
     parser_classes = (MultiPartParser, FormParser)
+    pagination_class = PostFeedPagination
 
     def get_queryset(self):
-        # annotate with likes_count and whether current user liked the post
-        user_id = None
-        try:
-            # Try DRF auth user id on request.user if available
-            if hasattr(self.request, 'user') and self.request.user and getattr(self.request.user, 'is_authenticated', False):
-                user_id = getattr(self.request.user, 'id', None)
-        except Exception:
-            user_id = None
-
-        qs = Post.objects.all().order_by('-created_at').annotate(
-            likes_count=Count('likes'),
-            liked=Count('likes', filter=Q(likes__user_id=user_id))
-        )
-        return qs
+        # likes_count / comments_count are columns on Post (posts/counters.py);
+        # `liked` is looked up for the viewer by PostListSerializer.
+        qs = Post.objects.all().order_by('-created_at')
+        # Nested images, and the newest FEED_COMMENT_PREVIEWS comments of each
+        # post, are loaded in one query each for the whole page (the sliced
+        # prefetch is done with a ROW_NUMBER() window per post).
+        previews = Comment.objects.order_by('-created_at', '-id')[:FEED_COMMENT_PREVIEWS]
+        return qs.prefetch_related('images', Prefetch('comments', queryset=previews, to_attr='comment_previews'))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['viewer_id'] = get_viewer_id(self.request)
+        return context
+
     def create(self, request, *args, **kwargs):
         title = request.data.get('title')
         content = request.data.get('content')
@@ -71,31 +115,65 @@ class LikeToggleView(generics.GenericAPIView):
     serializer_class = LikeSerializer
 
     def post(self, request, post_id):
-        # Allow both authenticated and token-based clients; prefer request.user.id
-        user_id = None
-        if hasattr(request, 'user') and getattr(request.user, 'is_authenticated', False):
-            user_id = getattr(request.user, 'id', None)
-        else:
-            # fallback to client-provided userId (not ideal) — keep for backward compatibility
-            try:
-                user_id = int(request.data.get('user_id') or request.data.get('author_id'))
-            except Exception:
-                user_id = None
+        user_id = get_viewer_id(request)
 
         if not user_id:
             return Response({'detail': 'Authentication required to like posts'}, status=status.HTTP_401_UNAUTHORIZED)
 
         try:
-            post = Post.objects.get(id=post_id)
+            liked, likes_count = toggle_like(post_id, user_id)
         except Post.DoesNotExist:
             return Response({'detail': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(
+            {'liked': liked, 'likes_count': likes_count},
+            status=status.HTTP_201_CREATED if liked else status.HTTP_200_OK,
+        )
+
+
+class LikeBatchView(generics.GenericAPIView):
+    """POST {"user_id": 5, "operations": [{"post_id": 1, "action": "like"}, ...]}
+
+    Applies like/unlike operations a client queued (e.g. while offline or
+    while a burst of clicks was debounced) in one request. Operations are
+    applied in order and only the last one per post takes effect. Returns the
+    resulting state per post: {"results": [{"post_id", "liked", "likes_count"}],
+    "not_found": [post ids]}.
+    """
+    serializer_class = LikeSerializer
 
-        like, created = Like.objects.get_or_create(post=post, user_id=user_id)
-        if not created:
-            # already exists: remove (toggle)
-            like.delete()
-            return Response({'liked': False}, status=status.HTTP_200_OK)
-        return Response({'liked': True}, status=status.HTTP_201_CREATED)
+    def post(self, request):
+        user_id = get_viewer_id(request)
+        if not user_id:
+            return Response({'detail': 'Authentication required to like posts'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        operations = request.data.get('operations') if isinstance(request.data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            return Response({'detail': 'operations must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return Response({'detail': f'At most {MAX_BATCH_OPERATIONS} operations per request'}, status=status.HTTP_400_BAD_REQUEST)
+        parsed = []
+        errors = []
+        for index, op in enumerate(operations):
+            action = op.get('action') if isinstance(op, dict) else None
+            try:
+                post_id = int(op.get('post_id'))
+            except (AttributeError, TypeError, ValueError):
+                post_id = None
+            if not post_id or action not in ('like', 'unlike'):
+                errors.append({'index': index, 'errors': 'Expected {"post_id": <int>, "action": "like" | "unlike"}'})
+                continue
+            parsed.append((post_id, action == 'like'))
+        if errors:
+            return Response({'detail': 'Invalid operations', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        states, missing = apply_like_operations(user_id, parsed)
+        return Response({
+            'results': [
+                {'post_id': post_id, 'liked': liked, 'likes_count': likes_count}
+                for post_id, (liked, likes_count) in states.items()
+            ],
+            'not_found': missing,
+        }, status=status.HTTP_200_OK)
 
 
 class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -109,9 +187,14 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = (permissions.AllowAny,)
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['viewer_id'] = get_viewer_id(self.request)
+        return context
+
     def get_object(self):
         post_id = self.kwargs.get('post_id')
-        return get_object_or_404(Post, id=post_id)
+        return get_object_or_404(Post.objects.prefetch_related('images', 'comments'), id=post_id)
 
     def patch(self, request, *args, **kwargs):
         post = self.get_object()
@@ -146,7 +229,9 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
         for f in files:
             PostImage.objects.create(post=post, image=f)
 
-        serializer = PostSerializer(post, context={'request': request})
+        # Drop the images prefetched by get_object so new uploads are included
+        post._prefetched_objects_cache.pop('images', None)
+        serializer = PostSerializer(post, context=self.get_serializer_context())
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request, *args, **kwargs):
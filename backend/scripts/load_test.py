@@ -0,0 +1,252 @@
+"""Concurrent load driver modelled on graduation-week traffic.
+
+Replays two kinds of virtual users against a running server
+(`python manage.py runserver`, gunicorn, ...):
+
+  graduates  log in, validate their token, submit a tracer survey, edit it,
+             then browse the posts feed, like a post and leave a comment
+  admins     keep the dashboard open, polling the survey aggregates and the
+             notifications list every few seconds
+
+Graduate accounts are created through the API before the run (use a fresh
+--prefix per run, or --skip-signup to reuse accounts from an earlier run
+with the same prefix). Only the standard library is used, so it can run
+from any machine that can reach the server.
+
+Example:
+    python scripts/load_test.py --base-url http://127.0.0.1:8000 --graduates 50 --admins 5 --duration 60
+
+Prints throughput, p50/p95/p99 latency and the error rate per flow step, and
+optionally writes them as JSON (--output).
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Stats:
+    """Thread-safe latency/error samples per flow step."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, step, seconds, ok):
+        with self.lock:
+            self.samples.setdefault(step, []).append(seconds)
+            if not ok:
+                self.errors[step] = self.errors.get(step, 0) + 1
+
+    def summary(self, wall_seconds):
+        rows = {}
+        with self.lock:
+            for step, samples in sorted(self.samples.items()):
+                ordered = sorted(samples)
+                errors = self.errors.get(step, 0)
+                rows[step] = {
+                    'requests': len(ordered),
+                    'errors': errors,
+                    'error_rate': round(errors / len(ordered), 4),
+                    'throughput_rps': round(len(ordered) / wall_seconds, 2) if wall_seconds else 0.0,
+                    'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+                    'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+                    'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+                    'max_ms': round(ordered[-1] * 1000, 2),
+                }
+        return rows
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Client:
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.token = None
+
+    def request(self, step, method, path, payload=None, headers=None, ok_statuses=(200, 201, 204)):
+        """Send one request, record its latency under `step` and return (status, parsed body)."""
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        all_headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if self.token:
+            all_headers['Authorization'] = f'Bearer {self.token}'
+        all_headers.update(headers or {})
+        req = urllib.request.Request(self.base_url + path, data=data, headers=all_headers, method=method)
+        start = time.perf_counter()
+        status, body = None, None
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                status = resp.status
+                body = resp.read()
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+            body = exc.read()
+        except (urllib.error.URLError, OSError):
+            status = None
+        elapsed = time.perf_counter() - start
+        self.stats.record(step, elapsed, status in ok_statuses)
+        try:
+            parsed = json.loads(body) if body else None
+        except ValueError:
+            parsed = None
+        return status, parsed
+
+
+def survey_payload(rng, alumni_id, index):
+    return {
+        'alumni': alumni_id,
+        'last_name': f'Load{index}',
+        'first_name': 'Graduate',
+        'year_graduated': str(rng.choice([2022, 2023, 2024, 2025])),
+        'course_program': rng.choice([
+            'Bachelor of Science in Information Technology (BSIT)',
+            'Bachelor of Science in Nursing (BSN)',
+            'Bachelor of Elementary Education (BEED)',
+        ]),
+        'employed_after_graduation': rng.choice(['yes', 'no']),
+        'employment_source': rng.choice(['Job fair', 'Online job portal', 'Referral']),
+        'job_difficulties': rng.sample(['Lack of experience', 'No openings', 'Salary', 'Location'], 2),
+        'has_own_business': rng.choice([True, False]),
+        'employment_records': [{'company_name': 'DOrSU', 'position_and_status': 'Staff (Contractual)'}],
+    }
+
+
+def graduate_flow(client, rng, username, password, index):
+    """One graduate session: sign in, submit and edit a survey, browse posts."""
+    status, body = client.request('login', 'POST', '/api/login/', {'username': username, 'password': password, 'user_type': 'alumni'})
+    if status != 200 or not body:
+        return
+    client.token = body.get('token')
+    alumni_id = body.get('id')
+    client.request('token-validate', 'POST', '/api/token/validate/', {'token': client.token})
+
+    status, survey = client.request('survey-create', 'POST', '/api/alumni-surveys/', survey_payload(rng, alumni_id, index))
+    if status == 201 and survey:
+        records = survey.get('employment_records') or []
+        for record in records:
+            record['position_and_status'] = 'Staff (Permanent)'
+        client.request('survey-update', 'PATCH', f'/api/alumni-surveys/{survey["id"]}/', {
+            'alumni': alumni_id,
+            'has_been_promoted': 'yes',
+            'employment_records': records,
+        })
+
+    status, posts = client.request('posts-feed', 'GET', '/api/posts/')
+    if isinstance(posts, dict):
+        posts = posts.get('results')
+    if posts:
+        post = rng.choice(posts)
+        client.request('like-toggle', 'POST', f'/api/posts/{post["id"]}/likes/toggle/', {'user_id': alumni_id})
+        client.request('comment', 'POST', f'/api/posts/{post["id"]}/comments/', {
+            'author_id': alumni_id, 'author_name': username, 'text': 'Congratulations to the class!',
+        })
+
+
+def admin_flow(client, rng, deadline, interval):
+    """Dashboard left open: poll aggregates and notifications until the deadline."""
+    while time.monotonic() < deadline:
+        client.request('aggregates-poll', 'GET', '/api/survey-aggregates/')
+        client.request('notifications-poll', 'GET', '/api/notifications/')
+        time.sleep(interval * rng.uniform(0.5, 1.5))
+
+
+def signup(base_url, stats, timeout, username, password):
+    client = Client(base_url, stats, timeout)
+    status, _ = client.request('signup', 'POST', '/api/alumni/', {
+        'username': username,
+        'email': f'{username}@loadtest.example.com',
+        'password': password,
+        'full_name': f'Load Test {username}',
+        'program_course': 'Bachelor of Science in Information Technology (BSIT)',
+        'year_graduated': 2024,
+    }, ok_statuses=(201,))
+    return status == 201
+
+
+def run(args):
+    stats = Stats()
+    usernames = [f'{args.prefix}{index}' for index in range(args.graduates)]
+    if not args.skip_signup:
+        with ThreadPoolExecutor(max_workers=min(args.concurrency, max(len(usernames), 1))) as pool:
+            created = sum(pool.map(lambda name: signup(args.base_url, stats, args.timeout, name, args.password), usernames))
+        print(f'Signed up {created}/{len(usernames)} graduate accounts')
+
+    run_stats = Stats()
+    start = time.monotonic()
+    deadline = start + args.duration
+
+    def graduate(index):
+        rng = random.Random(args.seed + index)
+        # Stagger arrivals over the ramp-up period
+        time.sleep(args.ramp_up * index / max(args.graduates, 1))
+        sessions = 0
+        while time.monotonic() < deadline and (not args.sessions or sessions < args.sessions):
+            graduate_flow(Client(args.base_url, run_stats, args.timeout), rng, usernames[index], args.password, index)
+            sessions += 1
+            time.sleep(args.think_time * rng.uniform(0.5, 1.5))
+
+    def admin(index):
+        rng = random.Random(args.seed * 1000 + index)
+        admin_flow(Client(args.base_url, run_stats, args.timeout), rng, deadline, args.poll_interval)
+
+    with ThreadPoolExecutor(max_workers=args.graduates + args.admins) as pool:
+        futures = [pool.submit(graduate, index) for index in range(args.graduates)]
+        futures += [pool.submit(admin, index) for index in range(args.admins)]
+        for future in futures:
+            future.result()
+    wall = time.monotonic() - start
+
+    summary = run_stats.summary(wall)
+    total = sum(row['requests'] for row in summary.values())
+    errors = sum(row['errors'] for row in summary.values())
+    print(f'\n{total} requests in {wall:.1f}s ({total / wall:.1f} req/s), {errors} errors')
+    print(f'{"flow step":<20}{"requests":>9}{"req/s":>8}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"errors":>8}{"err %":>7}')
+    for step, row in summary.items():
+        print(
+            f'{step:<20}{row["requests"]:>9}{row["throughput_rps"]:>8.1f}{row["p50_ms"]:>9.1f}'
+            f'{row["p95_ms"]:>9.1f}{row["p99_ms"]:>9.1f}{row["errors"]:>8}{row["error_rate"] * 100:>7.1f}'
+        )
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'base_url': args.base_url, 'graduates': args.graduates, 'admins': args.admins,
+                'duration_s': round(wall, 2), 'requests': total, 'errors': errors, 'steps': summary,
+            }, handle, indent=2)
+        print(f'Wrote {args.output}')
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--graduates', type=int, default=20, help='Concurrent graduate virtual users')
+    parser.add_argument('--admins', type=int, default=3, help='Concurrent admin dashboards polling')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+    parser.add_argument('--sessions', type=int, default=0, help='Stop each graduate after this many sessions (0 = until --duration)')
+    parser.add_argument('--ramp-up', type=float, default=5.0, help='Seconds over which graduates start')
+    parser.add_argument('--think-time', type=float, default=1.0, help='Mean pause between graduate sessions')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Mean dashboard polling interval')
+    parser.add_argument('--prefix', default=f'load{int(time.time())}_', help='Username prefix for graduate accounts')
+    parser.add_argument('--password', default='load-test-password')
+    parser.add_argument('--skip-signup', action='store_true', help='Reuse existing accounts with --prefix')
+    parser.add_argument('--concurrency', type=int, default=20, help='Parallel requests during signup')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write the per-step summary as JSON')
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Database-side aggregation for the survey dashboard charts.
+
+SurveyAggregatesView used to walk the survey table once per chart dimension
+and count values in Python. The helpers here let the database do the counting:
+one GROUP BY over every scalar chart column returns a row per distinct
+combination, and those rows are folded into the per-dimension dicts the
+frontend expects. Job difficulties are counted from the SurveyJobDifficulty
+side table, which mirrors each survey's JSON list one tag per row.
+"""
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import AlumniSurvey, SurveyJobDifficulty
+
+
+# (payload key, AlumniSurvey field, label used for empty/NULL values)
+SURVEY_DIMENSIONS = (
+	('employed', 'employed_after_graduation', 'Unknown'),
+	('sources', 'employment_source', 'Unknown'),
+	('performance', 'work_performance_rating', 'Unrated'),
+	('programs', 'course_program', 'Unknown'),
+	('promoted', 'has_been_promoted', 'Unknown'),
+	('jobs_related', 'jobs_related_to_experience', 'Unknown'),
+)
+
+
+def has_own_business_label(value):
+	"""Normalize a stored has_own_business value to 'Yes' or 'No'.
+
+	NULL and unrecognised values count as 'No' so self-employment is never
+	overstated.
+	"""
+	if value is None:
+		return 'No'
+	if isinstance(value, bool):
+		return 'Yes' if value else 'No'
+	if str(value).strip().lower() in ('yes', 'y', 'true', 't', '1'):
+		return 'Yes'
+	return 'No'
+
+
+def job_difficulty_tags(value):
+	"""Return the individual difficulty tags stored in a job_difficulties value.
+
+	The column normally holds a JSON list, but older rows may carry a
+	comma-separated string.
+	"""
+	if not value:
+		return []
+	if isinstance(value, (list, tuple)):
+		return [item for item in value if item]
+	return [part.strip() for part in str(value).split(',') if part.strip()]
+
+
+def sync_job_difficulty_tags(survey):
+	"""Replace the SurveyJobDifficulty rows for `survey` with its current tags."""
+	with transaction.atomic():
+		SurveyJobDifficulty.objects.filter(survey=survey).delete()
+		SurveyJobDifficulty.objects.bulk_create([
+			SurveyJobDifficulty(survey=survey, tag=str(tag)[:255])
+			for tag in job_difficulty_tags(survey.job_difficulties)
+		])
+
+
+def rebuild_job_difficulty_tags(batch_size=1000):
+	"""Regenerate the whole SurveyJobDifficulty table from the surveys' JSON lists.
+
+	Returns the number of tag rows written.
+	"""
+	written = 0
+	with transaction.atomic():
+		SurveyJobDifficulty.objects.all().delete()
+		last_pk = 0
+		while True:
+			batch = list(
+				AlumniSurvey.objects.filter(pk__gt=last_pk)
+				.order_by('pk')
+				.values_list('pk', 'job_difficulties')[:batch_size]
+			)
+			if not batch:
+				break
+			tags = [
+				SurveyJobDifficulty(survey_id=survey_id, tag=str(tag)[:255])
+				for survey_id, value in batch
+				for tag in job_difficulty_tags(value)
+			]
+			SurveyJobDifficulty.objects.bulk_create(tags, batch_size=batch_size)
+			written += len(tags)
+			last_pk = batch[-1][0]
+	return written
+
+
+def job_difficulty_counts(qs=None, by_program=False):
+	"""Count difficulty tags with one GROUP BY over SurveyJobDifficulty.
+
+	`qs` optionally restricts the surveys counted. Returns {tag: n}, or
+	{course_program: {tag: n}} when `by_program` is set.
+	"""
+	tags = SurveyJobDifficulty.objects.order_by()
+	if qs is not None:
+		tags = tags.filter(survey__in=qs.order_by().values('pk'))
+	if not by_program:
+		return dict(tags.values_list('tag').annotate(n=Count('id')))
+	counts = {}
+	for program, tag, n in tags.values_list('survey__course_program', 'tag').annotate(n=Count('id')):
+		bucket = counts.setdefault(program or 'Unknown', {})
+		bucket[tag] = bucket.get(tag, 0) + n
+	return counts
+
+
+def _month_start():
+	now = timezone.localtime(timezone.now())
+	return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def build_aggregates_payload(counts, has_counts, difficulty_counts, count, total_count, surveys_this_month):
+	"""Assemble the JSON body returned by /api/survey-aggregates/."""
+	return {
+		'employed': counts['employed'],
+		'sources': counts['sources'],
+		'performance': counts['performance'],
+		'programs': counts['programs'],
+		'promoted': counts['promoted'],
+		'jobs_related': counts['jobs_related'],
+		'self_employment': dict(has_counts),
+		'has_own_business': has_counts,
+		'job_difficulties': difficulty_counts,
+		'count': count,
+		'total_count': total_count,
+		'surveys_this_month': surveys_this_month,
+	}
+
+
+def compute_survey_aggregates(qs, filtered=True):
+	"""Compute the dashboard aggregates for the surveys in `qs`.
+
+	Runs one grouped query for the scalar dimensions and one over the job
+	difficulty tag table. When `filtered` is False, `qs` is taken to be the whole
+	table and the unfiltered totals are read from the grouped rows; otherwise
+	a single extra aggregate query computes them.
+	"""
+	month_filter = Q(created_at__gte=_month_start())
+	fields = [field for _, field, _ in SURVEY_DIMENSIONS]
+	rows = (
+		qs.order_by()
+		.values(*fields, 'has_own_business')
+		.annotate(n=Count('id'), this_month=Count('id', filter=month_filter))
+	)
+
+	counts = {key: {} for key, _, _ in SURVEY_DIMENSIONS}
+	has_counts = {'Yes': 0, 'No': 0}
+	count = 0
+	this_month = 0
+	for row in rows:
+		n = row['n']
+		count += n
+		this_month += row['this_month']
+		for key, field, empty_label in SURVEY_DIMENSIONS:
+			label = row[field] or empty_label
+			counts[key][label] = counts[key].get(label, 0) + n
+		has_counts[has_own_business_label(row['has_own_business'])] += n
+
+	difficulty_counts = job_difficulty_counts(qs)
+
+	if filtered:
+		totals = AlumniSurvey.objects.aggregate(total=Count('id'), this_month=Count('id', filter=month_filter))
+		total_count = totals['total']
+		this_month = totals['this_month']
+	else:
+		total_count = count
+
+	return build_aggregates_payload(counts, has_counts, difficulty_counts, count, total_count, this_month)
@@ -0,0 +1,176 @@
+"""Bulk import of registrar alumni rosters (see `manage.py import_alumni`).
+
+The roster CSV has "Full Name", "Course" and "Year Graduated" columns. It is
+read row by row and upserted into Alumni in fixed-size batches, so only one
+batch of rows (plus the usernames seen so far) is held in memory however long
+the file is.
+
+Accounts are keyed by a username derived from the row itself (name, year and
+course code), which makes re-importing the same roster, or a newer export of
+it, update the existing accounts instead of creating duplicates. A fingerprint
+of every row written is kept in AlumniImportLedger, so a re-import only reads
+the ledger for rows that have not changed and writes nothing for them.
+
+Rows that derive the same username as an earlier row of the roster (same name,
+year and course) would all land on one account; only the first is imported and
+the rest are reported as duplicates.
+"""
+import csv
+import hashlib
+import re
+import secrets
+import unicodedata
+
+from django.db import connection, transaction
+
+from .author_cache import invalidate_authors
+from .models import Alumni, AlumniImportLedger, parse_graduation_year
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_EMAIL_DOMAIN = 'alumni.dorsu.edu.ph'
+# Columns refreshed when a row matches an existing account. The password and
+# email are only set on first import, so an address the alumnus changed
+# afterwards is kept.
+UPSERT_FIELDS = ['full_name', 'program_course', 'year_graduated']
+
+
+def _slug(value, separator='.'):
+	ascii_value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
+	return separator.join(re.findall(r'[a-z0-9]+', ascii_value.lower()))
+
+
+def course_code(course):
+	"""Short code for a course name: the trailing "(BSBio)" part, else its initials."""
+	match = re.search(r'\(([^()]+)\)\s*$', course or '')
+	if match:
+		return _slug(match.group(1), '')
+	return ''.join(word[0] for word in re.findall(r'[a-z0-9]+', (course or '').lower()))
+
+
+def derive_username(full_name, year, course):
+	"""Deterministic username for a roster row, e.g. 'rico.dizon.2019.bspsychology'."""
+	parts = [_slug(full_name)]
+	if year:
+		parts.append(str(year))
+	code = course_code(course)
+	if code:
+		parts.append(code)
+	return '.'.join(part for part in parts if part)[:150]
+
+
+def row_fingerprint(full_name, course, year):
+	"""Content hash of a roster row.
+
+	Case matters, so a capitalisation fix is imported; whitespace has already
+	been collapsed by iter_roster_rows.
+	"""
+	normalized = '|'.join(str(value or '') for value in (full_name, course, year))
+	return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def iter_roster_rows(path):
+	"""Yield (line number, full name, course, year) for each CSV row, streaming the file."""
+	with open(path, newline='', encoding='utf-8-sig') as handle:
+		for line, row in enumerate(csv.DictReader(handle), start=2):
+			yield (
+				line,
+				' '.join((row.get('Full Name') or '').split()),
+				' '.join((row.get('Course') or '').split()),
+				(row.get('Year Graduated') or '').strip(),
+			)
+
+
+def alumni_from_row(full_name, course, year, email_domain=DEFAULT_EMAIL_DOMAIN, password=None):
+	"""Build an unsaved Alumni for a roster row, or return None when the row has no name."""
+	if not full_name:
+		return None
+	year_value = parse_graduation_year(year)
+	username = derive_username(full_name, year_value, course)
+	return Alumni(
+		username=username,
+		email=f'{username}@{email_domain}'[:254],
+		# Imported accounts get a random password unless one is given; it is
+		# never overwritten by later imports.
+		password=password or secrets.token_urlsafe(12),
+		full_name=full_name[:255],
+		program_course=course[:255],
+		year_graduated=year_value,
+	)
+
+
+def _upsert(batch, fingerprints):
+	"""Insert or update one batch and record its fingerprints; returns (inserted, updated)."""
+	usernames = [alumni.username for alumni in batch]
+	existing = set(Alumni.objects.filter(username__in=usernames).values_list('username', flat=True))
+	options = {'update_conflicts': True}
+	if connection.features.supports_update_conflicts_with_target:
+		options['unique_fields'] = ['username']
+	with transaction.atomic():
+		Alumni.objects.bulk_create(batch, update_fields=UPSERT_FIELDS, **options)
+		# bulk_create cannot return the ids of updated rows (nor any ids on MySQL)
+		ids = dict(Alumni.objects.filter(username__in=usernames).values_list('username', 'id'))
+		AlumniImportLedger.objects.bulk_create(
+			[AlumniImportLedger(username=username, alumni_id=ids[username], fingerprint=fingerprints[username]) for username in usernames],
+			update_fields=['alumni', 'fingerprint', 'imported_at'],
+			**options,
+		)
+		# bulk_create sends no post_save, so drop renamed authors by hand
+		invalidate_authors([ids[username] for username in existing])
+	return len(batch) - len(existing), len(existing)
+
+
+def import_alumni_roster(path, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, email_domain=DEFAULT_EMAIL_DOMAIN, password=None, progress=None):
+	"""Stream the roster at `path` into Alumni. Returns a dict of counts.
+
+	Rows whose fingerprint matches the ledger entry from a previous import are
+	counted as skipped and not written; rows repeating an earlier row's
+	username are counted as duplicates. `progress`, when given, is called with
+	the running counts after each batch. With `dry_run` nothing is written, but
+	rows are still parsed and matched against existing accounts so the counts
+	show what an import would do.
+	"""
+	counts = {'rows': 0, 'inserted': 0, 'updated': 0, 'skipped': 0, 'invalid': 0, 'duplicates': 0}
+	seen = set()
+	pending = {}
+	fingerprints = {}
+
+	def flush():
+		if not pending:
+			return
+		ledger = dict(AlumniImportLedger.objects.filter(username__in=list(pending)).values_list('username', 'fingerprint'))
+		batch = []
+		for username, alumni in pending.items():
+			if ledger.get(username) == fingerprints[username]:
+				counts['skipped'] += 1
+			else:
+				batch.append(alumni)
+		if batch and dry_run:
+			existing = Alumni.objects.filter(username__in=[alumni.username for alumni in batch]).count()
+			inserted, updated = len(batch) - existing, existing
+		elif batch:
+			inserted, updated = _upsert(batch, fingerprints)
+		else:
+			inserted = updated = 0
+		counts['inserted'] += inserted
+		counts['updated'] += updated
+		pending.clear()
+		fingerprints.clear()
+		if progress:
+			progress(dict(counts))
+
+	for _, full_name, course, year in iter_roster_rows(path):
+		counts['rows'] += 1
+		alumni = alumni_from_row(full_name, course, year, email_domain=email_domain, password=password)
+		if alumni is None:
+			counts['invalid'] += 1
+			continue
+		if alumni.username in seen:
+			counts['duplicates'] += 1
+			continue
+		seen.add(alumni.username)
+		pending[alumni.username] = alumni
+		fingerprints[alumni.username] = row_fingerprint(full_name, course, year)
+		if len(pending) >= batch_size:
+			flush()
+	flush()
+	return counts
@@ -0,0 +1,146 @@
+"""Cached display info (name and avatar URL) of Alumni shown as authors.
+
+Comment threads and the posts feed show the same few active alumni over and
+over. Their (display name, image url) pairs are kept at two levels:
+
+- a small per-process LRU, checked first and costing no I/O at all;
+- the Django cache, shared by every worker process.
+
+Saving or deleting an Alumni drops its entry from both levels (see
+users/signals.py). The per-process level of *other* workers cannot be reached
+from a signal, so its entries also expire after AUTHOR_CACHE_LOCAL_TTL
+seconds, which bounds how long another worker can show an old name or avatar.
+
+Hits and misses are counted per level through alumni_backend.metrics
+(author_cache_hits_total / author_cache_misses_total on /api/metrics/).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from alumni_backend.metrics import increment
+
+from .models import Alumni
+
+KEY_PREFIX = 'author-info'
+# Cached for ids with no Alumni row, so unknown author ids are not looked up
+# again on every render
+MISSING = ('', None)
+
+_lock = threading.Lock()
+_local = OrderedDict()
+
+
+def _local_size():
+	return getattr(settings, 'AUTHOR_CACHE_LOCAL_SIZE', 1024)
+
+
+def _local_ttl():
+	return getattr(settings, 'AUTHOR_CACHE_LOCAL_TTL', 60)
+
+
+def _timeout():
+	return getattr(settings, 'AUTHOR_CACHE_TIMEOUT', 3600)
+
+
+def _key(alumni_id):
+	return f'{KEY_PREFIX}:{alumni_id}'
+
+
+def _local_get(alumni_id, now):
+	with _lock:
+		entry = _local.get(alumni_id)
+		if entry is None:
+			return None
+		expires, info = entry
+		if expires < now:
+			del _local[alumni_id]
+			return None
+		_local.move_to_end(alumni_id)
+		return info
+
+
+def _local_set(items, now):
+	expires = now + _local_ttl()
+	size = _local_size()
+	with _lock:
+		for alumni_id, info in items.items():
+			_local[alumni_id] = (expires, info)
+			_local.move_to_end(alumni_id)
+		while len(_local) > size:
+			_local.popitem(last=False)
+
+
+def _load(ids):
+	"""(display name, image url) for each id from the database, in one query."""
+	found = {
+		alumni.id: (alumni.full_name or alumni.username, alumni.image.url if alumni.image else None)
+		for alumni in Alumni.objects.filter(id__in=ids).only('id', 'full_name', 'username', 'image')
+	}
+	return {alumni_id: found.get(alumni_id, MISSING) for alumni_id in ids}
+
+
+def get_author_info(alumni_ids):
+	"""{alumni id: (display name, image url or None)} for the ids that exist.
+
+	Looks in the per-process LRU, then the shared cache, then runs a single
+	id__in query for whatever is left.
+	"""
+	ids = {alumni_id for alumni_id in alumni_ids if alumni_id}
+	if not ids:
+		return {}
+	now = time.monotonic()
+	result = {}
+	for alumni_id in ids:
+		info = _local_get(alumni_id, now)
+		if info is not None:
+			result[alumni_id] = info
+	if result:
+		increment('author_cache_hits_total', {'level': 'local'}, len(result))
+
+	missing = ids - result.keys()
+	if missing:
+		shared = cache.get_many([_key(alumni_id) for alumni_id in missing])
+		found = {alumni_id: tuple(shared[_key(alumni_id)]) for alumni_id in missing if _key(alumni_id) in shared}
+		if found:
+			increment('author_cache_hits_total', {'level': 'shared'}, len(found))
+			_local_set(found, now)
+			result.update(found)
+		missing -= found.keys()
+
+	if missing:
+		increment('author_cache_misses_total', {}, len(missing))
+		loaded = _load(missing)
+		cache.set_many({_key(alumni_id): info for alumni_id, info in loaded.items()}, _timeout())
+		_local_set(loaded, now)
+		result.update(loaded)
+
+	return {alumni_id: info for alumni_id, info in result.items() if info != MISSING}
+
+
+def invalidate_authors(alumni_ids):
+	"""Drop cached display info for these alumni from both levels.
+
+	The shared entries are deleted again once the surrounding transaction
+	commits, so a concurrent render that read the old row cannot leave it
+	cached.
+	"""
+	ids = [alumni_id for alumni_id in alumni_ids if alumni_id]
+	if not ids:
+		return
+	with _lock:
+		for alumni_id in ids:
+			_local.pop(alumni_id, None)
+	keys = [_key(alumni_id) for alumni_id in ids]
+	cache.delete_many(keys)
+	transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def clear_local():
+	"""Empty this process's LRU (the shared cache is left alone)."""
+	with _lock:
+		_local.clear()
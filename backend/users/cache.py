@@ -0,0 +1,54 @@
+"""Response caching for the survey dashboard endpoints.
+
+Cached entries are keyed by a survey data version stamp stored in the cache
+itself. Any write to AlumniSurvey or EmploymentRecord replaces the stamp (see
+users/signals.py), so every previously cached response becomes unreachable at
+once without having to enumerate filter combinations. Works with any Django
+cache backend, including local-memory and file-based caches.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+SURVEY_DATA_VERSION_KEY = 'survey-data-version'
+
+
+def survey_data_version():
+	"""Return the current survey data version stamp, creating one if needed."""
+	version = cache.get(SURVEY_DATA_VERSION_KEY)
+	if version is None:
+		cache.add(SURVEY_DATA_VERSION_KEY, time.time_ns(), None)
+		version = cache.get(SURVEY_DATA_VERSION_KEY)
+	return version
+
+
+def bump_survey_data_version():
+	"""Invalidate every cached survey response.
+
+	The stamp is replaced immediately and again once the surrounding
+	transaction commits, so a reader that recomputed from pre-commit data in
+	between cannot leave a stale entry under the new stamp.
+	"""
+	cache.set(SURVEY_DATA_VERSION_KEY, time.time_ns(), None)
+	transaction.on_commit(lambda: cache.set(SURVEY_DATA_VERSION_KEY, time.time_ns(), None))
+
+
+def survey_cache_key(prefix, *parts):
+	"""Build a cache key for a survey response under the current version stamp.
+
+	`parts` are the normalized request filters; they are hashed so arbitrary
+	program names are safe in keys. The current month is included because
+	`surveys_this_month` rolls over with it.
+	"""
+	raw = '|'.join('' if part is None else str(part) for part in parts)
+	digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+	month = timezone.localtime(timezone.now()).strftime('%Y-%m')
+	return f'{prefix}:{survey_data_version()}:{month}:{digest}'
+
+
+def survey_cache_timeout():
+	return getattr(settings, 'SURVEY_AGGREGATES_CACHE_TIMEOUT', 300)
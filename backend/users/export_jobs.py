@@ -0,0 +1,234 @@
+"""Background survey exports (see ExportJob).
+
+A POST to /api/survey-exports/ records an ExportJob and hands it to a small
+in-process thread pool (or, with EXPORT_JOBS_RUN_IN_PROCESS = False, leaves it
+for `manage.py run_export_jobs`). The worker writes the export under
+MEDIA_ROOT/survey_exports/ using the same chunked iterators as the streaming
+endpoint, updating the job's progress as it goes.
+
+Finished files are reused for identical requests (same format and normalized
+filters) for as long as the survey data version stamp they were built from is
+current and they are younger than EXPORT_JOBS_MAX_AGE. Every finished job
+purges the jobs and files that have expired, so in-process deployments do not
+need a separate cleanup task.
+
+A worker refreshes its job's heartbeat while writing. If the worker dies
+(process recycled, killed, redeployed), the job stops beating and, after
+EXPORT_JOBS_STALE_AFTER seconds, is marked failed rather than handed out
+forever; identical requests then start a new job.
+"""
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import survey_data_version
+from .exports import CHUNK_SIZE, filter_surveys, iter_export_lines, normalize_export_filters
+from .models import AlumniSurvey, ExportJob
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = 'survey_exports'
+
+_executor = None
+
+
+def export_jobs_max_age():
+	return timedelta(seconds=getattr(settings, 'EXPORT_JOBS_MAX_AGE', 3600))
+
+
+def export_jobs_stale_after():
+	return timedelta(seconds=getattr(settings, 'EXPORT_JOBS_STALE_AFTER', 300))
+
+
+def _stale_jobs_q():
+	cutoff = timezone.now() - export_jobs_stale_after()
+	stale = Q(status=ExportJob.STATUS_RUNNING) & (Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, created_at__lt=cutoff))
+	if getattr(settings, 'EXPORT_JOBS_RUN_IN_PROCESS', True):
+		# The thread pool lives in the web process: a job still queued this
+		# long was lost with the process that accepted it. A separate
+		# run_export_jobs worker picks queued jobs up whenever it gets to them.
+		stale |= Q(status=ExportJob.STATUS_QUEUED, created_at__lt=cutoff)
+	return stale
+
+
+def fail_stale_export_jobs(ids=None):
+	"""Mark queued/running jobs whose worker is gone as failed. Returns how many."""
+	qs = ExportJob.objects.filter(_stale_jobs_q())
+	if ids is not None:
+		qs = qs.filter(pk__in=ids)
+	return qs.update(status=ExportJob.STATUS_FAILED, error='Export worker stopped responding', finished_at=timezone.now())
+
+
+def _is_stale(job):
+	cutoff = timezone.now() - export_jobs_stale_after()
+	if job.status == ExportJob.STATUS_RUNNING:
+		return (job.heartbeat_at or job.created_at) < cutoff
+	if job.status == ExportJob.STATUS_QUEUED:
+		return getattr(settings, 'EXPORT_JOBS_RUN_IN_PROCESS', True) and job.created_at < cutoff
+	return False
+
+
+def export_filter_hash(export_format, filters):
+	"""Stable hash of an export request, used to find reusable jobs."""
+	raw = json.dumps({'format': export_format, 'filters': filters}, sort_keys=True)
+	return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _artifact_path(name):
+	return os.path.join(settings.MEDIA_ROOT, name)
+
+
+def artifact_is_valid(job):
+	"""Whether a finished job's file can still be served for a new request."""
+	if job.status != ExportJob.STATUS_DONE or not job.file:
+		return False
+	if job.data_version != str(survey_data_version()):
+		return False
+	if job.finished_at is None or job.finished_at < timezone.now() - export_jobs_max_age():
+		return False
+	return os.path.exists(_artifact_path(job.file.name))
+
+
+def find_reusable_job(filter_hash):
+	"""Return a live queued/running job or a still-valid finished one for `filter_hash`.
+
+	Stale jobs met along the way are marked failed.
+	"""
+	candidates = ExportJob.objects.filter(
+		filter_hash=filter_hash,
+		status__in=[ExportJob.STATUS_QUEUED, ExportJob.STATUS_RUNNING, ExportJob.STATUS_DONE],
+	).order_by('-created_at')[:5]
+	stale = []
+	found = None
+	for job in candidates:
+		if _is_stale(job):
+			stale.append(job.pk)
+		elif job.status != ExportJob.STATUS_DONE or artifact_is_valid(job):
+			found = job
+			break
+	if stale:
+		fail_stale_export_jobs(stale)
+	return found
+
+
+def _get_executor():
+	global _executor
+	if _executor is None:
+		_executor = ThreadPoolExecutor(
+			max_workers=getattr(settings, 'EXPORT_JOBS_WORKERS', 2),
+			thread_name_prefix='survey-export',
+		)
+	return _executor
+
+
+def request_export(export_format, params):
+	"""Return (job, created) for an export of the surveys selected by `params`.
+
+	An in-progress or still-valid finished job for the same request is
+	returned as-is; otherwise a new job is queued.
+	"""
+	filters = normalize_export_filters(params)
+	filter_hash = export_filter_hash(export_format, filters)
+	job = find_reusable_job(filter_hash)
+	if job is not None:
+		return job, False
+	job = ExportJob.objects.create(format=export_format, filters=filters, filter_hash=filter_hash)
+	if getattr(settings, 'EXPORT_JOBS_RUN_IN_PROCESS', True):
+		# Start only once the job row is visible to the worker's connection
+		transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.pk))
+	return job, True
+
+
+def _run_in_thread(job_id):
+	try:
+		run_export_job(job_id)
+	finally:
+		# Worker threads get their own connection; don't leak it
+		connection.close()
+
+
+def run_export_job(job_id):
+	"""Build the file for a queued job. Returns False if another worker claimed it."""
+	close_old_connections()
+	claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.STATUS_QUEUED).update(
+		status=ExportJob.STATUS_RUNNING, heartbeat_at=timezone.now(),
+	)
+	if not claimed:
+		return False
+	job = ExportJob.objects.get(pk=job_id)
+	# Taken before reading so a write during the export makes the artifact stale
+	data_version = str(survey_data_version())
+	name = f'{EXPORT_DIR}/{job.pk}.{job.format}'
+	path = _artifact_path(name)
+	partial = path + '.part'
+	try:
+		qs = filter_surveys(AlumniSurvey.objects.all(), job.filters)
+		ExportJob.objects.filter(pk=job.pk).update(total=qs.count(), heartbeat_at=timezone.now())
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		processed = 0
+		# CSV output starts with a header line that is not a survey
+		skip = 1 if job.format == 'csv' else 0
+		with open(partial, 'w', encoding='utf-8', newline='') as out:
+			for line in iter_export_lines(qs, job.format):
+				out.write(line)
+				if skip:
+					skip -= 1
+					continue
+				processed += 1
+				if processed % CHUNK_SIZE == 0:
+					ExportJob.objects.filter(pk=job.pk).update(processed=processed, heartbeat_at=timezone.now())
+		os.replace(partial, path)
+		ExportJob.objects.filter(pk=job.pk).update(
+			status=ExportJob.STATUS_DONE, processed=processed, file=name,
+			data_version=data_version, finished_at=timezone.now(),
+		)
+	except Exception as exc:
+		logger.exception('Survey export job %s failed', job.pk)
+		if os.path.exists(partial):
+			os.remove(partial)
+		ExportJob.objects.filter(pk=job.pk).update(
+			status=ExportJob.STATUS_FAILED, error=str(exc)[:1000], finished_at=timezone.now(),
+		)
+	try:
+		purge_export_jobs()
+	except Exception:
+		logger.exception('Purging expired survey exports failed')
+	return True
+
+
+def run_queued_export_jobs(limit=None):
+	"""Run queued jobs oldest first. Returns the number of jobs processed.
+
+	Jobs abandoned by a dead worker are marked failed first.
+	"""
+	fail_stale_export_jobs()
+	ran = 0
+	queued = ExportJob.objects.filter(status=ExportJob.STATUS_QUEUED).order_by('created_at').values_list('pk', flat=True)
+	for job_id in list(queued[:limit] if limit else queued):
+		if run_export_job(job_id):
+			ran += 1
+	return ran
+
+
+def purge_export_jobs():
+	"""Delete finished/failed jobs older than EXPORT_JOBS_MAX_AGE and their files."""
+	cutoff = timezone.now() - export_jobs_max_age()
+	stale = ExportJob.objects.filter(
+		status__in=[ExportJob.STATUS_DONE, ExportJob.STATUS_FAILED],
+		finished_at__lt=cutoff,
+	)
+	purged = 0
+	for job in stale:
+		if job.file and os.path.exists(_artifact_path(job.file.name)):
+			os.remove(_artifact_path(job.file.name))
+		job.delete()
+		purged += 1
+	return purged
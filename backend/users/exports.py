@@ -0,0 +1,150 @@
+"""Server-side survey export (CSV / NDJSON).
+
+Rows are produced lazily in primary-key ordered chunks so the export can be
+streamed (or written to a file) without ever holding the whole survey table,
+or the whole response body, in memory.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+
+from .aggregates import job_difficulty_tags
+from .models import AlumniSurvey, EmploymentRecord, normalize_program_key, program_key_q
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+CHUNK_SIZE = 500
+
+# Scalar AlumniSurvey columns included in every export, in column order.
+# job_difficulties and employment_records are flattened separately; the
+# derived graduation_year/program_key columns are left out.
+SURVEY_EXPORT_FIELDS = [
+	field.attname for field in AlumniSurvey._meta.concrete_fields
+	if field.name not in ('job_difficulties', 'graduation_year', 'program_key')
+]
+EMPLOYMENT_EXPORT_FIELDS = ['company_name', 'date_employed', 'position_and_status', 'monthly_salary_range']
+
+
+def normalize_export_filters(params):
+	"""Return the alumni/year/program filters in `params` in canonical form.
+
+	Invalid values are dropped (the endpoints ignore them too), so requests
+	that select the same surveys produce the same dict.
+	"""
+	filters = {}
+	for name in ('alumni', 'year'):
+		try:
+			if params.get(name) not in (None, ''):
+				filters[name] = int(params.get(name))
+		except (TypeError, ValueError):
+			pass
+	program = normalize_program_key(params.get('program'))
+	if program:
+		filters['program'] = program
+	return filters
+
+
+def filter_surveys(qs, params):
+	"""Apply the alumni/year/program filters shared by the survey list and export endpoints."""
+	filters = normalize_export_filters(params)
+	if 'alumni' in filters:
+		qs = qs.filter(alumni_id=filters['alumni'])
+	if 'year' in filters:
+		qs = qs.filter(graduation_year=filters['year'])
+	if 'program' in filters:
+		# Equality on the indexed normalized program key, or a substring
+		# match for partial program names
+		qs = qs.filter(program_key_q(filters['program'], AlumniSurvey))
+	return qs
+
+
+class _Echo:
+	"""File-like object whose write() just returns the value, for csv.writer."""
+
+	def write(self, value):
+		return value
+
+
+def export_queryset(qs):
+	"""Prepare a filtered survey queryset for export iteration."""
+	return qs.order_by('id').prefetch_related('employment_records')
+
+
+def _survey_dict(survey):
+	row = {name: getattr(survey, name) for name in SURVEY_EXPORT_FIELDS}
+	row['job_difficulties'] = [str(tag) for tag in job_difficulty_tags(survey.job_difficulties)]
+	row['employment_records'] = [
+		{name: getattr(record, name) for name in EMPLOYMENT_EXPORT_FIELDS}
+		for record in survey.employment_records.all()
+	]
+	return row
+
+
+def iter_survey_dicts(qs, chunk_size=CHUNK_SIZE):
+	"""Yield one flattened dict per survey, reading `chunk_size` rows at a time.
+
+	Chunks are fetched by primary-key range rather than with
+	QuerySet.iterator(): MySQLdb buffers a whole result set client-side, so a
+	single streaming cursor would not keep memory flat there.
+	"""
+	qs = export_queryset(qs)
+	last_pk = 0
+	while True:
+		chunk = list(qs.filter(pk__gt=last_pk)[:chunk_size])
+		for survey in chunk:
+			yield _survey_dict(survey)
+		if len(chunk) < chunk_size:
+			break
+		last_pk = chunk[-1].pk
+
+
+def max_employment_records(qs):
+	"""Largest number of employment records on any survey in `qs` (one query)."""
+	counts = (
+		EmploymentRecord.objects.filter(survey__in=qs.order_by().values('pk'))
+		.order_by()
+		.values('survey')
+		.annotate(n=Count('id'))
+		.aggregate(most=Max('n'))
+	)
+	return counts['most'] or 0
+
+
+def csv_header(record_slots):
+	header = list(SURVEY_EXPORT_FIELDS) + ['job_difficulties']
+	for slot in range(1, record_slots + 1):
+		header.extend(f'employment_{slot}_{name}' for name in EMPLOYMENT_EXPORT_FIELDS)
+	return header
+
+
+def iter_csv_lines(qs, chunk_size=CHUNK_SIZE):
+	"""Yield CSV text lines; employment records become numbered column groups."""
+	record_slots = max_employment_records(qs)
+	writer = csv.writer(_Echo())
+	yield writer.writerow(csv_header(record_slots))
+	for row in iter_survey_dicts(qs, chunk_size):
+		values = [row[name] for name in SURVEY_EXPORT_FIELDS]
+		values.append('; '.join(row['job_difficulties']))
+		for record in row['employment_records']:
+			values.extend(record[name] for name in EMPLOYMENT_EXPORT_FIELDS)
+		values.extend([''] * (len(EMPLOYMENT_EXPORT_FIELDS) * (record_slots - len(row['employment_records']))))
+		yield writer.writerow(['' if value is None else value for value in values])
+
+
+def iter_ndjson_lines(qs, chunk_size=CHUNK_SIZE):
+	"""Yield one JSON document per line, with employment records nested inline."""
+	for row in iter_survey_dicts(qs, chunk_size):
+		yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def iter_export_lines(qs, export_format, chunk_size=CHUNK_SIZE):
+	if export_format == 'ndjson':
+		return iter_ndjson_lines(qs, chunk_size)
+	return iter_csv_lines(qs, chunk_size)
+
+
+def export_content_type(export_format):
+	if export_format == 'ndjson':
+		return 'application/x-ndjson; charset=utf-8'
+	return 'text/csv; charset=utf-8'
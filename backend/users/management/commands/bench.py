@@ -0,0 +1,102 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from alumni_backend.bench import (
+    SCALES,
+    compare_to_baseline,
+    environment_info,
+    parse_scale,
+    run_scenarios,
+    seed_synthetic_data,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database with deterministic synthetic data and time the hot API endpoints. '
+        'Results are written as JSON and can be compared against a stored baseline run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='1k', help=f'Number of alumni: {", ".join(SCALES)} or an integer (default 1k)')
+        parser.add_argument('--seed', type=int, default=2024, help='Random seed for the synthetic data')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per scenario before timing')
+        parser.add_argument('--only', action='append', help='Run only this scenario (repeatable)')
+        parser.add_argument('--output', help='Write the results JSON to this file')
+        parser.add_argument('--baseline', help='Results JSON from an earlier run to compare against')
+        parser.add_argument('--threshold', type=float, default=10.0, help='Percent slowdown of a median that counts as a regression (default 10)')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit with an error when any scenario regressed')
+
+    def handle(self, *args, **options):
+        try:
+            alumni_count = parse_scale(options['scale'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as handle:
+                baseline = json.load(handle)
+
+        # Isolated, in-memory cache and no background export threads, so runs
+        # neither see nor leave behind state from the real deployment.
+        overrides = override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench'}},
+            ALLOWED_HOSTS=['testserver'],
+            EXPORT_JOBS_RUN_IN_PROCESS=False,
+        )
+        with overrides:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                started = timezone.now()
+                counts = seed_synthetic_data(alumni_count, seed=options['seed'], stdout=self.stdout)
+                self.stdout.write(f'Seeded in {(timezone.now() - started).total_seconds():.1f}s: {counts}')
+                results = run_scenarios(iterations=options['iterations'], warmup=options['warmup'], only=options['only'])
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'scale': options['scale'],
+            'alumni': alumni_count,
+            'seed': options['seed'],
+            'created_at': timezone.now().isoformat(),
+            'environment': environment_info(),
+            'counts': counts,
+            'results': results,
+        }
+
+        self.stdout.write(f'{"scenario":<28}{"status":>7}{"queries":>9}{"median ms":>12}{"p95 ms":>10}')
+        for name, row in results.items():
+            self.stdout.write(f'{name:<28}{row["status"]:>7}{row["queries"]:>9}{row["median_ms"]:>12.2f}{row["p95_ms"]:>10.2f}')
+
+        if options['output']:
+            os.makedirs(os.path.dirname(os.path.abspath(options['output'])), exist_ok=True)
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+
+        if baseline is None:
+            return
+        if baseline.get('alumni') != alumni_count or baseline.get('seed') != options['seed']:
+            self.stdout.write(self.style.WARNING('Baseline was recorded with a different scale or seed; timings are not comparable'))
+        comparison = compare_to_baseline(results, baseline, threshold=options['threshold'] / 100)
+        regressions = [row for row in comparison if row['regression']]
+        self.stdout.write(f'{"scenario":<28}{"baseline ms":>13}{"current ms":>12}{"change":>9}{"queries":>10}')
+        for row in comparison:
+            line = (
+                f'{row["scenario"]:<28}{row["baseline_ms"]:>13.2f}{row["current_ms"]:>12.2f}'
+                f'{row["change"]:>+9.1%}{row["baseline_queries"]!s:>5}->{row["queries"]!s:<4}'
+            )
+            self.stdout.write(self.style.ERROR(line) if row['regression'] else line)
+        if regressions:
+            message = f'{len(regressions)} scenario(s) regressed beyond {options["threshold"]:g}%'
+            if options['fail_on_regression']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
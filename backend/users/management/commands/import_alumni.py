@@ -0,0 +1,50 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.alumni_import import DEFAULT_BATCH_SIZE, DEFAULT_EMAIL_DOMAIN, import_alumni_roster
+
+
+class Command(BaseCommand):
+    help = 'Import (or refresh) alumni accounts from a roster CSV with "Full Name", "Course" and "Year Graduated" columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=os.path.join(settings.BASE_DIR, 'data', 'alumni_2000.csv'), help='Roster CSV (default: data/alumni_2000.csv)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per bulk upsert')
+        parser.add_argument('--dry-run', action='store_true', help='Parse and match rows but write nothing')
+        parser.add_argument('--email-domain', default=DEFAULT_EMAIL_DOMAIN, help='Domain for the derived email addresses')
+        parser.add_argument('--password', help='Initial password for new accounts (default: a random one per account)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No such file: {path}')
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be positive')
+
+        started = time.monotonic()
+
+        def progress(counts):
+            if options['verbosity'] < 1:
+                return
+            elapsed = time.monotonic() - started
+            rate = counts['rows'] / elapsed if elapsed else 0
+            self.stdout.write(f'{counts["rows"]} rows ({rate:,.0f}/s): {counts["inserted"]} new, {counts["updated"]} changed, {counts["skipped"]} unchanged, {counts["duplicates"]} duplicate')
+
+        counts = import_alumni_roster(
+            path,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            email_domain=options['email_domain'],
+            password=options['password'],
+            progress=progress,
+        )
+        elapsed = time.monotonic() - started
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {counts["rows"]} rows in {elapsed:.2f}s: {counts["inserted"]} inserted, '
+            f'{counts["updated"]} updated, {counts["skipped"]} skipped (unchanged), {counts["invalid"]} invalid, '
+            f'{counts["duplicates"]} duplicate'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.aggregates import rebuild_job_difficulty_tags
+
+
+class Command(BaseCommand):
+    help = 'Regenerate the SurveyJobDifficulty tag table from every survey\'s job_difficulties list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Surveys read and tags inserted per batch')
+
+    def handle(self, *args, **options):
+        written = rebuild_job_difficulty_tags(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} job difficulty tag row(s)'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from users.survey_counters import counter_drift, rebuild_survey_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the SurveyAggregateCounter table from the survey rows (backfill / drift repair)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report counters that disagree with the surveys; do not write')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk insert when rebuilding')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = counter_drift()
+            for (year, program, dimension, value), (stored, expected) in sorted(drift.items()):
+                self.stdout.write(f'{dimension}={value!r} year={year} program={program!r}: stored {stored}, expected {expected}')
+            if drift:
+                self.stdout.write(self.style.WARNING(f'{len(drift)} counter bucket(s) drifted'))
+            else:
+                self.stdout.write(self.style.SUCCESS('Survey counters are in sync'))
+            return
+
+        buckets = rebuild_survey_counters(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {buckets} survey counter bucket(s)'))
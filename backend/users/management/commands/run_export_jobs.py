@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.export_jobs import purge_export_jobs, run_queued_export_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued survey export jobs (for deployments with EXPORT_JOBS_RUN_IN_PROCESS = False)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs instead of exiting once the queue is empty')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+        parser.add_argument('--purge', action='store_true', help='Also delete expired jobs and their files')
+
+    def handle(self, *args, **options):
+        while True:
+            ran = run_queued_export_jobs()
+            if ran:
+                self.stdout.write(self.style.SUCCESS(f'Ran {ran} export job(s)'))
+            if options['purge']:
+                purged = purge_export_jobs()
+                if purged:
+                    self.stdout.write(f'Purged {purged} expired export job(s)')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0029_alter_alumnisurvey_has_own_business'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyAggregateCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=32)),
+                ('value', models.CharField(blank=True, max_length=255)),
+                ('year', models.PositiveSmallIntegerField(default=0)),
+                ('program', models.CharField(blank=True, max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'value', 'year', 'program'), name='unique_survey_counter_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:26
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_filter_columns(apps, schema_editor):
+    # Same normalization as users.models.parse_graduation_year / normalize_program_key,
+    # copied so the migration does not depend on current model code.
+    AlumniSurvey = apps.get_model('users', 'AlumniSurvey')
+    last_pk = 0
+    while True:
+        batch = list(
+            AlumniSurvey.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('pk', 'year_graduated', 'course_program')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for survey in batch:
+            try:
+                year = int(str(survey.year_graduated).strip())
+            except (TypeError, ValueError):
+                year = None
+            survey.graduation_year = year if year is not None and 0 < year <= 32767 else None
+            survey.program_key = ' '.join(str(survey.course_program or '').split()).lower()[:255]
+        AlumniSurvey.objects.bulk_update(batch, ['graduation_year', 'program_key'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0030_surveyaggregatecounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumnisurvey',
+            name='graduation_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='alumnisurvey',
+            name='program_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_filter_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='alumnisurvey',
+            index=models.Index(fields=['graduation_year', 'program_key', 'created_at'], name='survey_year_program_created'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_job_difficulty_tags(apps, schema_editor):
+    # Same parsing as users.aggregates.job_difficulty_tags, copied so the
+    # migration does not depend on current app code.
+    AlumniSurvey = apps.get_model('users', 'AlumniSurvey')
+    SurveyJobDifficulty = apps.get_model('users', 'SurveyJobDifficulty')
+    last_pk = 0
+    while True:
+        batch = list(
+            AlumniSurvey.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'job_difficulties')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        tags = []
+        for survey_id, value in batch:
+            if not value:
+                continue
+            if isinstance(value, (list, tuple)):
+                items = [item for item in value if item]
+            else:
+                items = [part.strip() for part in str(value).split(',') if part.strip()]
+            tags.extend(SurveyJobDifficulty(survey_id=survey_id, tag=str(item)[:255]) for item in items)
+        SurveyJobDifficulty.objects.bulk_create(tags, batch_size=BATCH_SIZE)
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0031_alumnisurvey_graduation_year_program_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyJobDifficulty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=255)),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='difficulty_tags', to='users.alumnisurvey')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag'], name='survey_job_difficulty_tag')],
+            },
+        ),
+        migrations.RunPython(backfill_job_difficulty_tags, migrations.RunPython.noop),
+    ]
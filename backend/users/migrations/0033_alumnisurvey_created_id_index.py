@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0032_surveyjobdifficulty'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alumnisurvey',
+            index=models.Index(fields=['created_at', 'id'], name='survey_created_id'),
+        ),
+    ]
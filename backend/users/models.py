@@ -60,6 +60,37 @@ class ProgramHead(models.Model):
 # correct db_table and access it from MySQL Workbench.
 
 
+def parse_graduation_year(value):
+	"""Return a year_graduated value as an int, or None when it is blank or not numeric."""
+	try:
+		year = int(str(value).strip())
+	except (TypeError, ValueError):
+		return None
+	# Must fit the PositiveSmallIntegerField used for graduation_year
+	return year if 0 < year <= 32767 else None
+
+
+def normalize_program_key(value):
+	"""Lower-case a program name and collapse whitespace so it can be matched exactly."""
+	return ' '.join(str(value or '').split()).lower()[:255]
+
+
+def program_key_q(program, model, field='program_key'):
+	"""Q matching `program` against the normalized program key column `field` of `model`.
+
+	A value naming a program that has rows is matched exactly. Anything else,
+	such as the partial text typed into the dashboard's program box, falls
+	back to the substring match the endpoints always used, so "information"
+	still finds every "... information ..." program. The choice is made by an
+	EXISTS subquery in the same statement. Returns an empty Q for no value.
+	"""
+	key = normalize_program_key(program)
+	if not key:
+		return models.Q()
+	exact = models.Q(**{field: key})
+	return exact | (models.Q(**{f'{field}__contains': key}) & ~models.Exists(model.objects.filter(exact)))
+
+
 # Survey models
 class AlumniSurvey(models.Model):
 	# optional link to an Alumni user if available
@@ -94,10 +125,33 @@ class AlumniSurvey(models.Model):
 	# whether the respondent has their own business ('yes' or 'no')
 	has_own_business = models.CharField(max_length=3, null=True, blank=True, choices=[('yes','yes'), ('no','no')])
 	created_at = models.DateTimeField(auto_now_add=True)
+	# Normalized copies of year_graduated / course_program kept for indexed
+	# equality filtering by the dashboard endpoints. Derived on save().
+	graduation_year = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+	program_key = models.CharField(max_length=255, blank=True, default='', editable=False)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['graduation_year', 'program_key', 'created_at'], name='survey_year_program_created'),
+			# Keyset pagination walks (created_at, id) in descending order
+			models.Index(fields=['created_at', 'id'], name='survey_created_id'),
+		]
 
 	def __str__(self):
 		return f"Survey {self.id} - {self.last_name}, {self.first_name}"
 
+	def normalize_filter_columns(self):
+		"""Refresh graduation_year/program_key; call before bulk writes that skip save()."""
+		self.graduation_year = parse_graduation_year(self.year_graduated)
+		self.program_key = normalize_program_key(self.course_program)
+
+	def save(self, *args, **kwargs):
+		self.normalize_filter_columns()
+		update_fields = kwargs.get('update_fields')
+		if update_fields is not None and {'year_graduated', 'course_program'} & set(update_fields):
+			kwargs['update_fields'] = set(update_fields) | {'graduation_year', 'program_key'}
+		super().save(*args, **kwargs)
+
 
 class EmploymentRecord(models.Model):
 	survey = models.ForeignKey(AlumniSurvey, related_name='employment_records', on_delete=models.CASCADE)
@@ -110,6 +164,102 @@ class EmploymentRecord(models.Model):
 		return f"{self.company_name} ({self.survey_id})"
 
 
+class SurveyJobDifficulty(models.Model):
+	"""One job difficulty tag from an AlumniSurvey's job_difficulties list.
+
+	Mirrors the JSON list in an indexed table so difficulty counts (overall or
+	per program/year) can be computed with a plain GROUP BY. Rows are replaced
+	by the survey serializer whenever job_difficulties is written.
+	"""
+	survey = models.ForeignKey(AlumniSurvey, related_name='difficulty_tags', on_delete=models.CASCADE)
+	tag = models.CharField(max_length=255)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['tag'], name='survey_job_difficulty_tag'),
+		]
+
+	def __str__(self):
+		return f"{self.tag} ({self.survey_id})"
+
+
+class SurveyAggregateCounter(models.Model):
+	"""Pre-summed survey counts backing the dashboard aggregates endpoint.
+
+	Each row holds how many surveys fall into one chart bucket (e.g.
+	dimension='employed', value='yes') for a graduation year and normalized
+	program key. Rows are kept in step by users/survey_counters.py whenever a
+	survey is created, updated or deleted; `manage.py rebuild_survey_counters`
+	recomputes them from scratch.
+	"""
+	dimension = models.CharField(max_length=32)
+	value = models.CharField(max_length=255, blank=True)
+	# 0 when the survey's year_graduated is missing or not numeric
+	year = models.PositiveSmallIntegerField(default=0)
+	program = models.CharField(max_length=255, blank=True)
+	count = models.IntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['dimension', 'value', 'year', 'program'], name='unique_survey_counter_bucket'),
+		]
+
+	def __str__(self):
+		return f"{self.dimension}={self.value} ({self.year}, {self.program}): {self.count}"
+
+
+class ExportJob(models.Model):
+	"""A background survey export (see users/export_jobs.py).
+
+	Jobs are keyed by a hash of their format and normalized filters so an
+	identical request can reuse a finished artifact while the survey data it
+	was built from is unchanged.
+	"""
+	STATUS_QUEUED = 'queued'
+	STATUS_RUNNING = 'running'
+	STATUS_DONE = 'done'
+	STATUS_FAILED = 'failed'
+
+	format = models.CharField(max_length=8)
+	filters = models.JSONField(default=dict, blank=True)
+	filter_hash = models.CharField(max_length=64, db_index=True)
+	status = models.CharField(max_length=16, default=STATUS_QUEUED)
+	total = models.PositiveIntegerField(default=0)
+	processed = models.PositiveIntegerField(default=0)
+	file = models.FileField(upload_to='survey_exports/', null=True, blank=True)
+	# Survey data version stamp (users/cache.py) the artifact was built from
+	data_version = models.CharField(max_length=32, blank=True)
+	error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	# Refreshed by the worker as it writes; a running job whose heartbeat is
+	# older than EXPORT_JOBS_STALE_AFTER has lost its worker
+	heartbeat_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ['-created_at']
+
+	def __str__(self):
+		return f"ExportJob {self.id} - {self.format} - {self.status}"
+
+
+class AlumniImportLedger(models.Model):
+	"""Fingerprint of the roster row each imported Alumni account was last written from.
+
+	Lets `import_alumni` skip rows that have not changed since the previous
+	import (see users/alumni_import.py). Keyed by the derived roster username;
+	deleting the account drops its entry so the row is imported again.
+	"""
+	username = models.CharField(max_length=150, unique=True)
+	alumni = models.ForeignKey('Alumni', on_delete=models.CASCADE, related_name='import_ledger')
+	# sha256 of the normalized name, course and year
+	fingerprint = models.CharField(max_length=64)
+	imported_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return f"AlumniImportLedger {self.username} - {self.fingerprint[:12]}"
+
+
 class SurveyChangeRequest(models.Model):
 	alumni = models.ForeignKey('Alumni', null=True, blank=True, on_delete=models.SET_NULL, related_name='survey_change_requests')
 	message = models.TextField()
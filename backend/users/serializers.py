@@ -1,6 +1,11 @@
+from collections import Counter
 from rest_framework import serializers
 import datetime
-from .models import Admin, Alumni, ProgramHead, AlumniSurvey, EmploymentRecord, Program
+from django.db import NotSupportedError, connection, transaction
+from .models import Admin, Alumni, ProgramHead, AlumniSurvey, EmploymentRecord, ExportJob, Program, SurveyJobDifficulty
+from .aggregates import job_difficulty_tags, sync_job_difficulty_tags
+from .cache import bump_survey_data_version
+from .survey_counters import apply_counter_deltas, record_survey_change, survey_counter_buckets
 
 
 # Accept boolean or 'yes'/'no' for has_own_business and normalize to 'yes'/'no'
@@ -69,12 +74,142 @@ class ProgramHeadSerializer(serializers.ModelSerializer):
 
 
 class EmploymentRecordSerializer(serializers.ModelSerializer):
+    # Writable so survey updates can match submitted records to existing rows
+    id = serializers.IntegerField(required=False, allow_null=True)
+
     class Meta:
         model = EmploymentRecord
         fields = ['id', 'company_name', 'date_employed', 'position_and_status', 'monthly_salary_range']
 
 
 
+EMPLOYMENT_RECORD_FIELDS = ('company_name', 'date_employed', 'position_and_status', 'monthly_salary_range')
+
+
+def _new_employment_record(survey, rec):
+    # Submitted ids only identify existing rows; new rows get fresh keys
+    rec = {key: value for key, value in rec.items() if key != 'id'}
+    return EmploymentRecord(survey=survey, **rec)
+
+
+def sync_employment_records(survey, records):
+    """Make the survey's employment records match `records`, touching only what changed.
+
+    Submitted records are matched to existing rows by id first; records sent
+    without an id are matched to a remaining row with identical values, so
+    clients that do not echo ids still leave unchanged rows alone. Matched rows
+    that differ are bulk updated, unmatched submissions are bulk created and
+    rows left unmatched are deleted. Unchanged rows keep their primary keys.
+    """
+    existing = {record.pk: record for record in survey.employment_records.all()}
+    changed = []
+    unmatched = []
+    for rec in records:
+        record = existing.pop(rec.get('id'), None)
+        if record is None:
+            unmatched.append(rec)
+            continue
+        fields = [name for name in EMPLOYMENT_RECORD_FIELDS if name in rec and getattr(record, name) != rec[name]]
+        for name in fields:
+            setattr(record, name, rec[name])
+        if fields:
+            changed.append(record)
+
+    new = []
+    for rec in unmatched:
+        # Missing, None and '' all mean "no value" (legacy rows hold NULLs)
+        values = tuple(rec.get(name) or '' for name in EMPLOYMENT_RECORD_FIELDS)
+        same = next((pk for pk, record in existing.items() if tuple(getattr(record, name) or '' for name in EMPLOYMENT_RECORD_FIELDS) == values), None)
+        if same is not None:
+            existing.pop(same)
+        else:
+            new.append(_new_employment_record(survey, rec))
+
+    if changed:
+        EmploymentRecord.objects.bulk_update(changed, EMPLOYMENT_RECORD_FIELDS)
+    if new:
+        EmploymentRecord.objects.bulk_create(new)
+    if existing:
+        EmploymentRecord.objects.filter(pk__in=list(existing)).delete()
+
+
+def _bulk_insert_with_ids(objs, batch_size):
+    """bulk_create `objs` one INSERT per batch and set their primary keys.
+
+    For backends that cannot return the new keys from a multi-row INSERT
+    (MySQL). After each INSERT the connection's own last-insert id is read:
+    MySQL's LAST_INSERT_ID() is the id of the batch's first row, and InnoDB
+    hands a single multi-row INSERT consecutive auto-increment values (spaced
+    by auto_increment_increment), whatever other sessions are inserting.
+    SQLite's last_insert_rowid() is the batch's last row; the write lock
+    keeps its rowids consecutive even when Django splits the batch.
+    """
+    if not objs:
+        return
+    model = type(objs[0])
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        model.objects.bulk_create(batch, batch_size=len(batch))
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute('SELECT LAST_INSERT_ID(), @@auto_increment_increment')
+                first, step = cursor.fetchone()
+            elif connection.vendor == 'sqlite':
+                cursor.execute('SELECT last_insert_rowid()')
+                first, step = cursor.fetchone()[0] - len(batch) + 1, 1
+            else:
+                raise NotSupportedError(f'Cannot read bulk-inserted ids on {connection.vendor}')
+        for index, obj in enumerate(batch):
+            obj.pk = first + index * step
+            obj._state.adding = False
+            obj._state.db = connection.alias
+
+
+class AlumniSurveyListSerializer(serializers.ListSerializer):
+    """Bulk create for AlumniSurveySerializer(many=True).
+
+    Surveys, employment records and difficulty tags are written with
+    bulk_create in batches inside one transaction, and the dashboard counters
+    are adjusted once for the whole batch. bulk_create skips save() and the
+    post_save signals, so the derived filter columns and the cache version
+    stamp are handled here explicitly.
+    """
+    batch_size = 500
+
+    def create(self, validated_data):
+        surveys = []
+        employment_data = []
+        for item in validated_data:
+            item = dict(item)
+            employment_data.append(item.pop('employment_records', []))
+            item.pop('self_employment', None)
+            survey = AlumniSurvey(**item)
+            survey.normalize_filter_columns()
+            surveys.append(survey)
+
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                AlumniSurvey.objects.bulk_create(surveys, batch_size=self.batch_size)
+            else:
+                # MySQL cannot return the new primary keys from a multi-row
+                # INSERT, and the child rows below need them.
+                _bulk_insert_with_ids(surveys, self.batch_size)
+            EmploymentRecord.objects.bulk_create(
+                [_new_employment_record(survey, rec) for survey, records in zip(surveys, employment_data) for rec in records],
+                batch_size=self.batch_size,
+            )
+            SurveyJobDifficulty.objects.bulk_create(
+                [SurveyJobDifficulty(survey=survey, tag=str(tag)[:255]) for survey in surveys for tag in job_difficulty_tags(survey.job_difficulties)],
+                batch_size=self.batch_size,
+            )
+            deltas = Counter()
+            for survey in surveys:
+                deltas.update(survey_counter_buckets(survey))
+            apply_counter_deltas(deltas)
+            bump_survey_data_version()
+        return surveys
+
+
 class AlumniSurveySerializer(serializers.ModelSerializer):
     employment_records = EmploymentRecordSerializer(many=True, required=False)
     # Allow multiple self_employment records as a JSON array (legacy model removed).
@@ -93,28 +228,34 @@ class AlumniSurveySerializer(serializers.ModelSerializer):
         # automatically. Mark it read-only so clients cannot set it.
         fields = '__all__'
         read_only_fields = ('alumni_info',)
+        list_serializer_class = AlumniSurveyListSerializer
 
     def create(self, validated_data):
         employment_data = validated_data.pop('employment_records', [])
         self_emp_data = validated_data.pop('self_employment', [])
-        survey = AlumniSurvey.objects.create(**validated_data)
-        for rec in employment_data:
-            EmploymentRecord.objects.create(survey=survey, **rec)
+        with transaction.atomic():
+            survey = AlumniSurvey.objects.create(**validated_data)
+            EmploymentRecord.objects.bulk_create([_new_employment_record(survey, rec) for rec in employment_data])
+            # Keep the dashboard counters and difficulty tags in step with the new row
+            record_survey_change(None, survey)
+            sync_job_difficulty_tags(survey)
         return survey
 
     def update(self, instance, validated_data):
         employment_data = validated_data.pop('employment_records', None)
         self_emp_data = validated_data.pop('self_employment', None)
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        with transaction.atomic():
+            before = survey_counter_buckets(instance)
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+            record_survey_change(before, instance)
+            if 'job_difficulties' in validated_data:
+                sync_job_difficulty_tags(instance)
 
-        if employment_data is not None:
-            # Simple strategy: delete existing and recreate
-            instance.employment_records.all().delete()
-            for rec in employment_data:
-                EmploymentRecord.objects.create(survey=instance, **rec)
+            if employment_data is not None:
+                sync_employment_records(instance, employment_data)
 
         if self_emp_data is not None:
             # The SelfEmployment model has been removed; incoming self_employment
@@ -156,3 +297,29 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = ['id', 'title', 'message', 'payload', 'created_at']
         read_only_fields = ['id', 'created_at']
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'format', 'filters', 'status', 'total', 'processed', 'progress', 'error', 'created_at', 'finished_at', 'download_url']
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        # Fraction of the matching surveys written so far (1.0 once done)
+        if obj.status == obj.STATUS_DONE:
+            return 1.0
+        if not obj.total:
+            return 0.0
+        return round(min(obj.processed / obj.total, 1.0), 4)
+
+    def get_download_url(self, obj):
+        if obj.status != obj.STATUS_DONE:
+            return None
+        from django.urls import reverse
+        url = reverse('survey-export-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
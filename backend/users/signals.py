@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .author_cache import invalidate_authors
+from .cache import bump_survey_data_version
+from .models import Alumni, AlumniSurvey, EmploymentRecord
+
+
+@receiver(post_save, sender=AlumniSurvey)
+@receiver(post_delete, sender=AlumniSurvey)
+@receiver(post_save, sender=EmploymentRecord)
+@receiver(post_delete, sender=EmploymentRecord)
+def invalidate_survey_cache(sender, **kwargs):
+	# Surveys and their employment records feed the cached dashboard responses
+	bump_survey_data_version()
+
+
+@receiver(post_save, sender=Alumni)
+@receiver(post_delete, sender=Alumni)
+def invalidate_author_cache(sender, instance, **kwargs):
+	# Name and avatar shown next to the alumni's comments
+	invalidate_authors([instance.pk])
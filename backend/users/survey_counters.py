@@ -0,0 +1,317 @@
+"""Incrementally maintained survey counters (see SurveyAggregateCounter).
+
+Dashboards read the survey aggregates far more often than surveys change, so
+instead of recounting the survey table on every load we keep one counter row
+per chart bucket and adjust it whenever a survey is written. Reading the
+aggregates is then a single grouped query over the (small) counter table.
+
+Counters only describe every survey once `rebuild_survey_counters` has
+backfilled them; it records that with a marker row (BACKFILL_DIMENSION).
+Until the marker exists the readers return None and callers count the
+surveys directly, even though incremental writes may already have created
+some counter rows.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .aggregates import (
+	SURVEY_DIMENSIONS,
+	build_aggregates_payload,
+	has_own_business_label,
+	job_difficulty_tags,
+)
+from .cache import bump_survey_data_version
+from .models import AlumniSurvey, SurveyAggregateCounter, SurveyJobDifficulty, normalize_program_key, parse_graduation_year, program_key_q
+
+# Bookkeeping dimensions that are not chart series themselves.
+TOTAL_DIMENSION = 'total'
+MONTH_DIMENSION = 'month'
+# Marker row written by rebuild_survey_counters once the table is complete
+BACKFILL_DIMENSION = 'backfilled'
+VALUE_MAX_LENGTH = 255
+# Buckets per UPDATE in apply_counter_deltas (bounds the CASE expression)
+DELTA_CHUNK_SIZE = 200
+
+
+def _counter_year(value):
+	return parse_graduation_year(value) or 0
+
+
+def _month_label(dt):
+	return timezone.localtime(dt).strftime('%Y-%m')
+
+
+def _value(label):
+	return str(label)[:VALUE_MAX_LENGTH]
+
+
+def survey_counter_buckets(survey):
+	"""Return a Counter of (year, program, dimension, value) buckets for one survey."""
+	year = _counter_year(survey.year_graduated)
+	program = normalize_program_key(survey.course_program)
+	buckets = Counter()
+	buckets[(year, program, TOTAL_DIMENSION, '')] += 1
+	if survey.created_at:
+		buckets[(year, program, MONTH_DIMENSION, _month_label(survey.created_at))] += 1
+	for key, field, empty_label in SURVEY_DIMENSIONS:
+		buckets[(year, program, key, _value(getattr(survey, field) or empty_label))] += 1
+	buckets[(year, program, 'has_own_business', has_own_business_label(survey.has_own_business))] += 1
+	for tag in job_difficulty_tags(survey.job_difficulties):
+		buckets[(year, program, 'job_difficulties', _value(tag))] += 1
+	return buckets
+
+
+def _bucket_q(year, program, dimension, value):
+	return Q(dimension=dimension, value=value, year=year, program=program)
+
+
+def apply_counter_deltas(deltas):
+	"""Add the given {bucket: delta} amounts to the counter table.
+
+	Missing buckets are created with one INSERT that ignores rows which
+	already exist (or that a concurrent writer just created), then every
+	delta is applied with a single UPDATE ... SET count = count + CASE ...
+	per DELTA_CHUNK_SIZE buckets.
+	"""
+	items = [(bucket, delta) for bucket, delta in deltas.items() if delta]
+	if not items:
+		return
+	with transaction.atomic():
+		SurveyAggregateCounter.objects.bulk_create(
+			[SurveyAggregateCounter(dimension=dimension, value=value, year=year, program=program) for (year, program, dimension, value), _ in items],
+			ignore_conflicts=True,
+		)
+		for start in range(0, len(items), DELTA_CHUNK_SIZE):
+			chunk = items[start:start + DELTA_CHUNK_SIZE]
+			match = Q()
+			whens = []
+			for bucket, delta in chunk:
+				match |= _bucket_q(*bucket)
+				whens.append(When(_bucket_q(*bucket), then=Value(delta)))
+			SurveyAggregateCounter.objects.filter(match).update(
+				count=F('count') + Case(*whens, default=Value(0), output_field=IntegerField()),
+			)
+
+
+def record_survey_change(before, after):
+	"""Move counts from the `before` buckets to the survey `after` was saved as.
+
+	`before` is the result of survey_counter_buckets() taken before the write
+	(None for a new survey); `after` is the saved survey (None when deleted).
+	"""
+	deltas = Counter()
+	if before:
+		deltas.subtract(before)
+	if after is not None:
+		deltas.update(survey_counter_buckets(after))
+	apply_counter_deltas(deltas)
+
+
+# Counter columns a caller may bucket the aggregates by.
+GROUP_COLUMNS = ('year', 'program')
+
+
+class _GroupAccumulator:
+	def __init__(self):
+		self.counts = {key: {} for key, _, _ in SURVEY_DIMENSIONS}
+		self.has_counts = {'Yes': 0, 'No': 0}
+		self.difficulty_counts = {}
+		self.count = 0
+
+	def add(self, dimension, value, n):
+		if dimension == TOTAL_DIMENSION:
+			self.count += n
+		elif dimension == 'has_own_business':
+			self.has_counts[value] = self.has_counts.get(value, 0) + n
+		elif dimension == 'job_difficulties':
+			self.difficulty_counts[value] = self.difficulty_counts.get(value, 0) + n
+		elif dimension in self.counts:
+			self.counts[dimension][value] = self.counts[dimension].get(value, 0) + n
+
+	def payload(self, total_count, surveys_this_month):
+		return build_aggregates_payload(
+			self.counts, self.has_counts, self.difficulty_counts, self.count, total_count, surveys_this_month,
+		)
+
+
+def _fold_counter_rows(rows, group_columns, require_backfill=True):
+	"""Fold grouped counter rows into per-group payloads.
+
+	Each row is a dict with the `group_columns`, 'dimension', 'value', 'n'
+	(count matching the filters) and 'unfiltered' (count ignoring them).
+	Returns ({group key: accumulator}, total_count, surveys_this_month), or
+	None when there are no rows at all or, with `require_backfill`, when the
+	rows lack the backfill marker.
+	"""
+	groups = {}
+	total_count = this_month = 0
+	current_month = _month_label(timezone.now())
+	seen = False
+	backfilled = False
+	for row in rows:
+		dimension, value = row['dimension'], row['value']
+		if dimension == BACKFILL_DIMENSION:
+			backfilled = True
+			continue
+		seen = True
+		if dimension == TOTAL_DIMENSION:
+			total_count += row['unfiltered'] or 0
+		elif dimension == MONTH_DIMENSION:
+			if value == current_month:
+				this_month += row['unfiltered'] or 0
+			continue
+		n = row['n'] or 0
+		if n <= 0:
+			continue
+		key = tuple(row[column] for column in group_columns)
+		groups.setdefault(key, _GroupAccumulator()).add(dimension, value, n)
+	if require_backfill and not backfilled:
+		return None
+	if not seen:
+		return None
+	return groups, total_count, this_month
+
+
+def _counter_filters(year, program):
+	filters = Q()
+	if year is not None:
+		filters &= Q(year=year)
+	if program:
+		filters &= program_key_q(program, SurveyAggregateCounter, field='program')
+	return filters
+
+
+def _counter_table_rows(group_columns, year, program):
+	return (
+		SurveyAggregateCounter.objects.order_by()
+		.values(*group_columns, 'dimension', 'value')
+		.annotate(n=Sum('count', filter=_counter_filters(year, program)), unfiltered=Sum('count'))
+	)
+
+
+def _bucket_rows(buckets, group_columns, year, program):
+	# Same row shape as _counter_table_rows, computed from in-memory buckets.
+	program_key = normalize_program_key(program) if program else ''
+	# Exact program name, else substring match, as in program_key_q
+	exact = any(row_program == program_key for _, row_program, _, _ in buckets)
+	rows = {}
+	for (row_year, row_program, dimension, value), n in buckets.items():
+		group = {'year': row_year, 'program': row_program}
+		key = tuple(group[column] for column in group_columns) + (dimension, value)
+		row = rows.setdefault(key, dict({column: group[column] for column in group_columns}, dimension=dimension, value=value, n=0, unfiltered=0))
+		row['unfiltered'] += n
+		if (year is None or row_year == year) and (not program_key or (row_program == program_key if exact else program_key in row_program)):
+			row['n'] += n
+	return rows.values()
+
+
+def read_survey_aggregates(year=None, program=None):
+	"""Build the /api/survey-aggregates/ payload from the counter table.
+
+	Returns None until `rebuild_survey_counters` has backfilled the table (see
+	BACKFILL_DIMENSION) so callers can fall back to counting surveys directly.
+	"""
+	folded = _fold_counter_rows(_counter_table_rows((), year, program), ())
+	if folded is None:
+		return None
+	groups, total_count, this_month = folded
+	return groups.get((), _GroupAccumulator()).payload(total_count, this_month)
+
+
+def read_grouped_survey_aggregates(group_columns, year=None, program=None):
+	"""Return the aggregates bucketed by graduation year and/or program.
+
+	Every group is computed from one grouped query over the counter table (or,
+	before it has been backfilled, from the grouped survey queries used to
+	rebuild it). Groups are returned as a list of dicts sorted by key, each with
+	the group columns plus an 'aggregates' payload shaped like the ungrouped
+	endpoint. Program groups are labelled with the most common spelling of the
+	program name among their surveys.
+	"""
+	folded = _fold_counter_rows(_counter_table_rows(group_columns, year, program), group_columns)
+	if folded is None:
+		folded = _fold_counter_rows(_bucket_rows(compute_counter_buckets(), group_columns, year, program), group_columns, require_backfill=False)
+	if folded is None:
+		return {'total_count': 0, 'surveys_this_month': 0, 'groups': []}
+	groups, total_count, this_month = folded
+	results = []
+	for key in sorted(groups):
+		accumulator = groups[key]
+		entry = {}
+		for column, value in zip(group_columns, key):
+			if column == 'year':
+				entry['year_graduated'] = value or None
+			else:
+				names = accumulator.counts['programs']
+				entry['program'] = max(names, key=names.get) if names else value
+		entry['aggregates'] = accumulator.payload(total_count, this_month)
+		results.append(entry)
+	return {'total_count': total_count, 'surveys_this_month': this_month, 'groups': results}
+
+
+def compute_counter_buckets():
+	"""Recount every counter bucket from the survey table using grouped queries.
+
+	Job difficulty buckets come from the SurveyJobDifficulty table, so it must
+	be in sync first (see `manage.py rebuild_job_difficulty_tags`).
+	"""
+	fields = [field for _, field, _ in SURVEY_DIMENSIONS]
+	buckets = Counter()
+	grouped = (
+		AlumniSurvey.objects.order_by()
+		.values('year_graduated', 'course_program', 'has_own_business', *fields, month=TruncMonth('created_at'))
+		.annotate(n=Count('id'))
+	)
+	for row in grouped:
+		year = _counter_year(row['year_graduated'])
+		program = normalize_program_key(row['course_program'])
+		n = row['n']
+		buckets[(year, program, TOTAL_DIMENSION, '')] += n
+		if row['month']:
+			buckets[(year, program, MONTH_DIMENSION, _month_label(row['month']))] += n
+		for key, field, empty_label in SURVEY_DIMENSIONS:
+			buckets[(year, program, key, _value(row[field] or empty_label))] += n
+		buckets[(year, program, 'has_own_business', has_own_business_label(row['has_own_business']))] += n
+
+	difficulties = (
+		SurveyJobDifficulty.objects.order_by()
+		.values_list('survey__year_graduated', 'survey__course_program', 'tag')
+		.annotate(n=Count('id'))
+	)
+	for year_graduated, course_program, tag, n in difficulties:
+		buckets[(_counter_year(year_graduated), normalize_program_key(course_program), 'job_difficulties', _value(tag))] += n
+	return buckets
+
+
+def rebuild_survey_counters(batch_size=500):
+	"""Replace the counter table with a fresh recount. Returns the number of buckets."""
+	buckets = compute_counter_buckets()
+	with transaction.atomic():
+		SurveyAggregateCounter.objects.all().delete()
+		SurveyAggregateCounter.objects.bulk_create(
+			[
+				SurveyAggregateCounter(dimension=dimension, value=value, year=year, program=program, count=n)
+				for (year, program, dimension, value), n in buckets.items()
+				if n
+			] + [SurveyAggregateCounter(dimension=BACKFILL_DIMENSION, count=1)],
+			batch_size=batch_size,
+		)
+		bump_survey_data_version()
+	return len(buckets)
+
+
+def counter_drift():
+	"""Return {bucket: (stored, expected)} for every counter that disagrees with the surveys."""
+	expected = compute_counter_buckets()
+	stored = Counter()
+	for row in SurveyAggregateCounter.objects.exclude(dimension=BACKFILL_DIMENSION).values_list('year', 'program', 'dimension', 'value', 'count'):
+		stored[row[:4]] += row[4]
+	drift = {}
+	for bucket in set(expected) | set(stored):
+		if stored[bucket] != expected[bucket]:
+			drift[bucket] = (stored[bucket], expected[bucket])
+	return drift
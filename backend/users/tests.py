@@ -1,8 +1,11 @@
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from backend.users.models import ProgramHead
+from .models import AlumniSurvey, ExportJob, ProgramHead
+from .aggregates import job_difficulty_counts, rebuild_job_difficulty_tags
+from .survey_counters import counter_drift, rebuild_survey_counters
 
 
 class ProgramHeadCreateTest(TestCase):
@@ -71,3 +74,1098 @@ class ProgramHeadPermissionsTest(TestCase):
 		self.target.refresh_from_db()
 		self.assertEqual(self.target.status, 'approved')
 
+
+
+def _legacy_survey_aggregates(qs):
+	# Reference copy of the original per-dimension Python loops that
+	# SurveyAggregatesView used before counting moved into the database.
+	def tally(field, empty_label):
+		counts = {}
+		for row in qs.values_list(field, flat=True):
+			key = (row or empty_label)
+			counts[key] = counts.get(key, 0) + 1
+		return counts
+
+	has_counts = {'Yes': 0, 'No': 0}
+	for v in qs.values_list('has_own_business', flat=True):
+		s = '' if v is None else str(v).strip().lower()
+		has_counts['Yes' if s in ('yes', 'y', 'true', 't', '1') else 'No'] += 1
+
+	job_difficulties_counts = {}
+	for jd in qs.values_list('job_difficulties', flat=True):
+		if not jd:
+			continue
+		items = jd if isinstance(jd, (list, tuple)) else [p.strip() for p in str(jd).split(',')]
+		for item in items:
+			if item:
+				job_difficulties_counts[item] = job_difficulties_counts.get(item, 0) + 1
+
+	return {
+		'employed': tally('employed_after_graduation', 'Unknown'),
+		'sources': tally('employment_source', 'Unknown'),
+		'performance': tally('work_performance_rating', 'Unrated'),
+		'programs': tally('course_program', 'Unknown'),
+		'promoted': tally('has_been_promoted', 'Unknown'),
+		'jobs_related': tally('jobs_related_to_experience', 'Unknown'),
+		'self_employment': dict(has_counts),
+		'has_own_business': has_counts,
+		'job_difficulties': job_difficulties_counts,
+		'count': qs.count(),
+		'total_count': AlumniSurvey.objects.count(),
+		'surveys_this_month': AlumniSurvey.objects.count(),
+	}
+
+
+def _seed_surveys(count=60):
+	programs = ['BS Computer Science', 'BS Information Technology', 'BS Nursing', '']
+	employed = ['yes', 'no', '', 'yes']
+	sources = ['Job fair', 'Online', 'Referral', '']
+	ratings = ['Excellent', 'Good', 'Fair', '']
+	flags = ['yes', 'no', '']
+	business = ['yes', 'no', None, '']
+	difficulties = [['Lack of experience'], ['Lack of experience', 'No openings'], [], 'Salary, Location']
+	for i in range(count):
+		AlumniSurvey.objects.create(
+			last_name=f'Last{i}',
+			first_name=f'First{i}',
+			year_graduated=str(2018 + i % 4),
+			course_program=programs[i % len(programs)],
+			employed_after_graduation=employed[i % len(employed)],
+			employment_source=sources[(i // 2) % len(sources)],
+			work_performance_rating=ratings[(i // 3) % len(ratings)],
+			has_been_promoted=flags[i % len(flags)],
+			jobs_related_to_experience=flags[(i // 2) % len(flags)],
+			has_own_business=business[i % len(business)],
+			job_difficulties=difficulties[i % len(difficulties)],
+		)
+	rebuild_job_difficulty_tags()
+
+
+class SurveyAggregatesViewTest(TestCase):
+	def setUp(self):
+		self.client = APIClient()
+		cache.clear()
+		_seed_surveys()
+		rebuild_survey_counters()
+
+	def test_matches_legacy_python_aggregation(self):
+		resp = self.client.get('/api/survey-aggregates/')
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(resp.json(), _legacy_survey_aggregates(AlumniSurvey.objects.all()))
+
+	def test_filtered_matches_legacy_python_aggregation(self):
+		resp = self.client.get('/api/survey-aggregates/', {'year': 2019, 'program': 'bs  computer science'})
+		self.assertEqual(resp.status_code, 200)
+		expected = _legacy_survey_aggregates(AlumniSurvey.objects.filter(year_graduated='2019', course_program='BS Computer Science'))
+		self.assertEqual(resp.json(), expected)
+		self.assertLess(resp.json()['count'], resp.json()['total_count'])
+
+	def test_partial_program_name_matches_as_substring(self):
+		from .models import SurveyAggregateCounter
+		expected = _legacy_survey_aggregates(AlumniSurvey.objects.filter(course_program='BS Information Technology'))
+		resp = self.client.get('/api/survey-aggregates/', {'program': 'information'})
+		self.assertEqual(resp.json(), expected)
+		self.assertGreater(resp.json()['count'], 0)
+		# 'bs' names no program, so it matches every BS program
+		cache.clear()
+		resp = self.client.get('/api/survey-aggregates/', {'program': 'BS'})
+		self.assertEqual(resp.json(), _legacy_survey_aggregates(AlumniSurvey.objects.exclude(course_program='')))
+		# Same answers without the counter table
+		SurveyAggregateCounter.objects.all().delete()
+		cache.clear()
+		self.assertEqual(self.client.get('/api/survey-aggregates/', {'program': 'information'}).json(), expected)
+
+	def test_aggregates_read_counters_in_one_query(self):
+		with self.assertNumQueries(1):
+			resp = self.client.get('/api/survey-aggregates/', {'year': 2020, 'program': 'nursing'})
+		self.assertEqual(resp.status_code, 200)
+
+	def test_falls_back_to_grouped_queries_without_counters(self):
+		from .models import SurveyAggregateCounter
+		SurveyAggregateCounter.objects.all().delete()
+		with self.assertNumQueries(3):
+			resp = self.client.get('/api/survey-aggregates/')
+		self.assertEqual(resp.json(), _legacy_survey_aggregates(AlumniSurvey.objects.all()))
+
+	def test_partial_counters_are_ignored_until_backfilled(self):
+		# As after deploying the counter table: incremental writes create some
+		# rows, but the table only describes every survey after a rebuild.
+		from .models import SurveyAggregateCounter
+		SurveyAggregateCounter.objects.all().delete()
+		resp = self.client.post('/api/alumni-surveys/', {'last_name': 'New', 'first_name': 'Survey', 'year_graduated': '2021'}, format='json')
+		self.assertEqual(resp.status_code, 201)
+		self.assertTrue(SurveyAggregateCounter.objects.exists())
+		cache.clear()
+		self.assertEqual(self.client.get('/api/survey-aggregates/').json(), _legacy_survey_aggregates(AlumniSurvey.objects.all()))
+
+
+class SurveyAggregateCounterTest(TestCase):
+	def setUp(self):
+		self.client = APIClient()
+		cache.clear()
+		_seed_surveys(12)
+		rebuild_survey_counters()
+
+	def test_api_writes_keep_counters_in_sync(self):
+		resp = self.client.post('/api/alumni-surveys/', {
+			'last_name': 'New', 'first_name': 'Survey', 'year_graduated': '2021',
+			'course_program': 'BS Nursing', 'employed_after_graduation': 'yes',
+			'job_difficulties': ['No openings'], 'has_own_business': True,
+		}, format='json')
+		self.assertEqual(resp.status_code, 201)
+		self.assertEqual(counter_drift(), {})
+
+		survey = AlumniSurvey.objects.order_by('id').first()
+		resp = self.client.patch(f'/api/alumni-surveys/{survey.id}/', {
+			'employed_after_graduation': 'no', 'course_program': 'BS Biology', 'job_difficulties': [],
+		}, format='json', HTTP_X_ACTING_ROLE='admin')
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(counter_drift(), {})
+
+		resp = self.client.delete(f'/api/alumni-surveys/{survey.id}/')
+		self.assertEqual(resp.status_code, 204)
+		self.assertEqual(counter_drift(), {})
+
+	def test_deltas_are_applied_in_two_statements(self):
+		from collections import Counter
+		from .survey_counters import apply_counter_deltas
+		deltas = Counter({(2019, 'bs nursing', 'total', ''): 2, (2031, 'new program', 'total', ''): 1, (2031, 'new program', 'employed', 'yes'): 1})
+		with self.assertNumQueries(4):  # INSERT and UPDATE inside a savepoint
+			apply_counter_deltas(deltas)
+		deltas = Counter({(2031, 'new program', 'total', ''): -1, (2031, 'new program', 'employed', 'yes'): -1})
+		deltas[(2019, 'bs nursing', 'total', '')] -= 2
+		apply_counter_deltas(deltas)
+		self.assertEqual(counter_drift(), {})
+		self.assertEqual(
+			self.client.get('/api/survey-aggregates/').json(),
+			_legacy_survey_aggregates(AlumniSurvey.objects.all()),
+		)
+
+
+class SurveyAggregatesCacheTest(TestCase):
+	def setUp(self):
+		self.client = APIClient()
+		cache.clear()
+		_seed_surveys(12)
+		rebuild_survey_counters()
+
+	def test_repeated_requests_are_served_from_cache(self):
+		first = self.client.get('/api/survey-aggregates/', {'year': '2019', 'program': 'BS Computer Science'})
+		with self.assertNumQueries(0):
+			second = self.client.get('/api/survey-aggregates/', {'year': '2019', 'program': ' bs computer science '})
+		self.assertEqual(first.json(), second.json())
+
+	def test_survey_and_employment_writes_invalidate_cache(self):
+		before = self.client.get('/api/survey-aggregates/').json()
+		survey = AlumniSurvey.objects.first()
+		resp = self.client.post('/api/alumni-surveys/', {'last_name': 'A', 'first_name': 'B'}, format='json')
+		self.assertEqual(resp.status_code, 201)
+		after = self.client.get('/api/survey-aggregates/').json()
+		self.assertEqual(after['count'], before['count'] + 1)
+
+		from .models import EmploymentRecord
+		version = cache.get('survey-data-version')
+		EmploymentRecord.objects.create(survey=survey, company_name='Acme')
+		self.assertNotEqual(cache.get('survey-data-version'), version)
+
+
+class SurveyAggregatesGroupByTest(TestCase):
+	def setUp(self):
+		self.client = APIClient()
+		cache.clear()
+		_seed_surveys()
+		rebuild_survey_counters()
+
+	def _assert_groups_match_legacy(self, body):
+		self.assertEqual(body['group_by'], ['year_graduated'])
+		self.assertEqual([g['year_graduated'] for g in body['groups']], [2018, 2019, 2020, 2021])
+		for group in body['groups']:
+			expected = _legacy_survey_aggregates(AlumniSurvey.objects.filter(year_graduated=group['year_graduated']))
+			self.assertEqual(group['aggregates'], expected)
+
+	def test_group_by_year_matches_per_year_requests(self):
+		with self.assertNumQueries(1):
+			resp = self.client.get('/api/survey-aggregates/', {'group_by': 'year_graduated'})
+		self.assertEqual(resp.status_code, 200)
+		self._assert_groups_match_legacy(resp.json())
+
+	def test_group_by_year_without_counters(self):
+		from .models import SurveyAggregateCounter
+		SurveyAggregateCounter.objects.all().delete()
+		resp = self.client.get('/api/survey-aggregates/', {'group_by': 'year_graduated'})
+		self._assert_groups_match_legacy(resp.json())
+
+	def test_group_by_year_and_program_with_filter(self):
+		resp = self.client.get('/api/survey-aggregates/', {'group_by': 'year_graduated,program', 'program': 'BS Nursing'})
+		body = resp.json()
+		self.assertEqual(body['group_by'], ['year_graduated', 'program'])
+		self.assertTrue(body['groups'])
+		for group in body['groups']:
+			self.assertEqual(group['program'], 'BS Nursing')
+			expected = _legacy_survey_aggregates(AlumniSurvey.objects.filter(
+				year_graduated=group['year_graduated'], course_program='BS Nursing'))
+			self.assertEqual(group['aggregates'], expected)
+
+	def test_rejects_unknown_group_by(self):
+		resp = self.client.get('/api/survey-aggregates/', {'group_by': 'gender'})
+		self.assertEqual(resp.status_code, 400)
+
+
+class SurveyFilterColumnsTest(TestCase):
+	def test_save_derives_normalized_filter_columns(self):
+		survey = AlumniSurvey.objects.create(last_name='A', first_name='B', year_graduated=' 2020 ', course_program='BS  Information Technology ')
+		self.assertEqual(survey.graduation_year, 2020)
+		self.assertEqual(survey.program_key, 'bs information technology')
+		survey.year_graduated = 'n/a'
+		survey.save(update_fields=['year_graduated'])
+		survey.refresh_from_db()
+		self.assertIsNone(survey.graduation_year)
+
+	def test_list_filters_use_normalized_columns(self):
+		_seed_surveys(12)
+		resp = APIClient().get('/api/alumni-surveys/', {'year': 2018, 'program': 'bs computer science'})
+		self.assertEqual(resp.status_code, 200)
+		expected = AlumniSurvey.objects.filter(year_graduated='2018', course_program='BS Computer Science').count()
+		self.assertEqual(len(resp.json()['results']), expected)
+		self.assertGreater(expected, 0)
+		# A partial name matches every program containing it
+		resp = APIClient().get('/api/alumni-surveys/', {'program': 'Information'})
+		self.assertEqual(len(resp.json()['results']), AlumniSurvey.objects.filter(course_program='BS Information Technology').count())
+
+
+class SurveyJobDifficultyTest(TestCase):
+	def setUp(self):
+		self.client = APIClient()
+		cache.clear()
+
+	def test_serializer_keeps_tags_in_sync(self):
+		from .models import SurveyJobDifficulty
+		resp = self.client.post('/api/alumni-surveys/', {
+			'last_name': 'A', 'first_name': 'B', 'course_program': 'BS Nursing',
+			'job_difficulties': ['Salary', 'Location'],
+		}, format='json')
+		survey_id = resp.json()['id']
+		self.assertEqual(sorted(SurveyJobDifficulty.objects.filter(survey_id=survey_id).values_list('tag', flat=True)), ['Location', 'Salary'])
+
+		self.client.patch(f'/api/alumni-surveys/{survey_id}/', {'job_difficulties': ['No openings']}, format='json', HTTP_X_ACTING_ROLE='admin')
+		self.assertEqual(list(SurveyJobDifficulty.objects.filter(survey_id=survey_id).values_list('tag', flat=True)), ['No openings'])
+
+	def test_counts_by_program_in_one_query(self):
+		_seed_surveys(12)
+		with self.assertNumQueries(1):
+			by_program = job_difficulty_counts(by_program=True)
+		for program, counts in by_program.items():
+			qs = AlumniSurvey.objects.filter(course_program='' if program == 'Unknown' else program)
+			self.assertEqual(counts, _legacy_survey_aggregates(qs)['job_difficulties'])
+
+
+class AlumniSurveyKeysetPaginationTest(TestCase):
+	def setUp(self):
+		self.client = APIClient()
+		_seed_surveys(23)
+		# Force created_at ties so the id tie-breaker is exercised
+		first_ids = list(AlumniSurvey.objects.order_by('id').values_list('id', flat=True)[:6])
+		stamp = AlumniSurvey.objects.get(id=first_ids[0]).created_at
+		AlumniSurvey.objects.filter(id__in=first_ids).update(created_at=stamp)
+
+	def _walk(self, url, params):
+		ids = []
+		resp = self.client.get(url, params)
+		pages = [resp.json()]
+		while pages[-1]['next']:
+			pages.append(self.client.get(pages[-1]['next']).json())
+		for page in pages:
+			ids.extend(row['id'] for row in page['results'])
+		return pages, ids
+
+	def test_pages_cover_every_survey_once_in_order(self):
+		pages, ids = self._walk('/api/alumni-surveys/', {'page_size': 5})
+		expected = list(AlumniSurvey.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+		self.assertEqual(ids, expected)
+		self.assertIsNone(pages[0]['prev'])
+		self.assertEqual(len(pages), 5)
+
+		# Following prev from the last page returns the previous page
+		back = self.client.get(pages[-1]['prev']).json()
+		self.assertEqual(back['results'], pages[-2]['results'])
+
+	def test_filters_apply_before_paging_on_legacy_alias(self):
+		_, ids = self._walk('/api/users_alumnisurvey/', {'page_size': 2, 'year': 2019})
+		expected = list(AlumniSurvey.objects.filter(year_graduated='2019').order_by('-created_at', '-id').values_list('id', flat=True))
+		self.assertEqual(ids, expected)
+
+	def test_deep_pages_cost_the_same_as_the_first(self):
+		pages, _ = self._walk('/api/alumni-surveys/', {'page_size': 5})
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+		with CaptureQueriesContext(connection) as first:
+			self.client.get('/api/alumni-surveys/', {'page_size': 5})
+		with CaptureQueriesContext(connection) as deep:
+			self.client.get(pages[-3]['next'])
+		self.assertEqual(len(first), len(deep))
+		self.assertNotIn('OFFSET', deep.captured_queries[0]['sql'].upper())
+
+	def test_invalid_cursor(self):
+		resp = self.client.get('/api/alumni-surveys/', {'cursor': 'not-a-cursor'})
+		self.assertEqual(resp.status_code, 404)
+
+	def test_list_is_paginated_by_default(self):
+		from .views import SurveyListPagination
+		with self.settings(SURVEY_LIST_UNPAGINATED=False):
+			page = self.client.get('/api/alumni-surveys/').json()
+			self.assertEqual(len(page['results']), min(23, SurveyListPagination.page_size))
+			# The dashboard's `limit` sets the page size
+			limited = self.client.get('/api/alumni-surveys/', {'limit': 4}).json()
+			self.assertEqual(len(limited['results']), 4)
+			self.assertIsNotNone(limited['next'])
+
+	def test_unpaginated_compatibility_switch(self):
+		with self.settings(SURVEY_LIST_UNPAGINATED=True):
+			resp = self.client.get('/api/alumni-surveys/')
+			self.assertIsInstance(resp.json(), list)
+			self.assertEqual(len(resp.json()), 23)
+			self.assertEqual(len(self.client.get('/api/alumni-surveys/', {'limit': 4}).json()), 4)
+			self.assertIn('results', self.client.get('/api/alumni-surveys/', {'page_size': 4}).json())
+
+
+class AlumniSurveyQueryCountTest(TestCase):
+	def _seed(self, count):
+		from .models import Alumni, EmploymentRecord
+		start = AlumniSurvey.objects.count()
+		for i in range(start, start + count):
+			alumni = Alumni.objects.create(username=f'alum{i}', email=f'alum{i}@example.com', password='x', full_name=f'Alum {i}')
+			survey = AlumniSurvey.objects.create(alumni=alumni, last_name=f'L{i}', first_name=f'F{i}')
+			EmploymentRecord.objects.create(survey=survey, company_name='Acme')
+			EmploymentRecord.objects.create(survey=survey, company_name='Globex')
+
+	def _list_queries(self, params=None):
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+		with CaptureQueriesContext(connection) as ctx:
+			resp = APIClient().get('/api/alumni-surveys/', params or {})
+		self.assertEqual(resp.status_code, 200)
+		return len(ctx)
+
+	def test_list_query_count_does_not_grow_with_rows(self):
+		self._seed(3)
+		small = self._list_queries()
+		small_page = self._list_queries({'page_size': 50})
+		self._seed(20)
+		self.assertEqual(self._list_queries(), small)
+		self.assertEqual(self._list_queries({'page_size': 50}), small_page)
+		self.assertLessEqual(small, 2)
+
+	def test_detail_loads_relations_in_constant_queries(self):
+		self._seed(1)
+		survey = AlumniSurvey.objects.get()
+		with self.assertNumQueries(2):
+			resp = APIClient().get(f'/api/alumni-surveys/{survey.id}/')
+		self.assertEqual(resp.json()['alumni_info']['username'], survey.alumni.username)
+		self.assertEqual(len(resp.json()['employment_records']), 2)
+
+
+class AlumniSurveyExportTest(TestCase):
+	def setUp(self):
+		from .models import EmploymentRecord
+		self.client = APIClient()
+		_seed_surveys(8)
+		first = AlumniSurvey.objects.order_by('id').first()
+		EmploymentRecord.objects.create(survey=first, company_name='Acme', position_and_status='Dev')
+		EmploymentRecord.objects.create(survey=first, company_name='Globex')
+
+	def test_csv_export_flattens_nested_fields(self):
+		import csv
+		import io
+		resp = self.client.get('/api/alumni-surveys/export/', {'format': 'csv'})
+		self.assertEqual(resp.status_code, 200)
+		self.assertTrue(resp.streaming)
+		self.assertIn('text/csv', resp['Content-Type'])
+		rows = list(csv.DictReader(io.StringIO(b''.join(resp.streaming_content).decode('utf-8'))))
+		self.assertEqual(len(rows), 8)
+		self.assertEqual(rows[0]['employment_1_company_name'], 'Acme')
+		self.assertEqual(rows[0]['employment_2_company_name'], 'Globex')
+		self.assertEqual(rows[0]['job_difficulties'], 'Lack of experience')
+		self.assertEqual(rows[1]['employment_1_company_name'], '')
+		self.assertNotIn('program_key', rows[0])
+
+	def test_ndjson_export_applies_filters(self):
+		import json
+		resp = self.client.get('/api/alumni-surveys/export/', {'format': 'ndjson', 'year': 2018})
+		self.assertEqual(resp.status_code, 200)
+		lines = [json.loads(line) for line in b''.join(resp.streaming_content).decode('utf-8').splitlines()]
+		self.assertEqual(len(lines), AlumniSurvey.objects.filter(year_graduated='2018').count())
+		self.assertEqual(lines[0]['employment_records'][0]['company_name'], 'Acme')
+		self.assertEqual({line['year_graduated'] for line in lines}, {'2018'})
+
+	def test_export_reads_in_chunks(self):
+		from .exports import iter_survey_dicts
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+		with CaptureQueriesContext(connection) as ctx:
+			rows = list(iter_survey_dicts(AlumniSurvey.objects.all(), chunk_size=3))
+		self.assertEqual(len(rows), 8)
+		# 3 chunks of surveys, each with one employment-record prefetch
+		self.assertEqual(len(ctx), 6)
+
+	def test_rejects_unknown_format(self):
+		resp = self.client.get('/api/alumni-surveys/export/', {'format': 'xlsx'})
+		self.assertEqual(resp.status_code, 400)
+
+
+class SurveyExportJobTest(TestCase):
+	def setUp(self):
+		import tempfile
+		from django.test import override_settings
+		cache.clear()
+		self.client = APIClient()
+		_seed_surveys(12)
+		self.media = tempfile.TemporaryDirectory()
+		self.addCleanup(self.media.cleanup)
+		overrides = override_settings(MEDIA_ROOT=self.media.name, EXPORT_JOBS_RUN_IN_PROCESS=False)
+		overrides.enable()
+		self.addCleanup(overrides.disable)
+
+	def test_job_runs_and_serves_file(self):
+		from .export_jobs import run_export_job
+		resp = self.client.post('/api/survey-exports/', {'format': 'ndjson', 'year': 2018}, format='json')
+		self.assertEqual(resp.status_code, 202)
+		job_id = resp.data['id']
+		self.assertEqual(resp.data['status'], 'queued')
+		self.assertIsNone(resp.data['download_url'])
+		self.assertEqual(self.client.get(f'/api/survey-exports/{job_id}/download/').status_code, 409)
+
+		self.assertTrue(run_export_job(job_id))
+		# A second worker cannot claim the same job
+		self.assertFalse(run_export_job(job_id))
+
+		detail = self.client.get(f'/api/survey-exports/{job_id}/')
+		expected = AlumniSurvey.objects.filter(year_graduated='2018').count()
+		self.assertEqual(detail.data['status'], 'done')
+		self.assertEqual(detail.data['total'], expected)
+		self.assertEqual(detail.data['processed'], expected)
+		self.assertEqual(detail.data['progress'], 1.0)
+		download = self.client.get(detail.data['download_url'])
+		self.assertEqual(download.status_code, 200)
+		body = b''.join(download.streaming_content).decode('utf-8')
+		self.assertEqual(len(body.splitlines()), expected)
+
+	def test_identical_request_reuses_artifact_until_data_changes(self):
+		from .export_jobs import run_export_job
+		first = self.client.post('/api/survey-exports/?format=csv&program=BS%20Nursing')
+		# Still queued: the same job is handed back rather than a duplicate
+		again = self.client.post('/api/survey-exports/?format=csv&program=%20bs%20%20NURSING%20')
+		self.assertEqual(again.status_code, 200)
+		self.assertEqual(again.data['id'], first.data['id'])
+
+		run_export_job(first.data['id'])
+		reused = self.client.post('/api/survey-exports/?format=csv&program=BS%20Nursing')
+		self.assertEqual(reused.status_code, 200)
+		self.assertEqual(reused.data['id'], first.data['id'])
+		self.assertEqual(reused.data['status'], 'done')
+		# Different format is a different artifact
+		self.assertEqual(self.client.post('/api/survey-exports/?format=ndjson&program=BS%20Nursing').status_code, 202)
+
+		survey = AlumniSurvey.objects.first()
+		survey.last_name = 'Changed'
+		survey.save()
+		fresh = self.client.post('/api/survey-exports/?format=csv&program=BS%20Nursing')
+		self.assertEqual(fresh.status_code, 202)
+		self.assertNotEqual(fresh.data['id'], first.data['id'])
+
+	def test_rejects_unknown_format(self):
+		resp = self.client.post('/api/survey-exports/', {'format': 'xlsx'}, format='json')
+		self.assertEqual(resp.status_code, 400)
+
+	def test_stale_jobs_are_failed_instead_of_reused(self):
+		from datetime import timedelta
+		from django.utils import timezone
+		from .export_jobs import run_queued_export_jobs
+		first = self.client.post('/api/survey-exports/?format=csv')
+		long_ago = timezone.now() - timedelta(hours=1)
+		# The worker claimed the job and then died
+		ExportJob.objects.filter(pk=first.data['id']).update(status=ExportJob.STATUS_RUNNING, heartbeat_at=long_ago)
+		again = self.client.post('/api/survey-exports/?format=csv')
+		self.assertEqual(again.status_code, 202)
+		self.assertNotEqual(again.data['id'], first.data['id'])
+		self.assertEqual(ExportJob.objects.get(pk=first.data['id']).status, ExportJob.STATUS_FAILED)
+
+		# The worker loop sweeps abandoned jobs it was never asked about
+		abandoned = ExportJob.objects.create(format='ndjson', filter_hash='x', status=ExportJob.STATUS_RUNNING)
+		ExportJob.objects.filter(pk=abandoned.pk).update(created_at=long_ago)
+		run_queued_export_jobs()
+		self.assertEqual(ExportJob.objects.get(pk=abandoned.pk).status, ExportJob.STATUS_FAILED)
+		self.assertEqual(ExportJob.objects.get(pk=again.data['id']).status, ExportJob.STATUS_DONE)
+
+	def test_finishing_a_job_purges_expired_artifacts(self):
+		import os
+		from datetime import timedelta
+		from django.utils import timezone
+		from .export_jobs import run_export_job
+		old = self.client.post('/api/survey-exports/?format=csv')
+		run_export_job(old.data['id'])
+		old_path = os.path.join(self.media.name, ExportJob.objects.get(pk=old.data['id']).file.name)
+		self.assertTrue(os.path.exists(old_path))
+		ExportJob.objects.filter(pk=old.data['id']).update(finished_at=timezone.now() - timedelta(days=1))
+
+		new = self.client.post('/api/survey-exports/?format=ndjson')
+		run_export_job(new.data['id'])
+		self.assertFalse(ExportJob.objects.filter(pk=old.data['id']).exists())
+		self.assertFalse(os.path.exists(old_path))
+		self.assertTrue(ExportJob.objects.filter(pk=new.data['id']).exists())
+
+
+class AlumniSurveyBulkCreateTest(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+		self.client.credentials(HTTP_X_ACTING_ROLE='program_head')
+		_seed_surveys(4)
+		rebuild_survey_counters()
+
+	def _rows(self, count):
+		return [
+			{
+				'last_name': f'Paper{i}',
+				'first_name': 'Form',
+				'year_graduated': '2020',
+				'course_program': 'BS Nursing',
+				'employed_after_graduation': 'yes',
+				'has_own_business': i % 2 == 0,
+				'job_difficulties': ['Lack of experience'],
+				'employment_records': [{'company_name': f'Clinic {i}'}, {'company_name': 'Hospital'}],
+			}
+			for i in range(count)
+		]
+
+	def test_bulk_create_inserts_rows_and_keeps_counters_in_sync(self):
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+		from .models import EmploymentRecord
+		with CaptureQueriesContext(connection) as ctx:
+			resp = self.client.post('/api/alumni-surveys/bulk/', self._rows(40), format='json')
+		self.assertEqual(resp.status_code, 201)
+		self.assertEqual(resp.data['created'], 40)
+		self.assertEqual(len(resp.data['ids']), 40)
+		# Batched inserts: query count does not grow with the number of rows
+		self.assertLess(len(ctx), 40)
+		created = AlumniSurvey.objects.filter(pk__in=resp.data['ids'])
+		self.assertEqual(created.filter(program_key='bs nursing', graduation_year=2020).count(), 40)
+		self.assertEqual(EmploymentRecord.objects.filter(survey__in=created).count(), 80)
+		self.assertEqual(counter_drift(), {})
+		self.assertEqual(job_difficulty_counts(created), {'Lack of experience': 40})
+
+	def test_invalid_rows_are_reported_and_nothing_is_written(self):
+		rows = self._rows(3)
+		rows[1]['last_name'] = ''
+		rows[2]['employment_records'] = [{'company_name': 'x' * 300}]
+		before = AlumniSurvey.objects.count()
+		resp = self.client.post('/api/alumni-surveys/bulk/', rows, format='json')
+		self.assertEqual(resp.status_code, 400)
+		self.assertEqual([error['index'] for error in resp.data['errors']], [1, 2])
+		self.assertIn('last_name', resp.data['errors'][0]['errors'])
+		self.assertEqual(AlumniSurvey.objects.count(), before)
+
+	def test_requires_admin_or_program_head(self):
+		self.client.credentials()
+		resp = self.client.post('/api/alumni-surveys/bulk/', self._rows(1), format='json')
+		self.assertEqual(resp.status_code, 403)
+
+	def test_reads_back_ids_without_bulk_returning(self):
+		# MySQL cannot return primary keys from a multi-row INSERT
+		from unittest import mock
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+		from .models import EmploymentRecord
+		from .serializers import AlumniSurveyListSerializer
+		with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', new_callable=mock.PropertyMock, return_value=False):
+			with mock.patch.object(AlumniSurveyListSerializer, 'batch_size', 2), CaptureQueriesContext(connection) as ctx:
+				resp = self.client.post('/api/alumni-surveys/bulk/', self._rows(5), format='json')
+		self.assertEqual(resp.status_code, 201)
+		# One INSERT per batch, each followed by a read of the last inserted id
+		sql = [q['sql'] for q in ctx.captured_queries]
+		survey_inserts = [i for i, statement in enumerate(sql) if statement.startswith('INSERT INTO "users_alumnisurvey"')]
+		self.assertEqual(len(survey_inserts), 3)
+		self.assertTrue(all('last_insert_rowid' in sql[i + 1] for i in survey_inserts))
+		self.assertEqual(list(AlumniSurvey.objects.filter(pk__in=resp.data['ids']).order_by('id').values_list('last_name', flat=True)), [f'Paper{i}' for i in range(5)])
+		for survey_id, i in zip(resp.data['ids'], range(5)):
+			self.assertEqual(set(EmploymentRecord.objects.filter(survey_id=survey_id).values_list('company_name', flat=True)), {f'Clinic {i}', 'Hospital'})
+		self.assertEqual(counter_drift(), {})
+
+
+class EmploymentRecordSyncTest(TestCase):
+	def setUp(self):
+		from .models import EmploymentRecord
+		cache.clear()
+		self.client = APIClient()
+		self.client.credentials(HTTP_X_ACTING_ROLE='admin')
+		self.survey = AlumniSurvey.objects.create(last_name='Sync', first_name='Test')
+		self.kept = EmploymentRecord.objects.create(survey=self.survey, company_name='Acme', position_and_status='Dev')
+		self.edited = EmploymentRecord.objects.create(survey=self.survey, company_name='Globex')
+		self.removed = EmploymentRecord.objects.create(survey=self.survey, company_name='Initech')
+
+	def _patch(self, records):
+		return self.client.patch(f'/api/alumni-surveys/{self.survey.pk}/', {'employment_records': records}, format='json')
+
+	def test_update_applies_only_the_differences(self):
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+		from .models import EmploymentRecord
+		records = [
+			{'id': self.kept.pk, 'company_name': 'Acme', 'position_and_status': 'Dev'},
+			{'id': self.edited.pk, 'company_name': 'Globex Corp'},
+			{'company_name': 'Umbrella'},
+		]
+		with CaptureQueriesContext(connection) as ctx:
+			resp = self._patch(records)
+		self.assertEqual(resp.status_code, 200)
+		rows = {record.company_name: record.pk for record in EmploymentRecord.objects.filter(survey=self.survey)}
+		self.assertEqual(rows['Acme'], self.kept.pk)
+		self.assertEqual(rows['Globex Corp'], self.edited.pk)
+		self.assertNotIn('Initech', rows)
+		self.assertIn('Umbrella', rows)
+		writes = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith(('INSERT INTO "users_employmentrecord"', 'UPDATE "users_employmentrecord"', 'DELETE FROM "users_employmentrecord"'))]
+		# One bulk update, one bulk insert, one delete; the unchanged row is untouched
+		self.assertEqual(len(writes), 3)
+		self.assertEqual(sorted(record['company_name'] for record in resp.data['employment_records']), ['Acme', 'Globex Corp', 'Umbrella'])
+
+	def test_records_without_ids_keep_matching_rows(self):
+		from .models import EmploymentRecord
+		resp = self._patch([
+			{'company_name': 'Acme', 'position_and_status': 'Dev'},
+			{'company_name': 'Globex'},
+		])
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(
+			set(EmploymentRecord.objects.filter(survey=self.survey).values_list('pk', flat=True)),
+			{self.kept.pk, self.edited.pk},
+		)
+
+	def test_missing_and_null_values_match_blank_columns(self):
+		from .models import EmploymentRecord
+		from .serializers import sync_employment_records
+		sync_employment_records(self.survey, [
+			{'company_name': 'Acme', 'position_and_status': 'Dev', 'date_employed': None},
+			{'company_name': 'Globex', 'monthly_salary_range': ''},
+		])
+		self.assertEqual(
+			set(EmploymentRecord.objects.filter(survey=self.survey).values_list('pk', flat=True)),
+			{self.kept.pk, self.edited.pk},
+		)
+
+	def test_ids_from_another_survey_are_not_reassigned(self):
+		from .models import EmploymentRecord
+		other = AlumniSurvey.objects.create(last_name='Other', first_name='Survey')
+		foreign = EmploymentRecord.objects.create(survey=other, company_name='Foreign')
+		self._patch([{'id': foreign.pk, 'company_name': 'Hijacked'}])
+		foreign.refresh_from_db()
+		self.assertEqual(foreign.company_name, 'Foreign')
+		self.assertEqual(foreign.survey_id, other.pk)
+		self.assertEqual(list(EmploymentRecord.objects.filter(survey=self.survey).values_list('company_name', flat=True)), ['Hijacked'])
+
+
+class AuthorCacheTest(TestCase):
+	def setUp(self):
+		from .author_cache import clear_local
+		from .models import Alumni
+		cache.clear()
+		clear_local()
+		self.alumni = [
+			Alumni.objects.create(username=f'author{n}', email=f'author{n}@example.com', password='x', full_name=f'Author {n}')
+			for n in range(3)
+		]
+		self.ids = [a.pk for a in self.alumni]
+
+	def _counter(self, name, labels=None):
+		from alumni_backend import metrics
+		return metrics._counters.get(metrics._key(name, labels or {}), 0)
+
+	def test_levels_and_counters(self):
+		from .author_cache import clear_local, get_author_info
+		misses = self._counter('author_cache_misses_total')
+		with self.assertNumQueries(1):
+			info = get_author_info(self.ids + [999999])
+		self.assertEqual(info[self.ids[0]], ('Author 0', None))
+		self.assertNotIn(999999, info)
+		self.assertEqual(self._counter('author_cache_misses_total') - misses, 4)
+
+		local_hits = self._counter('author_cache_hits_total', {'level': 'local'})
+		with self.assertNumQueries(0):
+			self.assertEqual(get_author_info(self.ids + [999999]), info)
+		self.assertEqual(self._counter('author_cache_hits_total', {'level': 'local'}) - local_hits, 4)
+
+		# Another process starts with an empty LRU but shares the cache backend
+		clear_local()
+		shared_hits = self._counter('author_cache_hits_total', {'level': 'shared'})
+		with self.assertNumQueries(0):
+			self.assertEqual(get_author_info(self.ids), {i: info[i] for i in self.ids})
+		self.assertEqual(self._counter('author_cache_hits_total', {'level': 'shared'}) - shared_hits, 3)
+
+	def test_save_and_delete_invalidate(self):
+		from .author_cache import clear_local, get_author_info
+		get_author_info(self.ids)
+		self.alumni[0].full_name = 'Renamed Author'
+		self.alumni[0].image = 'alumni_images/new.jpg'
+		self.alumni[0].save()
+		self.alumni[1].delete()
+		info = get_author_info(self.ids)
+		self.assertEqual(info[self.ids[0]], ('Renamed Author', '/media/alumni_images/new.jpg'))
+		self.assertNotIn(self.ids[1], info)
+		clear_local()
+		self.assertEqual(get_author_info(self.ids), info)
+
+
+class MetricsEndpointTest(TestCase):
+	def setUp(self):
+		import tempfile
+		from django.test import override_settings
+		cache.clear()
+		self.client = APIClient()
+		self.metrics_dir = tempfile.TemporaryDirectory()
+		self.addCleanup(self.metrics_dir.cleanup)
+		overrides = override_settings(METRICS_DIR=self.metrics_dir.name)
+		overrides.enable()
+		self.addCleanup(overrides.disable)
+
+	def _admin_token(self):
+		from django.core.signing import dumps
+		return dumps({'id': 1, 'username': 'root', 'user_type': 'admin'}, salt='user-auth-token')
+
+	def test_requires_admin(self):
+		from django.core.signing import dumps
+		self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+		alumni = dumps({'id': 1, 'username': 'a', 'user_type': 'alumni'}, salt='user-auth-token')
+		self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {alumni}')
+		self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+	def test_reports_per_endpoint_metrics_across_processes(self):
+		import json
+		import os
+		self.client.get('/api/survey-aggregates/')
+		self.client.get('/api/survey-aggregates/')
+		# Another (running) worker process's snapshot
+		from alumni_backend.metrics import _process_start
+		other = f'{os.getppid()}-{_process_start(os.getppid()) or "t0"}.json'
+		with open(os.path.join(self.metrics_dir.name, other), 'w') as handle:
+			json.dump({
+				'counters': [['http_requests_total', [['endpoint', 'survey-aggregates'], ['method', 'GET'], ['status', '200']], 3]],
+				'histograms': [],
+			}, handle)
+		self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self._admin_token()}')
+		resp = self.client.get('/api/metrics/')
+		self.assertEqual(resp.status_code, 200)
+		self.assertIn('text/plain', resp['Content-Type'])
+		lines = resp.content.decode('utf-8').splitlines()
+		values = {}
+		for line in lines:
+			if not line.startswith('#'):
+				name, value = line.rsplit(' ', 1)
+				values[name] = float(value)
+		labels = '{endpoint="survey-aggregates",method="GET"'
+		self.assertGreaterEqual(values['alumni_http_requests_total' + labels + ',status="200"}'], 5)
+		self.assertGreaterEqual(values['alumni_http_request_duration_seconds_count' + labels + '}'], 2)
+		self.assertIn('alumni_http_request_duration_seconds_bucket' + labels + ',le="+Inf"}', values)
+		self.assertGreater(values['alumni_http_db_queries_total' + labels + '}'], 0)
+		self.assertGreater(values['alumni_http_response_bytes_total' + labels + '}'], 0)
+		self.assertIn('# TYPE alumni_http_request_duration_seconds histogram', lines)
+
+	def test_snapshots_of_exited_processes_are_retired_not_dropped(self):
+		import json
+		import os
+		import subprocess
+		import sys
+		from alumni_backend.metrics import RETIRED_FILE, _process_start, collect
+		exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+		exited.wait()
+		stale = {
+			f'{exited.pid}-1.json': 7,
+			# A live pid with another start time: the pid was recycled
+			f'{os.getppid()}-1.json': 11,
+		}
+		if _process_start(os.getppid()) is None:
+			stale.pop(f'{os.getppid()}-1.json')
+		for filename, value in stale.items():
+			with open(os.path.join(self.metrics_dir.name, filename), 'w') as handle:
+				json.dump({'counters': [['jobs_total', [['queue', 'x']], value]], 'histograms': []}, handle)
+		total = sum(stale.values())
+		counters, _ = collect()
+		# The exited processes' totals are kept, so the counter does not reset
+		self.assertEqual(counters[('jobs_total', (('queue', 'x'),))], total)
+		remaining = os.listdir(self.metrics_dir.name)
+		for filename in stale:
+			self.assertNotIn(filename, remaining)
+		self.assertIn(RETIRED_FILE, remaining)
+		counters, _ = collect()
+		self.assertEqual(counters[('jobs_total', (('queue', 'x'),))], total)
+
+
+class QueryBudgetTest(TestCase):
+	"""Every users route stays within its QUERY_BUDGETS entry (users/urls.py) on a realistically sized database."""
+
+	@classmethod
+	def setUpTestData(cls):
+		from .models import Admin, Alumni, EmploymentRecord, Notification, Program, SurveyChangeRequest
+		cls.admin = Admin.objects.create(username='root', email='root@example.com', password='secret123', full_name='Root Admin')
+		Alumni.objects.bulk_create([
+			Alumni(username=f'alumni{i}', email=f'alumni{i}@example.com', password='secret123', full_name=f'Alumni {i}', program_course='BS Nursing', year_graduated=2018 + i % 4)
+			for i in range(200)
+		])
+		cls.alumni = Alumni.objects.order_by('id').first()
+		alumni_ids = list(Alumni.objects.values_list('id', flat=True))
+		ProgramHead.objects.bulk_create([
+			ProgramHead(username=f'head{i}', name=f'Head{i}', surname='Person', gender='F', contact='0917', email=f'head{i}@example.com', faculty='FACET', program=f'Program {i}', password='secret123')
+			for i in range(30)
+		])
+		heads = list(ProgramHead.objects.all())
+		cls.program_head = heads[0]
+		Program.objects.bulk_create([
+			Program(program_name=f'Program {i}', program_head=heads[i % len(heads)], faculty='FACET')
+			for i in range(60)
+		])
+		_seed_surveys(300)
+		surveys = list(AlumniSurvey.objects.all())
+		for index, survey in enumerate(surveys):
+			survey.alumni_id = alumni_ids[index % len(alumni_ids)]
+		AlumniSurvey.objects.bulk_update(surveys, ['alumni'])
+		EmploymentRecord.objects.bulk_create([
+			EmploymentRecord(survey=survey, company_name=f'Company {n}', position_and_status='Staff')
+			for survey in surveys for n in range(2)
+		])
+		cls.survey = surveys[0]
+		SurveyChangeRequest.objects.bulk_create([
+			SurveyChangeRequest(alumni_id=alumni_ids[i], message='Please fix my year') for i in range(100)
+		])
+		Notification.objects.bulk_create([Notification(title=f'Notice {i}', message='Body') for i in range(100)])
+		cls.notification = Notification.objects.first()
+		rebuild_survey_counters()
+
+	def setUp(self):
+		import tempfile
+		from django.test import override_settings
+		from .export_jobs import request_export, run_export_job
+		cache.clear()
+		self.client = APIClient()
+		self.media = tempfile.TemporaryDirectory()
+		self.addCleanup(self.media.cleanup)
+		overrides = override_settings(MEDIA_ROOT=self.media.name, EXPORT_JOBS_RUN_IN_PROCESS=False)
+		overrides.enable()
+		self.addCleanup(overrides.disable)
+		self.export_job, _ = request_export('csv', {'year': '2019'})
+		run_export_job(self.export_job.pk)
+
+	def _survey_payload(self, n=0):
+		return {
+			'last_name': f'Budget{n}', 'first_name': 'Test', 'year_graduated': '2021', 'course_program': 'BS Nursing',
+			'job_difficulties': ['No openings'],
+			'employment_records': [{'company_name': 'Acme'}, {'company_name': 'Globex'}],
+		}
+
+	def _requests(self):
+		from django.core.signing import dumps
+		survey_records = list(self.survey.employment_records.values('id', 'company_name'))
+		survey_records[0]['company_name'] = 'Renamed'
+		token = dumps({'id': self.alumni.pk, 'username': self.alumni.username, 'user_type': 'alumni'}, salt='user-auth-token')
+		admin = {'HTTP_X_ACTING_ROLE': 'admin'}
+		return [
+			('admin-list-create', 'GET', {}, None, {}),
+			('alumni-list-create', 'GET', {}, None, {}),
+			('programhead-list-create', 'GET', {}, None, {}),
+			('admin-detail', 'GET', {'pk': self.admin.pk}, None, {}),
+			('alumni-detail', 'GET', {'pk': self.alumni.pk}, None, {}),
+			('login', 'POST', {}, {'username': self.alumni.username, 'password': 'secret123', 'user_type': 'alumni'}, {}),
+			('alumni-change-password', 'POST', {'pk': self.alumni.pk}, {'current_password': 'secret123', 'new_password': 'secret1234'}, {}),
+			('programhead-detail', 'GET', {'pk': self.program_head.pk}, None, {}),
+			('token-validate', 'POST', {}, {'token': token}, {}),
+			('alumni-consent', 'POST', {}, {'user_id': self.alumni.pk, 'consent': True}, {}),
+			('alumni-survey-list-create', 'GET', {}, None, {}),
+			('alumni-survey-list-create', 'GET', {}, {'page_size': 100, 'program': 'BS Nursing'}, {}),
+			('alumni-survey-list-create', 'POST', {}, self._survey_payload(), {}),
+			('alumni-survey-bulk-create', 'POST', {}, [self._survey_payload(n) for n in range(50)], {'HTTP_X_ACTING_ROLE': 'program_head'}),
+			('alumni-survey-export', 'GET', {}, {'format': 'csv'}, {}),
+			('alumni-survey-detail', 'GET', {'pk': self.survey.pk}, None, {}),
+			('alumni-survey-detail', 'PATCH', {'pk': self.survey.pk}, {'course_program': 'BS Nursing', 'employment_records': survey_records}, admin),
+			('survey-export-create', 'POST', {}, {'format': 'ndjson', 'program': 'BS Nursing'}, {}),
+			('survey-export-detail', 'GET', {'pk': self.export_job.pk}, None, {}),
+			('survey-export-download', 'GET', {'pk': self.export_job.pk}, None, {}),
+			('survey-aggregates', 'GET', {}, None, {}),
+			('survey-aggregates', 'GET', {}, {'group_by': 'year_graduated,program'}, {}),
+			('notifications-list-create', 'GET', {}, None, {}),
+			('notifications-detail', 'GET', {'pk': self.notification.pk}, None, {}),
+			('users-alumnisurvey-list', 'GET', {}, None, {}),
+			('survey-change-requests', 'GET', {}, None, {}),
+			('program-list-create', 'GET', {}, None, {}),
+		]
+
+	def test_routes_stay_within_query_budgets(self):
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+		from .urls import QUERY_BUDGETS
+		for name, method, kwargs, data, extra in self._requests():
+			with self.subTest(route=name, method=method):
+				budget = QUERY_BUDGETS[name][method]
+				url = reverse(name, kwargs=kwargs)
+				send = getattr(self.client, method.lower())
+				cache.clear()
+				with CaptureQueriesContext(connection) as ctx:
+					if method == 'GET':
+						resp = send(url, data, **extra)
+					else:
+						resp = send(url, data, format='json', **extra)
+					if getattr(resp, 'streaming', False):
+						b''.join(resp.streaming_content)
+				self.assertLess(resp.status_code, 400, resp.content[:200] if not getattr(resp, 'streaming', False) else '')
+				self.assertLessEqual(
+					len(ctx), budget,
+					f'{method} {name} ran {len(ctx)} queries (budget {budget}):\n' + '\n'.join(query['sql'][:160] for query in ctx.captured_queries),
+				)
+
+	def test_every_route_has_a_budget(self):
+		from .urls import QUERY_BUDGETS, urlpatterns
+		names = {pattern.name for pattern in urlpatterns if pattern.name}
+		self.assertEqual(names, set(QUERY_BUDGETS))
+		exercised = {(name, method) for name, method, _, _, _ in self._requests()}
+		budgeted = {(name, method) for name, methods in QUERY_BUDGETS.items() for method in methods}
+		self.assertEqual(budgeted - exercised, set())
+
+
+class BenchSeedTest(TestCase):
+	def test_seed_is_deterministic_and_uses_sample_names(self):
+		from alumni_backend.bench import load_alumni_rows, seed_synthetic_data
+		from .models import Alumni
+		counts = seed_synthetic_data(40, seed=7)
+		self.assertEqual(counts['alumni'], 40)
+		self.assertEqual(counts['surveys'], 40)
+		self.assertEqual(counts['posts'], 4)
+		first_name, first_course, _ = load_alumni_rows()[0]
+		first = Alumni.objects.order_by('id').first()
+		self.assertEqual((first.full_name, first.program_course), (first_name, first_course))
+		self.assertEqual(counter_drift(), {})
+		snapshot = list(AlumniSurvey.objects.order_by('id').values_list('employment_source', 'job_difficulties'))
+		# seed_synthetic_data expects an empty database
+		from posts.models import Post
+		from .models import Admin
+		for model in (Post, AlumniSurvey, Alumni, Admin):
+			model.objects.all().delete()
+		self.assertEqual(seed_synthetic_data(40, seed=7), counts)
+		self.assertEqual(list(AlumniSurvey.objects.order_by('id').values_list('employment_source', 'job_difficulties')), snapshot)
+
+	def test_compare_to_baseline_flags_slowdowns_and_extra_queries(self):
+		from alumni_backend.bench import compare_to_baseline
+		baseline = {'results': {
+			'a': {'median_ms': 10.0, 'queries': 2},
+			'b': {'median_ms': 10.0, 'queries': 2},
+			'c': {'median_ms': 10.0, 'queries': 2},
+		}}
+		current = {
+			'a': {'median_ms': 10.5, 'queries': 2},
+			'b': {'median_ms': 13.0, 'queries': 2},
+			'c': {'median_ms': 9.0, 'queries': 3},
+			'new': {'median_ms': 1.0, 'queries': 1},
+		}
+		rows = {row['scenario']: row for row in compare_to_baseline(current, baseline, threshold=0.10)}
+		self.assertEqual(set(rows), {'a', 'b', 'c'})
+		self.assertFalse(rows['a']['regression'])
+		self.assertTrue(rows['b']['regression'])
+		self.assertTrue(rows['c']['regression'])
+
+
+class ImportAlumniCommandTest(TestCase):
+	def _roster(self, rows):
+		import csv
+		import tempfile
+		handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='', encoding='utf-8')
+		self.addCleanup(__import__('os').remove, handle.name)
+		writer = csv.writer(handle)
+		writer.writerow(['Full Name', 'Course', 'Year Graduated'])
+		writer.writerows(rows)
+		handle.close()
+		return handle.name
+
+	def _run(self, path, *args):
+		import io
+		from django.core.management import call_command
+		out = io.StringIO()
+		call_command('import_alumni', path, *args, stdout=out)
+		return out.getvalue()
+
+	def test_import_upserts_by_derived_username(self):
+		from .models import Alumni
+		path = self._roster([
+			['Rico Dizon', 'Bachelor of Science in Psychology (BS Psychology)', '2019'],
+			['Jasmine  Lozada', 'Bachelor of Science in Biology (BSBio)', '1998'],
+			['', 'Bachelor of Science in Biology (BSBio)', '1998'],
+			['Peña Cruz', 'Bachelor of Elementary Education', 'n/a'],
+		])
+		output = self._run(path, '--batch-size', '2')
+		self.assertIn('3 inserted, 0 updated, 0 skipped (unchanged), 1 invalid', output)
+		rico = Alumni.objects.get(username='rico.dizon.2019.bspsychology')
+		self.assertEqual(rico.email, 'rico.dizon.2019.bspsychology@alumni.dorsu.edu.ph')
+		self.assertEqual(rico.year_graduated, 2019)
+		self.assertEqual(Alumni.objects.get(username='pena.cruz.boee').year_graduated, None)
+		self.assertEqual(Alumni.objects.get(username='jasmine.lozada.1998.bsbio').full_name, 'Jasmine Lozada')
+		password = rico.password
+
+		# A corrected course name updates the existing account in place
+		updated = self._roster([['Rico Dizon', 'BS in Psychology (BS Psychology)', '2019']])
+		self.assertIn('0 inserted, 1 updated', self._run(updated))
+		rico.refresh_from_db()
+		self.assertEqual(rico.program_course, 'BS in Psychology (BS Psychology)')
+		self.assertEqual(rico.password, password)
+		self.assertEqual(Alumni.objects.count(), 3)
+
+	def test_reimport_keeps_changed_email_and_reports_duplicates(self):
+		from .models import Alumni
+		rows = [
+			['Rico Dizon', 'Bachelor of Science in Psychology (BS Psychology)', '2019'],
+			['Rico Dizon', 'Bachelor of Science in Psychology (BS Psychology)', '2019'],
+			['Jasmine Lozada', 'Bachelor of Science in Biology (BSBio)', '1998'],
+			['Rico  Dizon', 'BS Psychology (BS Psychology)', '2019'],
+		]
+		output = self._run(self._roster(rows), '--batch-size', '2')
+		self.assertIn('2 inserted, 0 updated, 0 skipped (unchanged), 0 invalid, 2 duplicate', output)
+		rico = Alumni.objects.get(username='rico.dizon.2019.bspsychology')
+		self.assertEqual(rico.program_course, 'Bachelor of Science in Psychology (BS Psychology)')
+
+		Alumni.objects.filter(pk=rico.pk).update(email='rico@example.com')
+		self._run(self._roster([['Rico Dizon', 'BS in Psychology (BS Psychology)', '2019']]))
+		rico.refresh_from_db()
+		self.assertEqual(rico.program_course, 'BS in Psychology (BS Psychology)')
+		self.assertEqual(rico.email, 'rico@example.com')
+
+	def test_reimport_skips_unchanged_rows(self):
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+		from .models import Alumni, AlumniImportLedger
+		rows = [
+			['Rico Dizon', 'Bachelor of Science in Psychology (BS Psychology)', '2019'],
+			['Jasmine Lozada', 'Bachelor of Science in Biology (BSBio)', '1998'],
+		]
+		self.assertIn('2 inserted, 0 updated, 0 skipped', self._run(self._roster(rows)))
+		self.assertEqual(AlumniImportLedger.objects.count(), 2)
+
+		# Spacing differences do not count as a change, and a row repeated in
+		# the same batch is counted once
+		same = self._roster([['Rico  Dizon ', 'Bachelor of Science in Psychology (BS Psychology)', '2019'], rows[1], rows[1]])
+		with CaptureQueriesContext(connection) as ctx:
+			output = self._run(same)
+		self.assertIn('0 inserted, 0 updated, 2 skipped (unchanged), 0 invalid, 1 duplicate', output)
+		self.assertFalse([q for q in ctx.captured_queries if not q['sql'].lstrip().upper().startswith('SELECT')])
+
+		# A capitalisation fix is a change
+		recased = self._roster([['Rico DIZON', 'Bachelor of Science in Psychology (BS Psychology)', '2019'], rows[1]])
+		self.assertIn('0 inserted, 1 updated, 1 skipped', self._run(recased))
+		self.assertEqual(Alumni.objects.get(username='rico.dizon.2019.bspsychology').full_name, 'Rico DIZON')
+
+		changed = self._roster([['Rico Dizon', 'BS in Psychology (BS Psychology)', '2019'], rows[1]])
+		self.assertIn('0 inserted, 1 updated, 1 skipped', self._run(changed))
+		self.assertEqual(Alumni.objects.get(username='rico.dizon.2019.bspsychology').program_course, 'BS in Psychology (BS Psychology)')
+
+		# A deleted account loses its ledger entry and is imported again
+		Alumni.objects.filter(username='jasmine.lozada.1998.bsbio').delete()
+		self.assertIn('1 inserted, 0 updated, 1 skipped', self._run(changed))
+		self.assertTrue(Alumni.objects.filter(username='jasmine.lozada.1998.bsbio').exists())
+
+	def test_dry_run_writes_nothing(self):
+		from .models import Alumni
+		path = self._roster([['Rico Dizon', 'BS Psychology', '2019']])
+		self.assertIn('Would import 1 rows', self._run(path, '--dry-run'))
+		self.assertFalse(Alumni.objects.exists())
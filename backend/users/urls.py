@@ -12,6 +12,11 @@ from .views import (
     ProgramHeadDetailView,
     AlumniSurveyListCreateView,
     AlumniSurveyDetailView,
+    AlumniSurveyExportView,
+    AlumniSurveyBulkCreateView,
+    SurveyExportJobCreateView,
+    SurveyExportJobDetailView,
+    SurveyExportJobDownloadView,
     SurveyAggregatesView,
     SurveyChangeRequestListCreateView,
     AlumniChangePasswordView,
@@ -32,7 +37,13 @@ urlpatterns = [
     path('alumni/consent/', AlumniConsentView.as_view(), name='alumni-consent'),
     # Survey endpoints
     path('alumni-surveys/', csrf_exempt(AlumniSurveyListCreateView.as_view()), name='alumni-survey-list-create'),
+    path('alumni-surveys/bulk/', csrf_exempt(AlumniSurveyBulkCreateView.as_view()), name='alumni-survey-bulk-create'),
+    path('alumni-surveys/export/', AlumniSurveyExportView.as_view(), name='alumni-survey-export'),
     path('alumni-surveys/<int:pk>/', csrf_exempt(AlumniSurveyDetailView.as_view()), name='alumni-survey-detail'),
+    # Background exports: queue a job, poll its progress, then download the file
+    path('survey-exports/', csrf_exempt(SurveyExportJobCreateView.as_view()), name='survey-export-create'),
+    path('survey-exports/<int:pk>/', SurveyExportJobDetailView.as_view(), name='survey-export-detail'),
+    path('survey-exports/<int:pk>/download/', SurveyExportJobDownloadView.as_view(), name='survey-export-download'),
     path('survey-aggregates/', SurveyAggregatesView.as_view(), name='survey-aggregates'),
     # Notifications persisted server-side so multiple admin accounts see the same alerts
     path('notifications/', csrf_exempt(NotificationListCreateView.as_view()), name='notifications-list-create'),
@@ -42,3 +53,35 @@ urlpatterns = [
     path('survey-change-requests/', csrf_exempt(SurveyChangeRequestListCreateView.as_view()), name='survey-change-requests'),
     path('programs/', ProgramListCreateView.as_view(), name='program-list-create'),
 ]
+
+# Maximum number of database queries each route may run per request, by HTTP
+# method. Enforced by QueryBudgetTest in users/tests.py against a seeded
+# database of realistic size, so an N+1 query shows up as a test failure.
+# Every named route above needs an entry; raise a budget only together with
+# the change that needs it.
+QUERY_BUDGETS = {
+    'admin-list-create': {'GET': 1},
+    'alumni-list-create': {'GET': 1},
+    'programhead-list-create': {'GET': 1},
+    'admin-detail': {'GET': 1},
+    'alumni-detail': {'GET': 1},
+    'alumni-change-password': {'POST': 2},
+    'programhead-detail': {'GET': 1},
+    'login': {'POST': 1},
+    'token-validate': {'POST': 0},
+    'alumni-consent': {'POST': 1},
+    # Survey writes also adjust the dashboard counters (one INSERT, one UPDATE)
+    'alumni-survey-list-create': {'GET': 2, 'POST': 13},
+    'alumni-survey-bulk-create': {'POST': 10},
+    'alumni-survey-export': {'GET': 3},
+    'alumni-survey-detail': {'GET': 2, 'PATCH': 13},
+    'survey-export-create': {'POST': 2},
+    'survey-export-detail': {'GET': 1},
+    'survey-export-download': {'GET': 1},
+    'survey-aggregates': {'GET': 1},
+    'notifications-list-create': {'GET': 1},
+    'notifications-detail': {'GET': 1},
+    'users-alumnisurvey-list': {'GET': 2},
+    'survey-change-requests': {'GET': 1},
+    'program-list-create': {'GET': 1},
+}
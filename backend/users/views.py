@@ -8,12 +8,24 @@ from .models import Admin, Alumni, ProgramHead, Program, Notification
 from .serializers import AdminSerializer, AlumniSerializer, ProgramHeadSerializer, ProgramSerializer, NotificationSerializer
 from rest_framework import generics
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from .models import AlumniSurvey, EmploymentRecord
+from .models import AlumniSurvey, EmploymentRecord, normalize_program_key, program_key_q
 from .serializers import AlumniSurveySerializer
 from .serializers import SurveyChangeRequestSerializer
+from .aggregates import compute_survey_aggregates
+from .survey_counters import read_grouped_survey_aggregates, read_survey_aggregates, record_survey_change, survey_counter_buckets
+from .cache import survey_cache_key, survey_cache_timeout
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.response import Response
 from rest_framework import status
-from django.utils import timezone
+from alumni_backend.pagination import KeysetPagination
+from django.http import StreamingHttpResponse
+from rest_framework.negotiation import DefaultContentNegotiation
+from .exports import EXPORT_FORMATS, export_content_type, filter_surveys, iter_export_lines
+from .export_jobs import request_export
+from .models import ExportJob
+from .serializers import ExportJobSerializer
+from django.http import FileResponse
 
 
 # Helper: determine acting role from header or request body.
@@ -91,7 +103,8 @@ class AlumniConsentView(APIView):
 
 
 class ProgramListCreateView(generics.ListCreateAPIView):
-	queryset = Program.objects.all()
+	# program_head_name reads the linked head; join it instead of one query per program
+	queryset = Program.objects.select_related('program_head')
 	serializer_class = ProgramSerializer
 
 	def list(self, request, *args, **kwargs):
@@ -483,153 +496,58 @@ class NotificationDetailView(generics.RetrieveDestroyAPIView):
 class SurveyAggregatesView(APIView):
 	"""Return aggregated, non-identifying survey statistics for charts.
 	This endpoint only returns counts and simple aggregates (no PII).
+
+	Pass `group_by=year_graduated` (optionally `group_by=year_graduated,program`
+	or just `program`) to get every dimension bucketed per group in a single
+	response, e.g. for the multi-year trend chart.
 	"""
+	GROUP_BY_COLUMNS = {'year_graduated': 'year', 'year': 'year', 'program': 'program'}
 
 	def get(self, request):
+		group_columns = ()
+		group_by = request.query_params.get('group_by')
+		if group_by:
+			requested = [part.strip() for part in group_by.split(',') if part.strip()]
+			if not requested or any(part not in self.GROUP_BY_COLUMNS for part in requested):
+				return Response({'error': 'group_by must be year_graduated and/or program'}, status=status.HTTP_400_BAD_REQUEST)
+			group_columns = tuple(dict.fromkeys(self.GROUP_BY_COLUMNS[part] for part in requested))
 		try:
 			# Allow optional server-side filtering to support dashboard filters without
 			# transferring all survey rows to the client. Supported query params:
 			# - year: graduation year (exact match when numeric)
-			# - program: program/course name (case-insensitive contains)
+			# - program: program/course name (case- and whitespace-insensitive; an
+			#   exact program name, else any program containing the text)
+			# Both filter on the indexed normalized columns.
 			qs = AlumniSurvey.objects.all()
 			year = request.query_params.get('year')
 			program = request.query_params.get('program')
+			yi = None
 			if year:
 				try:
 					yi = int(year)
-					qs = qs.filter(year_graduated=yi)
+					qs = qs.filter(graduation_year=yi)
 				except Exception:
 					# non-numeric year; ignore the filter
 					pass
-			if program:
-				# use case-insensitive contains so partial names work (e.g. 'computer')
-				qs = qs.filter(course_program__icontains=program)
-			# employed counts
-			employed_counts = {}
-			for row in qs.values_list('employed_after_graduation', flat=True):
-				key = (row or 'Unknown')
-				employed_counts[key] = employed_counts.get(key, 0) + 1
-
-			# employment source
-			source_counts = {}
-			for row in qs.values_list('employment_source', flat=True):
-				key = (row or 'Unknown')
-				source_counts[key] = source_counts.get(key, 0) + 1
-
-			# work performance
-			perf_counts = {}
-			for row in qs.values_list('work_performance_rating', flat=True):
-				key = (row or 'Unrated')
-				perf_counts[key] = perf_counts.get(key, 0) + 1
-
-			# programs
-			prog_counts = {}
-			for row in qs.values_list('course_program', flat=True):
-				key = (row or 'Unknown')
-				prog_counts[key] = prog_counts.get(key, 0) + 1
-
-			# promoted
-			promoted_counts = {}
-			for row in qs.values_list('has_been_promoted', flat=True):
-				key = (row or 'Unknown')
-				promoted_counts[key] = promoted_counts.get(key, 0) + 1
-
-			# jobs related
-			jobs_related_counts = {}
-			for row in qs.values_list('jobs_related_to_experience', flat=True):
-				key = (row or 'Unknown')
-				jobs_related_counts[key] = jobs_related_counts.get(key, 0) + 1
-
-			# Self-employment: prefer the explicit `has_own_business` column when present
-			# and fall back to the legacy `company_affiliation` proxy if it's missing.
-			selfemp_counts = None
-			has_counts = None
-			try:
-				# Try to read an explicit has_own_business column from the queryset
-				vals = list(qs.values_list('has_own_business', flat=True))
-				# If the column exists, vals will be a list (possibly empty). Normalize values.
-				if vals is not None:
-					has_counts = {'Yes': 0, 'No': 0}
-					for v in vals:
-						if v is None:
-							# Treat missing/NULL as 'No' (consistent with prior proxy behaviour)
-							has_counts['No'] += 1
-							continue
-						# Boolean values
-						if isinstance(v, bool):
-							if v:
-								has_counts['Yes'] += 1
-							else:
-								has_counts['No'] += 1
-							continue
-						# String / numeric-like values: coerce to lower-case string and check common truthy values
-						s = str(v).strip().lower()
-						if s in ('yes', 'y', 'true', 't', '1'):
-							has_counts['Yes'] += 1
-						elif s in ('no', 'n', 'false', 'f', '0'):
-							has_counts['No'] += 1
-						else:
-							# Unknown textual values: count as 'No' to avoid overstating self-employment
-							has_counts['No'] += 1
-			except Exception:
-				# Column doesn't exist or DB error — leave has_counts as None and fall back
-				has_counts = None
-
-			if has_counts is not None:
-				selfemp_counts = dict(has_counts)
-			else:
-				# Fallback: infer from company_affiliation presence (legacy behaviour)
-				selfemp_counts = { 'Yes': 0, 'No': 0 }
-				for row in qs.values_list('company_affiliation', flat=True):
-					if row:
-						selfemp_counts['Yes'] += 1
-					else:
-						selfemp_counts['No'] += 1
-
-			# job difficulties - JSONField list
-			job_difficulties_counts = {}
-			for jd in qs.values_list('job_difficulties', flat=True):
-				if not jd:
-					continue
-				# jd is expected to be a list (JSONField)
-				if isinstance(jd, (list, tuple)):
-					for item in jd:
-						if not item:
-							continue
-						job_difficulties_counts[item] = job_difficulties_counts.get(item, 0) + 1
-				else:
-					# if stored as comma-separated string
-					parts = str(jd).split(',')
-					for item in parts:
-						it = item.strip()
-						if not it:
-							continue
-						job_difficulties_counts[it] = job_difficulties_counts.get(it, 0) + 1
-
-			# compute unfiltered total for UI (useful to show "X of Y responses")
-			unfiltered_total = AlumniSurvey.objects.count()
-			# compute surveys in the current month (server local timezone)
-			now = timezone.now()
-			try:
-				this_month_count = AlumniSurvey.objects.filter(created_at__year=now.year, created_at__month=now.month).count()
-			except Exception:
-				# created_at may not exist or be named differently; fall back to 0
-				this_month_count = 0
-			data = {
-				'employed': employed_counts,
-				'sources': source_counts,
-				'performance': perf_counts,
-				'programs': prog_counts,
-				'promoted': promoted_counts,
-				'jobs_related': jobs_related_counts,
-				'self_employment': selfemp_counts,
-				# Provide explicit has_own_business counts (prefer DB column when available)
-				'has_own_business': (has_counts if has_counts is not None else selfemp_counts),
-				'job_difficulties': job_difficulties_counts,
-				'count': qs.count(),
-				'total_count': unfiltered_total,
-				'surveys_this_month': this_month_count,
-			}
+			# Dashboards poll this endpoint from every open tab; serve repeated
+			# identical requests from the cache until a survey write bumps the
+			# version stamp (see users/cache.py).
+			cache_key = survey_cache_key('survey-aggregates', yi, normalize_program_key(program), ','.join(group_columns))
+			data = cache.get(cache_key)
+			if data is None and group_columns:
+				data = read_grouped_survey_aggregates(group_columns, year=yi, program=program)
+				data['group_by'] = ['year_graduated' if column == 'year' else column for column in group_columns]
+				cache.set(cache_key, data, survey_cache_timeout())
+			elif data is None:
+				# Read the pre-summed counters (O(number of buckets)). Until the counter
+				# table has been backfilled, count the surveys directly with grouped
+				# queries (see users/aggregates.py).
+				data = read_survey_aggregates(year=yi, program=program)
+				if data is None:
+					if program:
+						qs = qs.filter(program_key_q(program, AlumniSurvey))
+					data = compute_survey_aggregates(qs, filtered=bool(year or program))
+				cache.set(cache_key, data, survey_cache_timeout())
 			return Response(data, status=status.HTTP_200_OK)
 		except Exception as e:
 			# Log and return generic error
@@ -723,35 +641,44 @@ class SurveyChangeRequestListCreateView(generics.ListCreateAPIView):
 		return response
 
 
+class SurveyListPagination(KeysetPagination):
+	# The dashboard's older `limit` parameter is read as the page size
+	legacy_page_size_query_param = 'limit'
+
+	def get_page_size(self, request):
+		params = request.query_params
+		if self.page_size_query_param not in params and params.get(self.legacy_page_size_query_param):
+			try:
+				size = int(params[self.legacy_page_size_query_param])
+			except (TypeError, ValueError):
+				size = 0
+			if size > 0:
+				return min(size, self.max_page_size)
+		return super().get_page_size(request)
+
+
 class AlumniSurveyListCreateView(generics.ListCreateAPIView):
-	queryset = AlumniSurvey.objects.all().order_by('-created_at')
+	# Load the linked alumni (alumni_info) and nested employment records in bulk
+	# so serializing N surveys takes a constant number of queries.
+	queryset = AlumniSurvey.objects.select_related('alumni').prefetch_related('employment_records').order_by('-created_at')
 	serializer_class = AlumniSurveySerializer
 	parser_classes = [JSONParser, MultiPartParser, FormParser]
+	pagination_class = SurveyListPagination
 
 	def list(self, request, *args, **kwargs):
 		# Allow filtering by alumni id (frontend uses ?alumni=<id>) so a user
 		# only sees their own surveys. Also support year, program and limit
 		# so the React dashboard can request a filtered slice of rows.
-		alumni_id = request.query_params.get('alumni')
-		year = request.query_params.get('year')
-		program = request.query_params.get('program')
+		# Responses are keyset-paginated pages, {next, prev, results} ordered
+		# newest first (`page_size`, or `limit`, rows per page). With
+		# SURVEY_LIST_UNPAGINATED = True, requests without `cursor`/`page_size`
+		# get the old bare list of every matching row instead.
 		limit = request.query_params.get('limit')
-		qs = self.get_queryset()
-		if alumni_id:
-			try:
-				alumni_id_int = int(alumni_id)
-				qs = qs.filter(alumni_id=alumni_id_int)
-			except Exception:
-				pass
-		if year:
-			try:
-				yi = int(year)
-				qs = qs.filter(year_graduated=yi)
-			except Exception:
-				# ignore non-numeric years
-				pass
-		if program:
-			qs = qs.filter(course_program__icontains=program)
+		qs = filter_surveys(self.get_queryset(), request.query_params)
+		if self.paginator.is_requested(request) or not getattr(settings, 'SURVEY_LIST_UNPAGINATED', False):
+			page = self.paginator.paginate_queryset(qs, request, view=self)
+			serializer = self.get_serializer(page, many=True)
+			return self.paginator.get_paginated_response(serializer.data)
 		# Apply limit (0 or missing => no limit / return all)
 		try:
 			if limit is not None:
@@ -781,11 +708,115 @@ class AlumniSurveyListCreateView(generics.ListCreateAPIView):
 			raise
 
 
+class AlumniSurveyBulkCreateView(APIView):
+	"""POST: create many surveys from a JSON array of survey payloads.
+
+	Meant for program heads and admins keying in paper tracer forms. Every
+	row is validated first; if any row is invalid nothing is written and the
+	response lists the errors by row index. Otherwise all rows are inserted in
+	one transaction (see AlumniSurveyListSerializer) and their ids returned.
+	"""
+	parser_classes = [JSONParser]
+	max_rows = 5000
+
+	def post(self, request):
+		if _get_acting_role(request) not in ('admin', 'program_head', 'program-head', 'programhead'):
+			return Response({'detail': 'Only admins and program heads may bulk import surveys'}, status=status.HTTP_403_FORBIDDEN)
+		rows = request.data.get('surveys') if isinstance(request.data, dict) else request.data
+		if not isinstance(rows, list) or not rows:
+			return Response({'error': 'Expected a non-empty JSON array of surveys'}, status=status.HTTP_400_BAD_REQUEST)
+		if len(rows) > self.max_rows:
+			return Response({'error': f'At most {self.max_rows} surveys per request'}, status=status.HTTP_400_BAD_REQUEST)
+		serializer = AlumniSurveySerializer(data=rows, many=True)
+		if not serializer.is_valid():
+			errors = [{'index': index, 'errors': row_errors} for index, row_errors in enumerate(serializer.errors) if row_errors]
+			return Response({'created': 0, 'invalid': len(errors), 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+		surveys = serializer.save()
+		return Response({'created': len(surveys), 'ids': [survey.pk for survey in surveys], 'errors': []}, status=status.HTTP_201_CREATED)
+
+
+class _IgnoreFormatNegotiation(DefaultContentNegotiation):
+	# The export endpoint uses ?format=csv|ndjson for its own output format and
+	# always streams its response, so skip DRF's ?format= renderer lookup.
+	def select_renderer(self, request, renderers, format_suffix=None):
+		return (renderers[0], renderers[0].media_type)
+
+
+class AlumniSurveyExportView(APIView):
+	"""GET: stream every matching survey as CSV (default) or NDJSON.
+
+	Accepts the same alumni/year/program filters as the survey list. Rows are
+	read from a chunked iterator and written straight to the response, so
+	memory use does not grow with the number of surveys.
+	"""
+	content_negotiation_class = _IgnoreFormatNegotiation
+
+	def get(self, request):
+		export_format = (request.query_params.get('format') or 'csv').lower()
+		if export_format not in EXPORT_FORMATS:
+			return Response({'error': 'format must be csv or ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+		qs = filter_surveys(AlumniSurvey.objects.all(), request.query_params)
+		response = StreamingHttpResponse(iter_export_lines(qs, export_format), content_type=export_content_type(export_format))
+		response['Content-Disposition'] = f'attachment; filename="alumni_surveys.{export_format}"'
+		return response
+
+
+class SurveyExportJobCreateView(APIView):
+	"""POST: queue a background export of the matching surveys.
+
+	Takes `format` (csv or ndjson) and the survey list filters (alumni, year,
+	program) from the body or query string. Returns 202 with the new job, or
+	200 with an existing job when an identical export is already running or a
+	still-valid file for it exists.
+	"""
+	content_negotiation_class = _IgnoreFormatNegotiation
+
+	def post(self, request):
+		params = request.data if hasattr(request.data, 'get') and request.data else request.query_params
+		export_format = (params.get('format') or 'csv').lower()
+		if export_format not in EXPORT_FORMATS:
+			return Response({'error': 'format must be csv or ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+		job, created = request_export(export_format, params)
+		data = ExportJobSerializer(job, context={'request': request}).data
+		return Response(data, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+
+class SurveyExportJobDetailView(generics.RetrieveAPIView):
+	"""GET: status and progress of an export job."""
+	queryset = ExportJob.objects.all()
+	serializer_class = ExportJobSerializer
+
+
+class SurveyExportJobDownloadView(APIView):
+	"""GET: the finished export file for a job."""
+	content_negotiation_class = _IgnoreFormatNegotiation
+
+	def get(self, request, pk):
+		job = ExportJob.objects.filter(pk=pk).first()
+		if job is None:
+			return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+		if job.status != ExportJob.STATUS_DONE or not job.file:
+			return Response({'detail': 'Export is not ready', 'status': job.status}, status=status.HTTP_409_CONFLICT)
+		try:
+			handle = job.file.open('rb')
+		except FileNotFoundError:
+			return Response({'detail': 'Export file has expired'}, status=status.HTTP_410_GONE)
+		return FileResponse(handle, content_type=export_content_type(job.format), as_attachment=True, filename=f'alumni_surveys.{job.format}')
+
+
 class AlumniSurveyDetailView(generics.RetrieveUpdateDestroyAPIView):
-	queryset = AlumniSurvey.objects.all()
+	queryset = AlumniSurvey.objects.select_related('alumni').prefetch_related('employment_records')
 	serializer_class = AlumniSurveySerializer
 	parser_classes = [JSONParser, MultiPartParser, FormParser]
 
+	def perform_destroy(self, instance):
+		# Remove the survey's contribution to the dashboard counters in the same
+		# transaction as the delete.
+		from django.db import transaction
+		with transaction.atomic():
+			record_survey_change(survey_counter_buckets(instance), None)
+			instance.delete()
+
 	def update(self, request, *args, **kwargs):
 		# Enforce that only the owning alumni or an admin may update the survey.
 		instance = self.get_object()
@@ -10,7 +10,8 @@ import {
   handleUpdateUser,
   handleDeleteUser,
   startEdit,
-  cancelEdit
+  cancelEdit,
+  collectPostPages
 } from './AdminDashboardUtils';
 import UserManagementPanel from './UserManagementPanel';
 import { AssignProgramsView } from './AssignPrograms';
@@ -407,13 +408,15 @@ function AdminDashboard({ user, onLogout }) {
         }
         // Try common query param 'author_id' first, fallback to 'author'
         const headers = token ? { Authorization: `Bearer ${token}` } : {};
-        let res = await fetch(`${base}/api/posts/?author_id=${cu.id}`, { headers });
+        let url = `${base}/api/posts/?author_id=${cu.id}`;
+        let res = await fetch(url, { headers });
         if (!res.ok) {
-          res = await fetch(`${base}/api/posts/?author=${cu.id}`, { headers });
+          url = `${base}/api/posts/?author=${cu.id}`;
+          res = await fetch(url, { headers });
         }
         if (!res.ok) throw new Error('Failed to load my posts');
         const data = await res.json().catch(() => null);
-        const list = Array.isArray(data) ? data : (Array.isArray(data.results) ? data.results : []);
+        const list = await collectPostPages(data, url, { headers });
         if (mounted) setMyPosts(list);
       } catch (e) {
         console.warn('AdminDashboard: failed to fetch my posts', e);
@@ -535,9 +538,9 @@ function AdminDashboard({ user, onLogout }) {
         const res = await fetch(url);
         if (!res.ok) throw new Error('Failed');
         const list = await res.json();
-        if (!mounted) return;
         // handle paginated or plain list responses
-        const arr = Array.isArray(list) ? list : (Array.isArray(list.results) ? list.results : []);
+        const arr = await collectPostPages(list, url);
+        if (!mounted) return;
         setRecentPosts(arr);
       } catch (e) {
         console.warn('AdminDashboard: failed to load recent posts', e);
@@ -674,13 +677,14 @@ function AdminDashboard({ user, onLogout }) {
           setRecentPosts(Array.isArray(list) ? list : []);
           return;
         }
-        const res = await fetch(`${base}/api/posts/?q=${encodeURIComponent(postSearch)}`);
+        const url = `${base}/api/posts/?q=${encodeURIComponent(postSearch)}`;
+        const res = await fetch(url);
         if (!res.ok) {
           setRecentPosts([]);
           return;
         }
         const data = await res.json();
-        const arr = Array.isArray(data) ? data : (Array.isArray(data.results) ? data.results : []);
+        const arr = await collectPostPages(data, url);
         setRecentPosts(arr);
       } catch (e) {
         console.warn('Search posts failed', e);
@@ -78,6 +78,27 @@ export async function fetchUsers(setUsers, setError, setLoading) {
   }
 }
 
+// The posts API is cursor-paginated ({next, prev, results}). Given the first
+// page already fetched from `url`, keep following `next` and return every post.
+export async function collectPostPages(data, url, options = {}) {
+  if (Array.isArray(data)) return data;
+  let list = data && Array.isArray(data.results) ? data.results : [];
+  let next = data ? data.next : null;
+  while (next) {
+    const cursor = new URL(next, window.location.origin).searchParams.get('cursor');
+    if (!cursor) break;
+    const pageUrl = new URL(url, window.location.origin);
+    pageUrl.searchParams.set('cursor', cursor);
+    const res = await fetch(pageUrl.toString(), options);
+    if (!res.ok) break;
+    const page = await res.json().catch(() => null);
+    if (!page || !Array.isArray(page.results)) break;
+    list = list.concat(page.results);
+    next = page.next;
+  }
+  return list;
+}
+
 export async function fetchAlumniUsers(setAlumniUsers) {
   try {
     const response = await fetch('http://127.0.0.1:8000/api/alumni/');
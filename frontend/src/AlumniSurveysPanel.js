@@ -188,6 +188,7 @@ function AlumniSurveysPanel() {
       employment_source: formData.employmentSource,
       ...(formData.employmentRecords && formData.employmentRecords.length > 0 ? {
         employment_records: formData.employmentRecords.map(rec => ({
+          ...(rec.id ? { id: rec.id } : {}),
           company_name: rec.companyName || '',
           date_employed: rec.dateEmployed || '',
           position_and_status: rec.positionAndStatus || '',
@@ -304,6 +305,7 @@ function AlumniSurveysPanel() {
       jobDifficulties: Array.isArray(s.job_difficulties) ? s.job_difficulties : (s.job_difficulties ? [s.job_difficulties] : []),
       employmentSource: s.employment_source || '',
       employmentRecords: Array.isArray(s.employment_records) ? s.employment_records.map(r => ({
+        id: r.id,
         companyName: r.company_name || '',
         dateEmployed: r.date_employed || '',
         positionAndStatus: r.position_and_status || '',
@@ -339,7 +341,8 @@ function AlumniSurveysPanel() {
         const base = process.env.REACT_APP_API_BASE || '';
         const token = localStorage.getItem('token');
         const headers = token ? { Authorization: `Bearer ${token}` } : {};
-        const res = await fetch(`${base}/api/alumni-surveys/?alumni=${id}`, { headers });
+        // Newest first; only the latest submission is needed
+        const res = await fetch(`${base}/api/alumni-surveys/?alumni=${id}&page_size=1`, { headers });
         if (!res.ok) return;
         const data = await res.json().catch(() => null);
         const list = Array.isArray(data) ? data : (Array.isArray(data.results) ? data.results : []);
@@ -450,17 +450,17 @@ export default function EvaluationReports() {
       const base = process.env.REACT_APP_API_BASE || '';
       const currentYear = new Date().getFullYear();
       let labels = [];
-      const yearParams = [];
       for (let i = years - 1; i >= 0; i--) {
-        const y = String(currentYear - i);
-        labels.push(y);
-        const params = new URLSearchParams();
-        params.set('year', y);
-        if (selectedProgram && selectedProgram !== 'all') params.set('program', selectedProgram);
-        yearParams.push(params.toString());
+        labels.push(String(currentYear - i));
       }
-      const fetches = yearParams.map(p => fetch(`${base}/api/survey-aggregates/?${p}`).then(r => r.ok ? r.json() : null).catch(() => null));
-      const responses = await Promise.all(fetches);
+      // One grouped request returns the aggregates for every graduation year
+      const params = new URLSearchParams();
+      params.set('group_by', 'year_graduated');
+      if (selectedProgram && selectedProgram !== 'all') params.set('program', selectedProgram);
+      const grouped = await fetch(`${base}/api/survey-aggregates/?${params.toString()}`).then(r => r.ok ? r.json() : null).catch(() => null);
+      const byYear = {};
+      ((grouped && grouped.groups) || []).forEach(g => { byYear[String(g.year_graduated)] = g.aggregates; });
+      const responses = labels.map(y => byYear[y] || null);
       const values = responses.map(d => {
         if (!d) return null;
         const yes = Number((d.employed && d.employed.yes) || 0);
@@ -141,21 +141,32 @@ const MainBody = ({ onGetStarted }) => {
   // Show privacy consent form for logged-in users before allowing survey access
   const [showPrivacyConsent, setShowPrivacyConsent] = useState(false);
   const [privacyUserId, setPrivacyUserId] = useState(null);
+  // cursor for the next feed page; null once the last page has been loaded
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMorePosts, setLoadingMorePosts] = useState(false);
+  const POSTS_PAGE_SIZE = 18;
+
+  // fetch one page of the feed; the API paginates by cursor and returns {next, prev, results}
+  const fetchPostsPage = async (cursor) => {
+    const params = new URLSearchParams({ page_size: String(POSTS_PAGE_SIZE) });
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(`/api/posts/?${params.toString()}`);
+    const data = await res.json().catch(() => null);
+    if (!data) return null;
+    const list = Array.isArray(data) ? data : (Array.isArray(data.results) ? data.results : []);
+    const next = data.next ? new URL(data.next, window.location.origin).searchParams.get('cursor') : null;
+    return { list, next };
+  };
+
   useEffect(() => {
     let mounted = true;
     async function fetchPosts() {
       try {
-<<<<<<< HEAD
-        const res = await fetch('/api/posts/');
-=======
-        const res = await fetch('api/posts/');
->>>>>>> aa12f51ca4137d7f95363810643765ab0036949c
-        const data = await res.json().catch(() => null);
-          if (mounted && data) {
-            // data may be a list or an object with results
-            const list = Array.isArray(data) ? data : (Array.isArray(data.results) ? data.results : []);
-            // keep the full list in state; the UI will control how many to show via `visibleCount`
-            setPosts(list);
+        const page = await fetchPostsPage(null);
+        if (mounted && page) {
+          // the UI controls how many loaded posts to show via `visibleCount`
+          setPosts(page.list);
+          setNextCursor(page.next);
         }
       } catch (err) {
         console.warn('Failed to fetch posts', err);
@@ -165,6 +176,28 @@ const MainBody = ({ onGetStarted }) => {
     return () => { mounted = false; };
   }, []);
 
+  // "Show more": reveal already-loaded posts first, fetching the next page when they run out
+  const showMorePosts = async () => {
+    const target = visibleCount + 6;
+    if (target > posts.length && nextCursor && !loadingMorePosts) {
+      setLoadingMorePosts(true);
+      try {
+        const page = await fetchPostsPage(nextCursor);
+        if (page) {
+          setPosts((prev) => prev.concat(page.list));
+          setNextCursor(page.next);
+          setVisibleCount(Math.min(posts.length + page.list.length, target));
+          return;
+        }
+      } catch (err) {
+        console.warn('Failed to fetch more posts', err);
+      } finally {
+        setLoadingMorePosts(false);
+      }
+    }
+    setVisibleCount(Math.min(posts.length, target));
+  };
+
   // Animate dashboard when it enters viewport
   React.useEffect(() => {
     const observer = new window.IntersectionObserver(
@@ -1011,10 +1044,11 @@ const MainBody = ({ onGetStarted }) => {
           })}
         </div>
         {/* Show more / Show less control */}
-        {posts.length > visibleCount && (
+        {(posts.length > visibleCount || nextCursor) && (
           <div style={{ display: 'flex', justifyContent: 'center', marginTop: 18 }}>
             <button
-              onClick={() => setVisibleCount((c) => Math.min(posts.length, c + 6))}
+              onClick={showMorePosts}
+              disabled={loadingMorePosts}
               style={{
                   padding: '10px 18px',
                   borderRadius: 8,
@@ -1029,7 +1063,7 @@ const MainBody = ({ onGetStarted }) => {
             </button>
           </div>
         )}
-        {posts.length > 6 && visibleCount >= posts.length && (
+        {posts.length > 6 && visibleCount >= posts.length && !nextCursor && (
           <div style={{ display: 'flex', justifyContent: 'center', marginTop: 12 }}>
             <button
               onClick={() => setVisibleCount(6)}
@@ -15,7 +15,8 @@ import {
 	handleUpdateUser as handleUpdateUserUtil,
 	handleDeleteUser as handleDeleteUserUtil,
 	startEdit as startEditUtil,
-	cancelEdit as cancelEditUtil
+	cancelEdit as cancelEditUtil,
+	collectPostPages
 } from './AdminDashboardUtils';
 
 ChartJS.register(ArcElement, Tooltip, Legend, CategoryScale, LinearScale, PointElement, LineElement, BarElement);
@@ -408,11 +409,15 @@ function ProgramHeadDashboard({ user, onLogout }) {
 					return;
 				}
 				const headers = token ? { Authorization: `Bearer ${token}` } : {};
-				let res = await fetch(`${base}/api/posts/?author_id=${cu.id}`, { headers });
-				if (!res.ok) res = await fetch(`${base}/api/posts/?author=${cu.id}`, { headers });
+				let url = `${base}/api/posts/?author_id=${cu.id}`;
+				let res = await fetch(url, { headers });
+				if (!res.ok) {
+					url = `${base}/api/posts/?author=${cu.id}`;
+					res = await fetch(url, { headers });
+				}
 				if (!res.ok) throw new Error('Failed to load my posts');
 				const data = await res.json().catch(() => null);
-				const list = Array.isArray(data) ? data : (Array.isArray(data.results) ? data.results : []);
+				const list = await collectPostPages(data, url, { headers });
 				if (mounted) setAdminPostsCount(list.length || 0);
 			} catch (e) {
 				console.warn('ProgramHeadDashboard: failed to fetch my posts', e);
@@ -113,19 +113,28 @@ export default function SurveyResultsPanel({ surveyCount }) {
         const params = new URLSearchParams();
         if (selectedYear && selectedYear !== 'all') params.set('year', selectedYear);
         if (selectedProgram && selectedProgram !== 'all') params.set('program', selectedProgram);
-        if (rowsLimit) params.set('limit', String(rowsLimit));
-        const url = `${base}/api/users_alumnisurvey/${params.toString() ? ('?' + params.toString()) : ''}`;
-        const res = await fetch(url);
-        if (!res.ok) {
-          setRowsError(`server returned ${res.status}`);
-          setRowsLoading(false);
-          return;
+        // The list is served in pages of at most 200 rows ({next, prev, results});
+        // follow the `next` cursor until rowsLimit rows are loaded (0 = all rows)
+        params.set('page_size', String(rowsLimit ? Math.min(rowsLimit, 200) : 200));
+        let rows = [];
+        let more = true;
+        while (more) {
+          const url = `${base}/api/users_alumnisurvey/?${params.toString()}`;
+          const res = await fetch(url);
+          if (!res.ok) {
+            setRowsError(`server returned ${res.status}`);
+            setRowsLoading(false);
+            return;
+          }
+          const data = await res.json();
+          if (!mounted) return;
+          // expect {results: []}; a plain array is the whole (unpaginated) list
+          rows = rows.concat(Array.isArray(data) ? data : (Array.isArray(data.results) ? data.results : []));
+          const cursor = !Array.isArray(data) && data.next ? new URL(data.next, window.location.origin).searchParams.get('cursor') : null;
+          more = Boolean(cursor) && (!rowsLimit || rows.length < rowsLimit);
+          if (more) params.set('cursor', cursor);
         }
-        const data = await res.json();
-        if (!mounted) return;
-        // expect an array of objects; if backend returns {results: []} handle that
-        const rows = Array.isArray(data) ? data : (Array.isArray(data.results) ? data.results : []);
-        setSurveyRows(rows);
+        setSurveyRows(rowsLimit ? rows.slice(0, rowsLimit) : rows);
       } catch (err) {
         console.error('Failed to fetch survey rows', err);
         setRowsError(String(err));
@@ -19,7 +19,10 @@ export default function PostCard({ post, onOpen }) {
   }, []);
 
   const likeCount = likesMap && likesMap[post.id] ? 1 : 0;
-  const commentCount = post && post.comments && Array.isArray(post.comments) ? post.comments.length : 0;
+  // The feed only embeds the newest few comments; comments_count is the full total
+  const commentCount = post && typeof post.comments_count === 'number'
+    ? post.comments_count
+    : (post && Array.isArray(post.comments) ? post.comments.length : 0);
   // If server provides likes_count, use that; otherwise fallback to local per-user map
   const serverLikeCount = typeof post.likes_count === 'number' ? post.likes_count : likeCount;
   // only respect local postLikes map when user appears authenticated